@@ -1,12 +1,30 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from collections import namedtuple
 from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import or_
+from werkzeug.security import generate_password_hash
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+import base64
+import click
+import json
 import jwt
+import math
 import os
+import time
+
+from cache import ResponseCache, TTLCache, create_backend
+from hashing import HashingBusy, PasswordHasher
+from identity import FINGERPRINT_LENGTH, product_identity
+from metrics import JobStateCollector, RequestMetrics
+from search import apply_search, drop_search_index, search_document, search_text_default, setup_search_index
+from serializers import (
+    DETAIL_FIELDS, EXPORT_MIMETYPES, LIST_FIELDS, ProductSerializer,
+    csv_chunk, json_response, ndjson_chunk, parse_fields
+)
+from timeseries import DOWNSAMPLE_METHODS, downsample
 
 app = Flask(__name__)
 
@@ -39,8 +57,68 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_recycle': 300,
 }
 
+# Response Cache (memory: yanıtlar worker başına, katalog versiyonu veritabanında; redis: hepsi paylaşılan)
+app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'memory')
+app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+app.config['CACHE_TTL'] = int(os.getenv('CACHE_TTL', 60))
+app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', 512))
+
+# Auth cache: çözülmüş token claim'leri ve kullanıcı principal'ları (worker başına)
+app.config['AUTH_CACHE_TTL'] = int(os.getenv('AUTH_CACHE_TTL', 30))
+app.config['AUTH_CACHE_MAX_ENTRIES'] = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', 10000))
+
+# Password hashing (sunucu genelinde en fazla WORKERS eşzamanlı hash, QUEUE_LIMIT bekleyen; 0 = sınırsız inline)
+app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_QUEUE_LIMIT'] = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 16))
+
+# Bot toplu ekleme: istek başına en fazla öğe
+app.config['BOT_BATCH_MAX_ITEMS'] = int(os.getenv('BOT_BATCH_MAX_ITEMS', 1000))
+
+# Metrics: bu süreyi aşan istekler SQL dökümüyle loglanır; token ayarlıysa /metrics Bearer ister
+app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', 500))
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')
+
 db = SQLAlchemy(app)
 
+class CatalogVersionStore:
+    """Response cache'in katalog versiyonu cache_version tablosunda: tüm worker'lar,
+    scheduler ve CLI aynı satırı okur/artırır"""
+    
+    name = 'catalog'
+    
+    def get(self):
+        return db.session.execute(
+            db.select(CacheVersion.version).where(CacheVersion.name == self.name)
+        ).scalar() or 0
+    
+    def bump(self):
+        # Çağıranın session'ından bağımsız kısa transaction (invalidate commit'ten sonra çağrılır);
+        # app context dışından (script, benchmark) da çağrılabilsin diye kendi context'i
+        table = CacheVersion.__table__
+        with app.app_context(), db.engine.begin() as conn:
+            updated = conn.execute(
+                table.update().where(table.c.name == self.name).values(version=table.c.version + 1)
+            ).rowcount
+            if not updated:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(table.insert().values(name=self.name, version=1))
+                except IntegrityError:
+                    # Başka bir process satırı aynı anda ekledi
+                    conn.execute(table.update().where(table.c.name == self.name).values(version=table.c.version + 1))
+            return conn.execute(db.select(table.c.version).where(table.c.name == self.name)).scalar()
+
+response_cache = ResponseCache(create_backend(app.config, version_store=CatalogVersionStore()))
+password_hasher = PasswordHasher(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    queue_limit=app.config['PASSWORD_HASH_QUEUE_LIMIT']
+)
+request_metrics = RequestMetrics(slow_request_ms=app.config['SLOW_REQUEST_MS'])
+with app.app_context():
+    request_metrics.init_app(app, db.engine)
+
 # ==================== MODELS ====================
 
 class User(db.Model):
@@ -54,6 +132,21 @@ class User(db.Model):
     alerts = db.relationship('PriceAlert', backref='user', lazy=True, cascade='all, delete-orphan')
 
 class Product(db.Model):
+    __table_args__ = (
+        # Başlık kimlik değildir (aynı başlıklı farklı ilanlar olabilir): yalnızca fingerprint'i
+        # NULL eski satırların aranması için tekil olmayan index
+        db.Index('ix_product_platform_title', 'platform', 'title'),
+        db.Index('uq_product_url', 'product_url', unique=True),
+        # Ürün kimliği: kanonik linkten platform ürün numarası (identity.py, 'trendyol:123' gibi
+        # platform önekli); tüm yazma yolları bunu kullanır, PostgreSQL'de scraper ON CONFLICT hedefi
+        db.Index('uq_product_fingerprint', 'fingerprint', unique=True),
+        # /api/products sıralaması: discount_percent DESC, created_at DESC (geriye doğru taranır)
+        db.Index('ix_product_discount_created', 'discount_percent', 'created_at', 'id'),
+        db.Index('ix_product_platform_discount_created', 'platform', 'discount_percent', 'created_at', 'id'),
+        # /api/products/export?updated_since: (updated_at, id) keyset taraması
+        db.Index('ix_product_updated', 'updated_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
     platform = db.Column(db.String(50), nullable=False)
@@ -66,27 +159,938 @@ class Product(db.Model):
     real_deal_status = db.Column(db.String(20), default='real')  # real, normal, fake
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_text = db.Column(db.Text, default=search_text_default)  # Türkçe normalize edilmiş arama metni
+    fingerprint = db.Column(db.String(FINGERPRINT_LENGTH))  # Eski satırlarda `flask dedupe-products` doldurana kadar NULL
     price_history = db.relationship('PriceHistory', backref='product', lazy=True, cascade='all, delete-orphan')
 
+@db.event.listens_for(Product, 'before_update')
+def sync_search_text(mapper, connection, target):
+    """ORM güncellemelerinde arama metnini başlık/platform/kategori ile senkron tut"""
+    target.search_text = search_document(target.title, target.platform, target.category)
+
+@db.event.listens_for(Product, 'before_insert')
+@db.event.listens_for(Product, 'before_update')
+def sync_identity(mapper, connection, target):
+    """ORM yazımlarında linki kanonik hale getir ve fingerprint'i üret
+
+    Güncellemelerde yalnızca link değiştiyse çalışır: fingerprint'i
+    henüz doldurulmamış eski satırların fiyat güncellemesi kopyalarla çakışmaz.
+    """
+    state = db.inspect(target)
+    if state.persistent and not state.attrs.product_url.history.has_changes():
+        return
+    target.product_url, target.fingerprint = product_identity(target.product_url)
+
+class ProductAlias(db.Model):
+    """Birleştirilen kopyaların fingerprint'leri -> kalan ürün; aynı link tekrar gelince yeni satır açılmaz"""
+    fingerprint = db.Column(db.String(FINGERPRINT_LENGTH), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class PriceHistory(db.Model):
+    __table_args__ = (
+        db.Index('ix_price_history_product_recorded', 'product_id', 'recorded_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     price = db.Column(db.Float, nullable=False)
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)  # Fiyat bu değerde en son ne zaman görüldü
 
 class Favorite(db.Model):
+    __table_args__ = (
+        db.Index('uq_favorite_user_product', 'user_id', 'product_id', unique=True),
+        db.Index('ix_favorite_product', 'product_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class PriceAlert(db.Model):
+    __table_args__ = (
+        db.Index('ix_price_alert_user', 'user_id'),
+        db.Index('ix_price_alert_product', 'product_id'),
+        # Değerlendirme: yalnızca aktif alarmlar, ürün içinde hedef fiyata göre sıralı (aralık taraması)
+        db.Index('ix_price_alert_active_product_target', 'product_id', 'target_price',
+                 sqlite_where=db.text('is_active = 1'), postgresql_where=db.text('is_active')),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     target_price = db.Column(db.Float, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    triggered_at = db.Column(db.DateTime)  # Son tetiklenme; tetiklenen alarm pasife alınır
+
+class AlertOutbox(db.Model):
+    """Tetiklenen alarmların teslimat kuyruğu; bildirim gönderen süreç delivered_at'i doldurur"""
+    __table_args__ = (
+        db.Index('ix_alert_outbox_pending', 'delivered_at', 'id'),
+        db.Index('ix_alert_outbox_product', 'product_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    alert_id = db.Column(db.Integer, db.ForeignKey('price_alert.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    target_price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False)
+    previous_price = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime)
+
+class JobState(db.Model):
+    """Toplu işlerin kaldığı yer (ör. reclassify-deals için işlenen son PriceHistory id'si)
+    ve scheduler işlerinin son çalışma metrikleri"""
+    name = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.Integer, nullable=False, default=0)
+    last_run_at = db.Column(db.DateTime)
+    last_status = db.Column(db.String(20))  # ok, error, missed
+    last_duration = db.Column(db.Float)     # saniye
+    last_lag = db.Column(db.Float)          # planlanan zamandan gecikme, saniye
+    run_count = db.Column(db.Integer, default=0)
+    failure_count = db.Column(db.Integer, default=0)
+
+class SchedulerLease(db.Model):
+    """Birden fazla process scheduler başlattığında işleri yalnızca lease sahibi çalıştırır"""
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+def load_job_states():
+    return db.session.execute(db.select(
+        JobState.name, JobState.last_run_at, JobState.last_status, JobState.last_duration,
+        JobState.last_lag, JobState.run_count, JobState.failure_count
+    )).all()
+
+request_metrics.collectors.append(JobStateCollector(load_job_states))
+
+class CacheVersion(db.Model):
+    """Paylaşılan sayaçlar; 'catalog': response cache versiyonu (CatalogVersionStore)"""
+    __tablename__ = 'cache_version'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class CatalogStat(db.Model):
+    """/api/stats için artımlı tutulan özet satırları (scope: all, category, platform, users)"""
+    scope = db.Column(db.String(20), primary_key=True)
+    name = db.Column(db.String(50), primary_key=True, default='')
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    discount_sum = db.Column(db.Integer, nullable=False, default=0)
+    max_discount = db.Column(db.Integer)  # NULL + item_count > 0: okunurken yeniden hesaplanır
+
+# ==================== INCREMENTAL STATS ====================
+
+# apply_stats_changes için sınır değeri: "bu yönde değer yok"
+NO_DISCOUNT = -(2 ** 31)
+
+def stats_scopes(category, platform):
+    return [('all', ''), ('category', category), ('platform', platform)]
+
+def product_stats_key(product):
+    return (product.category, product.platform, product.discount_percent or 0)
+
+def apply_stats_changes(changes, user_delta=0, connection=None):
+    """Ürün değişikliklerini CatalogStat satırlarına atomik artış olarak uygula
+
+    changes: (old, new) listesi; her biri (category, platform, discount_percent)
+    veya None (insert'te old, delete'te new). Maksimumu düşürebilen değişiklikler
+    max_discount'u NULL yapar; get_stats yanıt için hesaplar, saatlik reconcile kalıcı yazar.
+    """
+    deltas = {}
+
+    def touch(scope):
+        return deltas.setdefault(scope, {'count': 0, 'sum': 0, 'added': NO_DISCOUNT, 'removed': NO_DISCOUNT})
+
+    for old, new in changes:
+        if old == new:
+            continue
+        if old is not None:
+            category, platform, discount = old
+            for scope in stats_scopes(category, platform):
+                delta = touch(scope)
+                delta['count'] -= 1
+                delta['sum'] -= discount
+                delta['removed'] = max(delta['removed'], discount)
+        if new is not None:
+            category, platform, discount = new
+            for scope in stats_scopes(category, platform):
+                delta = touch(scope)
+                delta['count'] += 1
+                delta['sum'] += discount
+                delta['added'] = max(delta['added'], discount)
+
+    if user_delta:
+        touch(('users', ''))['count'] += user_delta
+
+    if not deltas:
+        return
+
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+
+    table = CatalogStat.__table__
+    execute = connection.execute if connection is not None else db.session.execute
+
+    for (scope, name), delta in deltas.items():
+        count = table.c.item_count + delta['count']
+        stmt = upsert(table).values(
+            scope=scope, name=name,
+            item_count=delta['count'],
+            discount_sum=delta['sum'],
+            max_discount=delta['added'] if delta['added'] != NO_DISCOUNT else None
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.scope, table.c.name],
+            set_={
+                'item_count': count,
+                'discount_sum': table.c.discount_sum + delta['sum'],
+                'max_discount': db.case(
+                    (count <= 0, None),
+                    (table.c.item_count <= 0, delta['added']),
+                    (table.c.max_discount.is_(None), None),
+                    (table.c.max_discount <= delta['removed'], None),
+                    (table.c.max_discount < delta['added'], delta['added']),
+                    else_=table.c.max_discount
+                )
+            }
+        )
+        execute(stmt)
+
+@db.event.listens_for(db.session, 'before_flush')
+def collect_stats_changes(session, flush_context, instances):
+    """ORM yazımlarından (admin, bot, kayıt) istatistik farklarını topla"""
+    changes = session.info.setdefault('stats_changes', [])
+
+    for obj in session.new:
+        if isinstance(obj, Product):
+            changes.append((None, product_stats_key(obj)))
+        elif isinstance(obj, User):
+            session.info['stats_users'] = session.info.get('stats_users', 0) + 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            changes.append((product_stats_key(obj), None))
+        elif isinstance(obj, User):
+            session.info['stats_users'] = session.info.get('stats_users', 0) - 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Product):
+            continue
+        state = db.inspect(obj)
+        old = []
+        for field in ('category', 'platform', 'discount_percent'):
+            history = state.attrs[field].history
+            old.append(history.deleted[0] if history.deleted else getattr(obj, field))
+        old[2] = old[2] or 0
+        changes.append((tuple(old), product_stats_key(obj)))
+
+@db.event.listens_for(db.session, 'after_flush')
+def write_stats_changes(session, flush_context):
+    changes = session.info.pop('stats_changes', [])
+    users = session.info.pop('stats_users', 0)
+    if changes or users:
+        apply_stats_changes(changes, users, connection=session.connection())
+
+# Özet scope'larının Product'taki gruplama kolonu ('all' gruplanmaz)
+STAT_GROUPS = {'all': None, 'category': Product.category, 'platform': Product.platform}
+
+def stats_truth():
+    """Özet satırlarının tablolardan hesaplanmış değerleri: (scope, name) -> (count, sum, max)"""
+    truth = {('users', ''): (User.query.count(), 0, None)}
+
+    for scope, group_col in STAT_GROUPS.items():
+        query = db.session.query(
+            group_col if group_col is not None else db.literal(''), db.func.count(Product.id),
+            db.func.coalesce(db.func.sum(Product.discount_percent), 0),
+            db.func.max(Product.discount_percent)
+        )
+        if group_col is not None:
+            query = query.group_by(group_col)
+        for name, count, total, best in query:
+            if count:
+                truth[(scope, name or '')] = (count, int(total), best)
+    # Boş katalogda da 'all' satırı tutulur: get_stats eksik satırı "hiç hesaplanmadı" sayar
+    truth.setdefault(('all', ''), (0, 0, None))
+    return truth
+
+def reconcile_stats(fix=True):
+    """Özet satırlarını tablolardan yeniden hesapla; sapmaları döndür (ve düzelt)"""
+    truth = stats_truth()
+    stored = {(row.scope, row.name): row for row in CatalogStat.query.all()}
+    drift = []
+
+    for key in set(truth) | set(stored):
+        expected = truth.get(key, (0, 0, None))
+        row = stored.get(key)
+        actual = (row.item_count, row.discount_sum, row.max_discount) if row else (0, 0, None)
+        # max_discount NULL "yeniden hesaplanacak" demek, sapma sayılmaz
+        if actual[:2] != expected[:2] or (actual[2] is not None and key[0] != 'users' and actual[2] != expected[2]):
+            drift.append({'scope': key[0], 'name': key[1], 'expected': expected, 'actual': actual})
+
+        if fix:
+            if row is None:
+                row = CatalogStat(scope=key[0], name=key[1])
+                db.session.add(row)
+            row.item_count, row.discount_sum, row.max_discount = expected
+
+    if fix:
+        db.session.commit()
+
+    return drift
+
+@app.cli.command('reconcile-stats')
+def reconcile_stats_command():
+    """CatalogStat özetini tablolarla karşılaştır ve sapmaları düzelt"""
+    drift = reconcile_stats()
+    for item in drift:
+        print(f"⚠️ Stats drift {item['scope']}/{item['name']}: beklenen {item['expected']}, kayıtlı {item['actual']}")
+    print(f"✅ Stats reconcile tamamlandı ({len(drift)} sapma)")
+
+# ==================== PRICE HISTORY ====================
+
+def price_changed(price, previous_price):
+    return previous_price is None or round(float(price), 2) != round(float(previous_price), 2)
+
+def record_prices(observations, now=None):
+    """Fiyat gözlemlerini PriceHistory'e yaz
+
+    observations: (product_id, price, previous_price) listesi; yeni ürünlerde previous_price None.
+    Sadece gerçek fiyat değişimleri yeni satır açar; fiyat değişmediyse ürünün
+    son noktasının last_seen_at değeri güncellenir. Fiyat düşüşleri aynı
+    transaction'da alarm değerlendirmesini tetikler. Commit çağırana aittir.
+    """
+    now = now or datetime.utcnow()
+    changed = []
+    unchanged = []
+    drops = []
+
+    for product_id, price, previous_price in observations:
+        if price_changed(price, previous_price):
+            changed.append({'product_id': product_id, 'price': price, 'recorded_at': now, 'last_seen_at': now})
+            if previous_price is not None and float(price) < float(previous_price):
+                drops.append((product_id, float(price), float(previous_price)))
+        else:
+            unchanged.append(product_id)
+
+    if changed:
+        db.session.execute(db.insert(PriceHistory), changed)
+
+    for i in range(0, len(unchanged), 500):
+        latest = (
+            db.select(db.func.max(PriceHistory.id))
+            .where(PriceHistory.product_id.in_(unchanged[i:i + 500]))
+            .group_by(PriceHistory.product_id)
+        )
+        db.session.execute(
+            db.update(PriceHistory).where(PriceHistory.id.in_(latest)).values(last_seen_at=now)
+        )
+
+    if drops:
+        evaluate_alerts(drops, now)
+
+    return len(changed)
+
+def compact_price_history(batch_size=5000):
+    """Aynı fiyatın ardışık tekrarlarını tek noktaya indir (tek seferlik bakım)
+
+    Her tekrar dizisinin ilk satırı kalır, last_seen_at dizinin son görülme zamanı olur.
+    Tablo akış halinde okunur; silmeler ve yalnızca tekrar yutan dizilerin last_seen_at
+    güncellemeleri batch_size dolduğunda yazılır (bellek tablo boyundan bağımsız).
+    """
+    rows = db.session.execute(
+        db.select(PriceHistory.id, PriceHistory.product_id, PriceHistory.price,
+                  PriceHistory.recorded_at, PriceHistory.last_seen_at)
+        .order_by(PriceHistory.product_id, PriceHistory.recorded_at, PriceHistory.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    to_delete = []
+    updates = []
+    kept = removed = 0
+    run = None  # [product_id, price, kept_id, last_seen, stored_last_seen]
+
+    def close(run):
+        if run and run[3] != run[4]:
+            updates.append({'id': run[2], 'last_seen_at': run[3]})
+
+    def flush():
+        if to_delete:
+            db.session.execute(db.delete(PriceHistory).where(PriceHistory.id.in_(to_delete)))
+        if updates:
+            db.session.execute(db.update(PriceHistory), updates)
+        to_delete.clear()
+        updates.clear()
+
+    for row_id, product_id, price, recorded_at, seen_at in rows:
+        if run and run[0] == product_id and not price_changed(price, run[1]):
+            # Tekrar: sil, dizinin son görülme zamanını ileri taşı
+            to_delete.append(row_id)
+            removed += 1
+            run[3] = max(filter(None, (recorded_at, seen_at, run[3])), default=None)
+        else:
+            close(run)
+            run = [product_id, price, row_id, seen_at, seen_at]
+            kept += 1
+        if len(to_delete) + len(updates) >= batch_size:
+            flush()
+
+    close(run)
+    flush()
+    db.session.commit()
+    return kept, removed
+
+@app.cli.command('compact-history')
+def compact_history_command():
+    """PriceHistory'deki ardışık aynı fiyat satırlarını birleştir"""
+    kept, removed = compact_price_history()
+    print(f"✅ PriceHistory sıkıştırıldı: {kept} nokta kaldı, {removed} tekrar silindi")
+
+# ==================== DEAL SCORING ====================
+
+# Artımlı reclassify-deals son watermark'tan bu kadar id geriden başlar: id'si okunan
+# max(id)'den küçük olup daha sonra commit edilen satırlar (açık transaction'lar) kaçmasın.
+# Yeniden hesap idempotent; örtüşen ürünler yalnızca fazladan işlenir.
+DEALS_WATERMARK_OVERLAP = 10000
+
+def reclassify_deals(full=False):
+    """real_deal_status'u fiyat geçmişinden yeniden hesapla
+
+    Artımlı modda (varsayılan) yalnızca son çalışmadan beri (güvenlik payıyla)
+    yeni PriceHistory noktası olan ürünler işlenir; full=True tüm kataloğu tek
+    geçişte işler.
+    """
+    from deals import recompute_deal_status
+
+    state = db.session.get(JobState, 'reclassify_deals')
+    if state is None:
+        state = JobState(name='reclassify_deals', watermark=0)
+        db.session.add(state)
+        full = True
+
+    watermark = db.session.execute(db.select(db.func.coalesce(db.func.max(PriceHistory.id), 0))).scalar()
+    product_ids = None
+    if not full:
+        product_ids = db.session.execute(
+            db.select(PriceHistory.product_id)
+            .where(PriceHistory.id > state.watermark - DEALS_WATERMARK_OVERLAP).distinct()
+        ).scalars().all()
+
+    stats = recompute_deal_status(db, Product, PriceHistory, product_ids)
+    state.watermark = watermark
+    state.last_run_at = datetime.utcnow()
+    db.session.commit()
+
+    if stats['changed']:
+        response_cache.invalidate()
+    return stats
+
+@app.cli.command('reclassify-deals')
+@click.option('--full', is_flag=True, help='Tüm kataloğu yeniden hesapla (varsayılan: artımlı)')
+def reclassify_deals_command(full):
+    """real_deal_status'u 30/90 günlük fiyat geçmişine göre yeniden hesapla"""
+    stats = reclassify_deals(full)
+    print(f"✅ {stats['products']} ürün değerlendirildi, {stats['changed']} etiket değişti "
+          f"(real {stats['real']}, normal {stats['normal']}, fake {stats['fake']}; "
+          f"yükleme {stats['load_s']:.1f}s, hesap {stats['compute_s']:.1f}s, yazma {stats['write_s']:.1f}s)")
+
+# ==================== CATEGORY CLASSIFICATION ====================
+
+def reclassify_categories(batch_size=20000, dry_run=False):
+    """Katalogdaki ürünlerin kategorisini başlıktan yeniden belirle
+
+    Başlıkta hiçbir terim eşleşmezse ürün mevcut kategorisinde kalır. Yalnızca
+    değişen satırlar (kategori + search_text) id sırasıyla batch batch güncellenir.
+    """
+    from scraper import category_classifier
+
+    classify = category_classifier.classify
+    stats = {'products': 0, 'changed': 0, 'moves': {}}
+    last_id = 0
+
+    while True:
+        rows = db.session.connection().execute(
+            db.select(Product.id, Product.title, Product.platform, Product.category)
+            .where(Product.id > last_id).order_by(Product.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        stats['products'] += len(rows)
+
+        now = datetime.utcnow()
+        updates = []
+        for product_id, title, platform, current in rows:
+            category = classify(title, hint=current)
+            if category == current:
+                continue
+            move = (current, category)
+            stats['moves'][move] = stats['moves'].get(move, 0) + 1
+            updates.append({
+                'id': product_id,
+                'category': category,
+                'search_text': search_document(title, platform, category),
+                'updated_at': now
+            })
+
+        stats['changed'] += len(updates)
+        if updates and not dry_run:
+            db.session.execute(db.update(Product), updates)
+            db.session.commit()
+
+    if stats['changed'] and not dry_run:
+        reconcile_stats()
+        response_cache.invalidate()
+    return stats
+
+@app.cli.command('reclassify-categories')
+@click.option('--dry-run', is_flag=True, help='Yalnızca değişecek ürünleri say, yazma')
+def reclassify_categories_command(dry_run):
+    """Ürün kategorilerini başlıklardan (Türkçe normalize, trie eşleştirme) yeniden belirle"""
+    started = time.perf_counter()
+    stats = reclassify_categories(dry_run=dry_run)
+    for (old, new), count in sorted(stats['moves'].items(), key=lambda item: -item[1])[:20]:
+        print(f"   {old} -> {new}: {count}")
+    print(f"✅ {stats['products']} ürün tarandı, {stats['changed']} kategori "
+          f"{'değişecek' if dry_run else 'değişti'} ({time.perf_counter() - started:.1f}s)")
+
+# ==================== PRODUCT IDENTITY ====================
+
+def resolve_products(rows):
+    """Yazılacak ürünlerin mevcut karşılıkları; her satır için ürün id'si veya None
+
+    rows: fingerprint, product_url (kanonik), platform ve title içeren dict'ler.
+    Öncelik: fingerprint, birleştirilmiş kopyaların alias'ları, kanonik link.
+    Platform + başlık yalnızca fingerprint'i henüz doldurulmamış eski satırlarla
+    eşleşir; fingerprint'li iki ilan başlıkları aynı diye birleşmez.
+    """
+    if not rows:
+        return []
+
+    fingerprints = {row['fingerprint'] for row in rows}
+    aliases = dict(db.session.execute(
+        db.select(ProductAlias.fingerprint, ProductAlias.product_id)
+        .where(ProductAlias.fingerprint.in_(fingerprints))
+    ).all())
+
+    by_fingerprint, by_url, by_key = {}, {}, {}
+    for product_id, fingerprint, url, platform, title in db.session.execute(
+        db.select(Product.id, Product.fingerprint, Product.product_url, Product.platform, Product.title)
+        .where(db.or_(
+            Product.fingerprint.in_(fingerprints),
+            Product.product_url.in_({row['product_url'] for row in rows}),
+            db.and_(
+                Product.fingerprint.is_(None),
+                tuple_(Product.platform, Product.title).in_({(row['platform'], row['title']) for row in rows})
+            )
+        ))
+    ):
+        if fingerprint:
+            by_fingerprint[fingerprint] = product_id
+        else:
+            by_key[(platform, title)] = product_id
+        by_url[url] = product_id
+
+    return [
+        by_fingerprint.get(row['fingerprint']) or aliases.get(row['fingerprint'])
+        or by_url.get(row['product_url']) or by_key.get((row['platform'], row['title']))
+        for row in rows
+    ]
+
+def load_catalog_identity(batch_size):
+    """Kopya tespiti için katalog sütunları (id sırasıyla); fingerprint'ler linkten yeniden hesaplanır"""
+    catalog = {'ids': [], 'titles': [], 'platforms': [], 'prices': [], 'fingerprints': [], 'updated': []}
+    stale = 0
+    rows = db.session.execute(
+        db.select(Product.id, Product.title, Product.platform, Product.current_price,
+                  Product.product_url, Product.fingerprint, Product.updated_at)
+        .order_by(Product.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for product_id, title, platform, price, url, stored, updated_at in rows:
+        canonical, fingerprint = product_identity(url)
+        stale += canonical != url or fingerprint != stored
+        catalog['ids'].append(product_id)
+        catalog['titles'].append(title)
+        catalog['platforms'].append(platform)
+        catalog['prices'].append(price)
+        catalog['fingerprints'].append(fingerprint)
+        catalog['updated'].append(updated_at or datetime.min)
+    return catalog, stale
+
+def merge_duplicate_products(merges):
+    """Kopyaları kalan ürüne taşı: fiyat geçmişi, alarmlar, outbox, favoriler ve alias'lar
+
+    merges: {'survivor', 'losers', 'fingerprints', 'price_from'} listesi. Kalan ürünün
+    fiyat alanları grubun en son güncellenen üyesinden alınır. Commit çağırana aittir.
+    """
+    survivor_of = {loser: merge['survivor'] for merge in merges for loser in merge['losers']}
+    losers = list(survivor_of)
+    moves = [{'loser': loser, 'survivor': survivor} for loser, survivor in survivor_of.items()]
+
+    for model in (PriceHistory, PriceAlert, AlertOutbox, ProductAlias):
+        table = model.__table__
+        db.session.execute(
+            table.update().where(table.c.product_id == db.bindparam('loser'))
+            .values(product_id=db.bindparam('survivor')),
+            moves
+        )
+
+    # Favoriler (user, ürün) tekil: kullanıcı başına en eski favori taşınır, diğerleri silinir
+    taken = set(db.session.execute(
+        db.select(Favorite.user_id, Favorite.product_id)
+        .where(Favorite.product_id.in_({merge['survivor'] for merge in merges}))
+    ).all())
+    favorite_moves, favorite_drops = [], []
+    for favorite_id, user_id, product_id in db.session.execute(
+        db.select(Favorite.id, Favorite.user_id, Favorite.product_id)
+        .where(Favorite.product_id.in_(losers)).order_by(Favorite.id)
+    ):
+        target = (user_id, survivor_of[product_id])
+        if target in taken:
+            favorite_drops.append(favorite_id)
+        else:
+            taken.add(target)
+            favorite_moves.append({'favorite_id': favorite_id, 'survivor': target[1]})
+    if favorite_drops:
+        db.session.execute(Favorite.__table__.delete().where(Favorite.__table__.c.id.in_(favorite_drops)))
+    if favorite_moves:
+        table = Favorite.__table__
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('favorite_id'))
+            .values(product_id=db.bindparam('survivor')),
+            favorite_moves
+        )
+
+    aliases = {
+        fingerprint: merge['survivor']
+        for merge in merges for fingerprint in merge['fingerprints']
+    }
+    if aliases:
+        db.session.execute(db.delete(ProductAlias).where(ProductAlias.fingerprint.in_(list(aliases))))
+        now = datetime.utcnow()
+        db.session.execute(db.insert(ProductAlias), [
+            {'fingerprint': fingerprint, 'product_id': product_id, 'created_at': now}
+            for fingerprint, product_id in aliases.items()
+        ])
+
+    fresher = {merge['price_from']: merge['survivor'] for merge in merges if merge['price_from'] != merge['survivor']}
+    if fresher:
+        prices = db.session.execute(
+            db.select(Product.id, Product.current_price, Product.original_price, Product.discount_percent)
+            .where(Product.id.in_(list(fresher)))
+        ).all()
+        db.session.execute(db.update(Product), [{
+            'id': fresher[product_id],
+            'current_price': current,
+            'original_price': original,
+            'discount_percent': discount,
+            'updated_at': datetime.utcnow()
+        } for product_id, current, original, discount in prices])
+
+    db.session.execute(Product.__table__.delete().where(Product.__table__.c.id.in_(losers)))
+
+def backfill_identity(batch_size):
+    """Eski satırların linkini kanonik hale getir ve fingerprint'i doldur (kopyalar birleştirildikten sonra)
+
+    Yazma yolları mevcut satırların fingerprint'ine dokunmaz; birleştirme ile bu
+    adım arasında aynı ürün yeni satır olarak eklendiyse satır atlanır (tekrar çalıştırılınca birleşir).
+    (güncellenen, atlanan) döner.
+    """
+    updated = skipped = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Product.id, Product.product_url, Product.fingerprint)
+            .where(Product.id > last_id).order_by(Product.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return updated, skipped
+        last_id = rows[-1][0]
+
+        updates = []
+        for product_id, url, stored in rows:
+            canonical, fingerprint = product_identity(url)
+            if canonical != url or fingerprint != stored:
+                updates.append({'id': product_id, 'product_url': canonical, 'fingerprint': fingerprint})
+        if not updates:
+            continue
+
+        try:
+            db.session.execute(db.update(Product), updates)
+            db.session.commit()
+            updated += len(updates)
+        except IntegrityError:
+            db.session.rollback()
+            for update in updates:
+                try:
+                    db.session.execute(db.update(Product), [update])
+                    db.session.commit()
+                    updated += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    skipped += 1
+
+def dedupe_products(dry_run=False, threshold=None, batch_size=20000, merge_batch=500):
+    """Kopya ürünleri bul ve birleştir; fingerprint'leri doldur
+
+    Aynı fingerprint'li satırlar ve aynı platformda başlığı neredeyse aynı olan
+    ürünler (dedup.py, MinHash/LSH) en eski kayıtta birleşir. Kopyaların
+    fingerprint'leri alias olarak kalır: aynı link tekrar gelince kalan ürün güncellenir.
+    """
+    from deals import recompute_deal_status
+    from dedup import THRESHOLD, find_duplicates
+
+    started = time.perf_counter()
+    catalog, stale = load_catalog_identity(batch_size)
+    load_s = time.perf_counter() - started
+
+    groups, stats = find_duplicates(catalog['titles'], catalog['platforms'], catalog['prices'],
+                                    catalog['fingerprints'], threshold or THRESHOLD)
+    stats.update(load_s=load_s, stale=stale, merge_s=0.0, samples=[], backfilled=0, backfill_skipped=0)
+
+    ids, fingerprints, updated = catalog['ids'], catalog['fingerprints'], catalog['updated']
+    merges = []
+    for members in groups:
+        survivor = members[0]  # Katalog id sırasıyla yüklendi: en eski kayıt
+        merges.append({
+            'survivor': ids[survivor],
+            'losers': [ids[i] for i in members[1:]],
+            'fingerprints': {fingerprints[i] for i in members[1:]} - {fingerprints[survivor]},
+            'price_from': ids[max(members, key=lambda i: updated[i])]
+        })
+        if len(stats['samples']) < 10:
+            stats['samples'].append([catalog['titles'][i] for i in members])
+    del catalog
+
+    if dry_run:
+        return stats
+
+    started = time.perf_counter()
+    for i in range(0, len(merges), merge_batch):
+        merge_duplicate_products(merges[i:i + merge_batch])
+        db.session.commit()
+    stats['backfilled'], stats['backfill_skipped'] = backfill_identity(batch_size)
+
+    survivors = [merge['survivor'] for merge in merges]
+    if survivors:
+        # Birleşen geçmişe göre etiketler; taşınan PriceHistory id'leri artımlı işin watermark'ını geçmez
+        recompute_deal_status(db, Product, PriceHistory, survivors, batch_size=5000)
+        db.session.commit()
+    if merges or stats['backfilled']:
+        reconcile_stats()
+        response_cache.invalidate()
+    stats['merge_s'] = time.perf_counter() - started
+    return stats
+
+@app.cli.command('dedupe-products')
+@click.option('--dry-run', is_flag=True, help='Yalnızca kopya gruplarını raporla, yazma')
+@click.option('--threshold', type=float, help='Başlık Jaccard benzerliği alt sınırı (varsayılan 0.85)')
+def dedupe_products_command(dry_run, threshold):
+    """Kopya ürünleri (aynı fingerprint veya benzer başlık) birleştir ve fingerprint'leri doldur"""
+    stats = dedupe_products(dry_run=dry_run, threshold=threshold)
+    for titles in stats['samples']:
+        print(f"   {' | '.join(titles)}")
+    print(f"✅ {stats['products']} ürün: {stats['groups']} kopya grubu, {stats['duplicates']} ürün "
+          f"{'birleşecek' if dry_run else 'birleşti'} (aynı fingerprint {stats['exact_pairs']}, "
+          f"benzer başlık {stats['similar_pairs']} / {stats['candidates']} aday), "
+          f"{stats['stale']} satırın linki/fingerprint'i eski"
+          + ('' if dry_run else f", {stats['backfilled']} güncellendi, {stats['backfill_skipped']} atlandı"))
+    print(f"   yükleme {stats['load_s']:.1f}s, kelimeler {stats['tokenize_s']:.1f}s, LSH {stats['lsh_s']:.1f}s, "
+          f"doğrulama {stats['verify_s']:.1f}s, birleştirme {stats['merge_s']:.1f}s")
+
+# ==================== SCHEDULER STATE ====================
+
+def acquire_lease(name, owner, ttl):
+    """Lease'i al veya yenile; süresi dolmamış başka bir sahip varsa False
+
+    Tek UPDATE koşullu olduğu için iki process aynı anda yalnızca biri kazanır;
+    satır hiç yoksa INSERT'te primary key çakışması kaybedeni belirler.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    result = db.session.execute(
+        db.update(SchedulerLease)
+        .where(SchedulerLease.name == name,
+               db.or_(SchedulerLease.owner == owner, SchedulerLease.expires_at < now))
+        .values(owner=owner, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        db.session.commit()
+        return True
+
+    db.session.add(SchedulerLease(name=name, owner=owner, expires_at=expires_at))
+    try:
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+def release_lease(name, owner):
+    db.session.execute(
+        db.delete(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.owner == owner)
+    )
+    db.session.commit()
+
+def record_job_run(name, status, duration=None, lag=None):
+    """Scheduler işinin sonucunu JobState'e yaz (izleme için /api/admin/jobs)"""
+    state = db.session.get(JobState, name)
+    if state is None:
+        state = JobState(name=name, watermark=0, run_count=0, failure_count=0)
+        db.session.add(state)
+
+    state.last_run_at = datetime.utcnow()
+    state.last_status = status
+    state.last_duration = duration
+    state.last_lag = lag
+    state.run_count = (state.run_count or 0) + 1
+    if status != 'ok':
+        state.failure_count = (state.failure_count or 0) + 1
+    db.session.commit()
+
+# ==================== PRICE ALERTS ====================
+
+ALERT_EVAL_CHUNK = 1000
+
+def price_drops_source(drops):
+    """(product_id, price, previous) listesini tek JSON parametresiyle tablo olarak sun
+
+    Binlerce bind parametresi veya VALUES satırı hem SQLAlchemy'de hem SQLite
+    planner'ında sorgunun kendisinden pahalı; json_each / json_array_elements
+    tek parametreyle aynı join'i verir. Diğer veritabanlarında VALUES kullanılır.
+    """
+    dialect = db.engine.dialect.name
+    columns = (db.column('product_id', db.Integer), db.column('price', db.Float), db.column('previous', db.Float))
+
+    if dialect == 'sqlite':
+        sql = ("SELECT json_extract(value, '$[0]') AS product_id, json_extract(value, '$[1]') AS price, "
+               "json_extract(value, '$[2]') AS previous FROM json_each(:changes)")
+    elif dialect == 'postgresql':
+        sql = ("SELECT (value->>0)::integer AS product_id, (value->>1)::float8 AS price, "
+               "(value->>2)::float8 AS previous FROM json_array_elements(CAST(:changes AS json)) AS value")
+    else:
+        rows = ', '.join(f'({int(product_id)}, {float(price)!r}, {float(previous)!r})'
+                         for product_id, price, previous in drops)
+        return db.text(f'SELECT * FROM (VALUES {rows}) AS changes (product_id, price, previous)').columns(*columns).subquery('changes')
+
+    return db.text(sql).bindparams(changes=json.dumps(drops)).columns(*columns).subquery('changes')
+
+def evaluate_alerts(drops, now=None):
+    """Fiyat düşüşlerinin tetiklediği aktif alarmları outbox'a yaz ve pasife al
+
+    drops: (product_id, price, previous_price) listesi. Hedefi [price, previous_price)
+    aralığında kalan alarmlar, yani bu düşüşle eşiği yeni geçenler tetiklenir;
+    hiç tetiklenmemiş (triggered_at NULL) alarmlar ise hedef >= price olduğu ilk
+    değerlendirmede tetiklenir (fiyat zaten hedefin altındayken kurulan alarmlar).
+    price == previous_price ile çağrı yalnızca bu ikinci koşulu değerlendirir.
+    Düşüşler alarmlarla join edilir; her ürün için (product_id, target_price)
+    kısmi index'inde tek aralık taraması yapılır ve eşleşmeler INSERT ... SELECT
+    ile doğrudan outbox'a yazılır; RETURNING ile dönen alarmlar pasife alınır,
+    tetiklenmeyen alarmlara dokunulmaz.
+    Commit çağırana aittir.
+    """
+    now = now or datetime.utcnow()
+    drops = [drop for drop in drops if math.isfinite(drop[1]) and math.isfinite(drop[2])]
+    triggered_ids = []
+
+    for i in range(0, len(drops), ALERT_EVAL_CHUNK):
+        changes = price_drops_source(drops[i:i + ALERT_EVAL_CHUNK])
+        matches = (
+            db.select(PriceAlert.id, PriceAlert.user_id, PriceAlert.product_id, PriceAlert.target_price,
+                      changes.c.price, changes.c.previous, db.literal(now, db.DateTime))
+            .select_from(changes)
+            .join(PriceAlert, db.and_(
+                PriceAlert.product_id == changes.c.product_id,
+                PriceAlert.target_price >= changes.c.price,
+                db.or_(PriceAlert.target_price < changes.c.previous, PriceAlert.triggered_at.is_(None))
+            ))
+            .where(PriceAlert.is_active == True)  # noqa: E712 (kısmi index koşulu)
+        )
+        # Eşzamanlı başka bir değerlendirmenin satırları karışmasın diye max(id) yerine RETURNING
+        triggered_ids.extend(db.session.execute(
+            db.insert(AlertOutbox).from_select(
+                ['alert_id', 'user_id', 'product_id', 'target_price', 'price', 'previous_price', 'created_at'],
+                matches
+            ).returning(AlertOutbox.alert_id)
+        ).scalars())
+
+    for i in range(0, len(triggered_ids), ALERT_EVAL_CHUNK):
+        db.session.execute(
+            db.update(PriceAlert)
+            .where(PriceAlert.id.in_(triggered_ids[i:i + ALERT_EVAL_CHUNK]))
+            .values(is_active=False, triggered_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    if triggered_ids:
+        print(f"🔔 {len(triggered_ids)} fiyat alarmı tetiklendi")
+    return len(triggered_ids)
+
+def alert_item(alert, product=None):
+    item = {
+        'id': alert.id,
+        'product_id': alert.product_id,
+        'target_price': alert.target_price,
+        'is_active': alert.is_active,
+        'created_at': alert.created_at.isoformat() if alert.created_at else None,
+        'triggered_at': alert.triggered_at.isoformat() if alert.triggered_at else None
+    }
+    if product is not None:
+        item['product'] = {
+            'title': product.title,
+            'platform': product.platform,
+            'current_price': product.current_price,
+            'image_url': product.image_url
+        }
+    return item
+
+# ==================== AUTH CACHE ====================
+
+# Dekoratörlerin view'lara geçtiği kullanıcı; ORM satırı gerekiyorsa User.query.get(current_user.id)
+AuthUser = namedtuple('AuthUser', ['id', 'email', 'is_premium', 'is_admin'])
+
+token_cache = TTLCache(app.config['AUTH_CACHE_MAX_ENTRIES'], app.config['AUTH_CACHE_TTL'])
+principal_cache = TTLCache(app.config['AUTH_CACHE_MAX_ENTRIES'], app.config['AUTH_CACHE_TTL'])
+
+def decode_token(token):
+    """jwt.decode ile aynı hatalar; imzası doğrulanmış claim'ler exp'e kadar cache'lenir"""
+    claims = token_cache.get(token)
+    if claims is not None:
+        if 'exp' in claims and claims['exp'] <= time.time():
+            token_cache.pop(token)
+            raise jwt.ExpiredSignatureError('Signature has expired')
+        return claims
+
+    claims = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+    ttl = app.config['AUTH_CACHE_TTL']
+    if 'exp' in claims:
+        ttl = min(ttl, claims['exp'] - time.time())
+    token_cache.set(token, claims, ttl=ttl)
+    return claims
+
+def load_principal(user_id):
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        principal = AuthUser(user.id, user.email, bool(user.is_premium), bool(user.is_admin))
+        principal_cache.set(user_id, principal)
+    return principal
+
+@db.event.listens_for(db.session, 'after_flush')
+def evict_changed_users(session, flush_context):
+    """Değişen/silinen kullanıcıların principal'ını bu worker'da hemen düşür"""
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            principal_cache.pop(obj.id)
 
 # ==================== AUTH DECORATOR ====================
 
@@ -102,8 +1106,8 @@ def token_required(f):
             if token.startswith('Bearer '):
                 token = token.replace('Bearer ', '')
             
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data['user_id'])
+            data = decode_token(token)
+            current_user = load_principal(data['user_id'])
             
             if not current_user:
                 return jsonify({'message': 'User not found'}), 401
@@ -131,8 +1135,8 @@ def admin_required(f):
             if token.startswith('Bearer '):
                 token = token.replace('Bearer ', '')
             
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data['user_id'])
+            data = decode_token(token)
+            current_user = load_principal(data['user_id'])
             
             if not current_user or not current_user.is_admin:
                 return jsonify({'message': 'Admin access required'}), 403
@@ -158,9 +1162,25 @@ def health():
     return jsonify({
         'status': 'healthy',
         'database': db_status,
+        'password_hashing': password_hasher.stats(),
         'timestamp': datetime.utcnow().isoformat()
     })
 
+def render_metrics(current_user=None):
+    body, content_type = request_metrics.render()
+    return Response(body, content_type=content_type)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text formatı: route gecikmeleri, SQL, yanıt boyutu, pool ve scheduler işleri
+    
+    METRICS_TOKEN ile (scraper) veya admin JWT ile erişilir; varsayılan olarak açık değildir.
+    """
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return render_metrics()
+    return admin_required(render_metrics)()
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({
@@ -201,7 +1221,7 @@ def register():
             return jsonify({'message': 'Email already registered'}), 409
         
         # Create user
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        hashed_password = password_hasher.hash(password)
         new_user = User(email=email, password=hashed_password)
         
         db.session.add(new_user)
@@ -224,6 +1244,9 @@ def register():
             }
         }), 201
     
+    except HashingBusy:
+        return jsonify({'message': 'Server busy, try again'}), 503, {'Retry-After': '1'}
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Registration failed', 'error': str(e)}), 500
@@ -239,9 +1262,14 @@ def login():
         email = data['email'].strip().lower()
         user = User.query.filter_by(email=email).first()
         
-        if not user or not check_password_hash(user.password, data['password']):
+        if not user or not password_hasher.check(user.password, data['password']):
             return jsonify({'message': 'Invalid credentials'}), 401
         
+        # İş faktörü değiştiyse parolayı yeni yöntemle yeniden hash'le
+        if password_hasher.needs_rehash(user.password):
+            user.password = password_hasher.hash(data['password'])
+            db.session.commit()
+        
         token = jwt.encode({
             'user_id': user.id,
             'exp': datetime.utcnow() + timedelta(days=30)
@@ -257,99 +1285,583 @@ def login():
             }
         })
     
+    except HashingBusy:
+        return jsonify({'message': 'Server busy, try again'}), 503, {'Retry-After': '1'}
+    
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': 'Login failed', 'error': str(e)}), 500
 
+@app.route('/api/auth/me', methods=['GET'])
+@token_required
+def get_me(current_user):
+    return jsonify({'user': current_user._asdict()})
+
+# ==================== FAVORITE ROUTES ====================
+
+FAVORITES_MAX_PER_PAGE = 100
+
+def latest_price_subquery():
+    """Ürünün en son PriceHistory noktasının id'si (ix_price_history_product_recorded)"""
+    return (
+        db.select(PriceHistory.id)
+        .where(PriceHistory.product_id == Product.id)
+        .order_by(PriceHistory.recorded_at.desc(), PriceHistory.id.desc())
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+@app.route('/api/favorites', methods=['GET'])
+@token_required
+def get_favorites(current_user):
+    """Favoriler, ürünleri ve son fiyat noktasıyla tek sorguda (favori sayısından bağımsız)"""
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), FAVORITES_MAX_PER_PAGE)
+        
+        try:
+            serializer = product_serializer(default=DETAIL_FIELDS)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Ürün kolonları önce: serializer satırdaki konumlarıyla okur
+        width = len(serializer.column_names)
+        rows = db.session.execute(
+            db.select(*serializer.columns(Product), Favorite.id, Favorite.created_at,
+                      PriceHistory.price, PriceHistory.recorded_at, PriceHistory.last_seen_at)
+            .select_from(Favorite)
+            .join(Product, Product.id == Favorite.product_id)
+            .outerjoin(PriceHistory, PriceHistory.id == latest_price_subquery())
+            .where(Favorite.user_id == current_user.id)
+            .order_by(Favorite.created_at.desc(), Favorite.id.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        ).all()
+        
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(Favorite).where(Favorite.user_id == current_user.id)
+        ).scalar()
+        
+        favorites = []
+        for row in rows:
+            favorite_id, created_at, price, recorded_at, last_seen_at = row[width:]
+            favorites.append({
+                'id': favorite_id,
+                'created_at': created_at,
+                'product': serializer.one(row),
+                'latest_price': {
+                    'price': price,
+                    'recorded_at': recorded_at,
+                    'last_seen_at': last_seen_at
+                } if price is not None else None
+            })
+        
+        return json_response({
+            'favorites': favorites,
+            'total': total,
+            'pages': -(-total // per_page),
+            'current_page': page,
+            'per_page': per_page
+        })
+    
+    except Exception as e:
+        return jsonify({'message': 'Error fetching favorites', 'error': str(e)}), 500
+
+@app.route('/api/favorites', methods=['POST'])
+@token_required
+def add_favorite(current_user):
+    try:
+        data = request.get_json()
+        
+        if not data or 'product_id' not in data:
+            return jsonify({'message': 'product_id required'}), 400
+        
+        product = db.session.get(Product, data['product_id'])
+        if product is None:
+            return jsonify({'message': 'Product not found'}), 404
+        
+        existing = Favorite.query.filter_by(user_id=current_user.id, product_id=product.id).first()
+        if existing:
+            return jsonify({'message': 'Already in favorites', 'id': existing.id}), 200
+        
+        favorite = Favorite(user_id=current_user.id, product_id=product.id)
+        db.session.add(favorite)
+        db.session.commit()
+        
+        return jsonify({'message': 'Added to favorites', 'id': favorite.id}), 201
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error adding favorite', 'error': str(e)}), 500
+
+@app.route('/api/favorites/<int:product_id>', methods=['DELETE'])
+@token_required
+def remove_favorite(current_user, product_id):
+    try:
+        deleted = Favorite.query.filter_by(user_id=current_user.id, product_id=product_id).delete()
+        db.session.commit()
+        
+        if not deleted:
+            return jsonify({'message': 'Favorite not found'}), 404
+        
+        return jsonify({'message': 'Removed from favorites', 'product_id': product_id})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error removing favorite', 'error': str(e)}), 500
+
+# ==================== ALERT ROUTES ====================
+
+def parse_target_price(value):
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+@app.route('/api/alerts', methods=['GET'])
+@token_required
+def get_alerts(current_user):
+    try:
+        rows = (
+            db.session.query(PriceAlert, Product)
+            .join(Product, Product.id == PriceAlert.product_id)
+            .filter(PriceAlert.user_id == current_user.id)
+            .order_by(PriceAlert.created_at.desc(), PriceAlert.id.desc())
+            .all()
+        )
+        return jsonify({'alerts': [alert_item(alert, product) for alert, product in rows]})
+    
+    except Exception as e:
+        return jsonify({'message': 'Error fetching alerts', 'error': str(e)}), 500
+
+@app.route('/api/alerts', methods=['POST'])
+@token_required
+def create_alert(current_user):
+    try:
+        data = request.get_json()
+        
+        if not data or 'product_id' not in data or 'target_price' not in data:
+            return jsonify({'message': 'product_id and target_price required'}), 400
+        
+        target_price = parse_target_price(data['target_price'])
+        if target_price is None:
+            return jsonify({'message': 'target_price must be a positive number'}), 400
+        
+        product = db.session.get(Product, data['product_id'])
+        if product is None:
+            return jsonify({'message': 'Product not found'}), 404
+        
+        alert = PriceAlert(user_id=current_user.id, product_id=product.id, target_price=target_price)
+        db.session.add(alert)
+        db.session.flush()
+        # Fiyat zaten hedefte veya altındaysa bir sonraki düşüşü beklemeden tetiklenir
+        evaluate_alerts([(product.id, product.current_price, product.current_price)])
+        db.session.commit()
+        
+        return jsonify({'message': 'Alert created', 'alert': alert_item(alert, product)}), 201
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error creating alert', 'error': str(e)}), 500
+
+@app.route('/api/alerts/<int:alert_id>', methods=['PUT'])
+@token_required
+def update_alert(current_user, alert_id):
+    """Hedef fiyatı değiştir veya alarmı (yeniden) aktifleştir/durdur"""
+    try:
+        alert = PriceAlert.query.filter_by(id=alert_id, user_id=current_user.id).first()
+        if alert is None:
+            return jsonify({'message': 'Alert not found'}), 404
+        
+        data = request.get_json() or {}
+        
+        if 'target_price' in data:
+            target_price = parse_target_price(data['target_price'])
+            if target_price is None:
+                return jsonify({'message': 'target_price must be a positive number'}), 400
+            alert.target_price = target_price
+        
+        if 'is_active' in data:
+            alert.is_active = bool(data['is_active'])
+            if alert.is_active:
+                alert.triggered_at = None
+        
+        if alert.is_active:
+            db.session.flush()
+            product = db.session.get(Product, alert.product_id)
+            evaluate_alerts([(product.id, product.current_price, product.current_price)])
+        db.session.commit()
+        
+        return jsonify({'message': 'Alert updated', 'alert': alert_item(alert)})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error updating alert', 'error': str(e)}), 500
+
+@app.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
+@token_required
+def delete_alert(current_user, alert_id):
+    try:
+        alert = PriceAlert.query.filter_by(id=alert_id, user_id=current_user.id).first()
+        if alert is None:
+            return jsonify({'message': 'Alert not found'}), 404
+        
+        AlertOutbox.query.filter_by(alert_id=alert.id).delete()
+        db.session.delete(alert)
+        db.session.commit()
+        
+        return jsonify({'message': 'Alert deleted', 'id': alert_id})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Error deleting alert', 'error': str(e)}), 500
+
+# ==================== PAGINATION HELPERS ====================
+
+APPROX_COUNT_CAP = 10000
+CURSOR_MAX_PER_PAGE = 100
+
+def encode_cursor(product):
+    """(discount_percent, created_at, id) sıralama anahtarından opak cursor"""
+    key = [product.discount_percent, product.created_at.isoformat(), product.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    discount, created_at, product_id = json.loads(base64.urlsafe_b64decode(padded))
+    return int(discount), datetime.fromisoformat(created_at), int(product_id)
+
+def count_products(query, mode):
+    """count=exact | approx | none; approx PostgreSQL'de planner tahmini, diğerlerinde üst sınırlı sayım"""
+    if mode == 'none':
+        return None, False
+    if mode == 'approx':
+        if db.engine.dialect.name == 'postgresql':
+            sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+            plan = db.session.execute(db.text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+            return int(plan[0]['Plan']['Plan Rows']), True
+        capped = query.order_by(None).limit(APPROX_COUNT_CAP + 1).subquery()
+        total = db.session.execute(db.select(db.func.count()).select_from(capped)).scalar()
+        return min(total, APPROX_COUNT_CAP), total > APPROX_COUNT_CAP
+    return query.order_by(None).count(), False
+
+def filter_products(query, category, platform, search, ranked=True):
+    """Liste ve export endpoint'lerinin ortak category/platform/search filtreleri"""
+    # Category filter
+    if category and category not in ['all', 'Tümü', '']:
+        query = query.filter(Product.category.ilike(f'%{category}%'))
+    
+    # Platform filter
+    if platform and platform != '':
+        query = query.filter_by(platform=platform)
+    
+    # Search filter (Türkçe normalize, index'li)
+    if search:
+        query = apply_search(db, Product, query, search, ranked=ranked)
+    
+    return query
+
+# Cursor modunda yanıtta istenmese de sorgulanan sıralama anahtarı
+CURSOR_COLUMNS = ('discount_percent', 'created_at', 'id')
+
+def product_serializer(default=DETAIL_FIELDS, extra=()):
+    """?fields=id,title,... ve ?compact=1 parametrelerinden serializer (bilinmeyen alan: ValueError)"""
+    fields = parse_fields(request.args.get('fields'), compact=request.args.get('compact') == '1', default=default)
+    return ProductSerializer(fields, extra=extra)
+
 # ==================== PRODUCT ROUTES ====================
 
 @app.route('/api/products', methods=['GET'])
+@response_cache.cached
 def get_products():
     try:
         # Query parameters
         category = request.args.get('category', '')
         platform = request.args.get('platform', '')
         search = request.args.get('search', '').strip()
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 100))
-        
-        query = Product.query
-        
-        # Category filter
-        if category and category not in ['all', 'Tümü', '']:
-            query = query.filter(Product.category.ilike(f'%{category}%'))
-        
-        # Platform filter
-        if platform and platform != '':
-            query = query.filter_by(platform=platform)
-        
-        # Search filter
-        if search:
-            query = query.filter(
-                or_(
-                    Product.title.ilike(f'%{search}%'),
-                    Product.platform.ilike(f'%{search}%'),
-                    Product.category.ilike(f'%{search}%')
-                )
-            )
+        try:
+            page = int(request.args.get('page', 1))
+            per_page = int(request.args.get('per_page', 100))
+        except ValueError:
+            return jsonify({'message': 'page and per_page must be integers'}), 400
+        cursor = request.args.get('cursor')  # Verilirse keyset modu ('' = ilk sayfa)
+        count_mode = request.args.get('count', 'none' if cursor is not None else 'exact')
+        
+        if count_mode not in ('exact', 'approx', 'none'):
+            return jsonify({'message': 'count must be exact, approx or none'}), 400
+        
+        # Sparse fieldset: yalnızca istenen alanların kolonları seçilir (ORM entity'si yok)
+        try:
+            serializer = product_serializer(LIST_FIELDS, extra=CURSOR_COLUMNS if cursor is not None else ())
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
-        # Order by discount and date
-        query = query.order_by(
+        # Cursor modunda alaka sıralaması yok (keyset anahtarı bozulmasın)
+        query = filter_products(Product.query, category, platform, search, ranked=cursor is None)
+        
+        # Order by discount and date (id: deterministic tie-break, keyset anahtarı)
+        ordered = query.with_entities(*serializer.columns(Product)).order_by(
             Product.discount_percent.desc(), 
-            Product.created_at.desc()
+            Product.created_at.desc(),
+            Product.id.desc()
         )
         
-        # Pagination
-        products = query.paginate(page=page, per_page=per_page, error_out=False)
+        # Cursor (keyset) pagination: OFFSET taraması yok, her sayfa aynı maliyette.
+        # created_at'i NULL olan (eski) satırlar tuple karşılaştırmasıyla sıralanamaz;
+        # init_db bunları doldurur, cursor modu yine de dışarıda bırakır
+        if cursor is not None:
+            per_page = min(max(per_page, 1), CURSOR_MAX_PER_PAGE)
+            ordered = ordered.filter(Product.created_at.isnot(None))
+            if cursor:
+                try:
+                    key = decode_cursor(cursor)
+                except (ValueError, TypeError):
+                    return jsonify({'message': 'Invalid cursor'}), 400
+                ordered = ordered.filter(
+                    tuple_(Product.discount_percent, Product.created_at, Product.id) < key
+                )
+            
+            items = ordered.limit(per_page + 1).all()
+            has_more = len(items) > per_page
+            items = items[:per_page]
+            
+            result = {
+                'products': serializer.many(items),
+                'next_cursor': encode_cursor(items[-1]) if has_more else None,
+                'per_page': per_page
+            }
+            if count_mode != 'none':
+                result['total'], result['total_approximate'] = count_products(query, count_mode)
+            return json_response(result)
         
-        return jsonify({
-            'products': [{
-                'id': p.id,
-                'title': p.title,
-                'platform': p.platform,
-                'category': p.category,
-                'current_price': float(p.current_price),
-                'original_price': float(p.original_price),
-                'discount_percent': p.discount_percent,
-                'image_url': p.image_url,
-                'image': p.image_url,  # Compatibility
-                'product_url': p.product_url,
-                'url': p.product_url,  # Compatibility
-                'real_deal_status': p.real_deal_status,
-                'created_at': p.created_at.isoformat() if p.created_at else None,
-                'updated_at': p.updated_at.isoformat() if p.updated_at else None
-            } for p in products.items],
-            'total': products.total,
-            'pages': products.pages,
+        # Offset pagination (uyumluluk)
+        products = ordered.paginate(page=page, per_page=per_page, error_out=False, count=False)
+        total, approximate = count_products(query, count_mode)
+        
+        result = {
+            'products': serializer.many(products.items),
+            'total': total,
+            'pages': -(-total // per_page) if total is not None and per_page > 0 else None,
             'current_page': products.page,
             'per_page': per_page
-        })
+        }
+        if approximate:
+            result['total_approximate'] = True
+        return json_response(result)
     
     except Exception as e:
         return jsonify({'message': 'Error fetching products', 'error': str(e)}), 500
 
+EXPORT_BATCH_SIZE = 2000
+
+@app.route('/api/products/export', methods=['GET'])
+def export_products():
+    """Tüm kataloğu NDJSON veya CSV olarak stream et (sabit bellek, server-side cursor)
+    
+    updated_since verilirse yalnızca o andan sonra değişen ürünler (updated_at, id)
+    sırasıyla döner (artımlı senkron); kesilen export son satırın updated_at ve
+    id'si ile (updated_since + after_id) kaldığı yerden sürdürülür.
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({'message': 'format must be ndjson or csv'}), 400
+        
+        try:
+            serializer = product_serializer()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        query = filter_products(
+            Product.query,
+            request.args.get('category', ''),
+            request.args.get('platform', ''),
+            request.args.get('search', '').strip(),
+            ranked=False
+        )
+        
+        # Tam export id (PK) sırasıyla; artımlı export ix_product_updated üzerinde keyset
+        order = (Product.id,)
+        updated_since = request.args.get('updated_since')
+        if updated_since:
+            try:
+                since = datetime.fromisoformat(updated_since)
+            except ValueError:
+                return jsonify({'message': 'updated_since must be an ISO 8601 datetime'}), 400
+            after_id = request.args.get('after_id', type=int)
+            if after_id is None:
+                query = query.filter(Product.updated_at > since)
+            else:
+                query = query.filter(tuple_(Product.updated_at, Product.id) > (since, after_id))
+            order = (Product.updated_at, Product.id)
+        
+        statement = (
+            query.with_entities(*serializer.columns(Product))
+            .order_by(*order)
+            .statement
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        
+        def generate():
+            result = db.session.execute(statement)
+            first = True
+            for rows in result.partitions():
+                if export_format == 'csv':
+                    yield csv_chunk(serializer, rows, header=first)
+                else:
+                    yield ndjson_chunk(serializer, rows)
+                first = False
+            if first and export_format == 'csv':
+                yield csv_chunk(serializer, [], header=True)
+        
+        filename = f'products.{export_format}'
+        return Response(
+            stream_with_context(generate()),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    
+    except Exception as e:
+        return jsonify({'message': 'Error exporting products', 'error': str(e)}), 500
+
 @app.route('/api/products/<int:product_id>', methods=['GET'])
+@response_cache.cached
 def get_product(product_id):
     try:
-        product = Product.query.get_or_404(product_id)
+        try:
+            serializer = product_serializer()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
-        return jsonify({
-            'id': product.id,
-            'title': product.title,
-            'platform': product.platform,
-            'category': product.category,
-            'current_price': float(product.current_price),
-            'original_price': float(product.original_price),
-            'discount_percent': product.discount_percent,
-            'image_url': product.image_url,
-            'product_url': product.product_url,
-            'real_deal_status': product.real_deal_status,
-            'created_at': product.created_at.isoformat(),
-            'updated_at': product.updated_at.isoformat()
-        })
+        row = db.session.execute(
+            db.select(*serializer.columns(Product)).where(Product.id == product_id)
+        ).first()
+        if row is None:
+            return jsonify({'message': 'Product not found'}), 404
+        
+        return json_response(serializer.one(row))
     
     except Exception as e:
         return jsonify({'message': 'Product not found', 'error': str(e)}), 404
 
+HISTORY_MAX_POINTS = 5000
+# Python'a okunan en fazla satır; aralık daha uzunsa SQL'de min/max bucket'larına indirilir
+HISTORY_FETCH_ROWS = 20000
+
+def parse_history_bound(name):
+    """ISO 8601 sınırı naive UTC'ye çevir (recorded_at naive UTC saklanır; offset'li değerler dönüştürülür)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    bound = datetime.fromisoformat(value)
+    if bound.tzinfo is not None:
+        bound = bound.astimezone(timezone.utc).replace(tzinfo=None)
+    return bound
+
+def history_buckets(series, total, buckets):
+    """Seriyi zaman sırasına göre eşit satırlı bucket'lara böl, her bucket'ın min ve max noktası
+
+    Sıra numarası ve bucket window fonksiyonlarıyla SQL'de hesaplanır; Python'a en fazla
+    2 * buckets satır gelir. timeseries.minmax ile aynı bölme.
+    """
+    order = (PriceHistory.recorded_at, PriceHistory.id)
+    numbered = series.add_columns(
+        PriceHistory.id,
+        ((db.func.row_number().over(order_by=order) - 1) * buckets // total).label('bucket')
+    ).subquery()
+    ranked = db.select(
+        numbered.c.recorded_at, numbered.c.price, numbered.c.id,
+        db.func.row_number().over(partition_by=numbered.c.bucket,
+                                  order_by=(numbered.c.price, numbered.c.id)).label('low'),
+        db.func.row_number().over(partition_by=numbered.c.bucket,
+                                  order_by=(numbered.c.price.desc(), numbered.c.id)).label('high')
+    ).subquery()
+    return (
+        db.select(ranked.c.recorded_at, ranked.c.price)
+        .where(db.or_(ranked.c.low == 1, ranked.c.high == 1))
+        .order_by(ranked.c.recorded_at, ranked.c.id)
+    )
+
+@app.route('/api/products/<int:product_id>/history', methods=['GET'])
+@response_cache.cached
+def get_product_history(product_id):
+    """Fiyat geçmişi; from/to aralığı, points=N ile sunucu tarafında örnek azaltma
+    
+    Geçmiş yalnızca fiyat değişimlerini tutar; aralığın başındaki fiyat için
+    from'dan önceki son nokta da seriye eklenir. Aralık HISTORY_FETCH_ROWS'tan
+    uzunsa önce SQL'de min/max bucket'larına indirilir; points verilmemişse bu
+    indirilmiş seri döner.
+    """
+    try:
+        try:
+            start = parse_history_bound('from')
+            end = parse_history_bound('to')
+        except ValueError:
+            return jsonify({'message': 'from/to must be ISO 8601 datetimes'}), 400
+        
+        method = request.args.get('method', 'lttb')
+        if method not in DOWNSAMPLE_METHODS:
+            return jsonify({'message': 'method must be lttb or minmax'}), 400
+        
+        points = request.args.get('points')
+        if points is not None:
+            try:
+                points = int(points)
+            except ValueError:
+                points = 0
+            if not 3 <= points <= HISTORY_MAX_POINTS:
+                return jsonify({'message': f'points must be between 3 and {HISTORY_MAX_POINTS}'}), 400
+        
+        if db.session.get(Product, product_id) is None:
+            return jsonify({'message': 'Product not found'}), 404
+        
+        # ix_price_history_product_recorded: ürün içinde zaman sıralı aralık taraması;
+        # recorded_at'i NULL eski satırlar zaman ekseninde yer almaz
+        series = db.select(PriceHistory.recorded_at, PriceHistory.price).where(
+            PriceHistory.product_id == product_id, PriceHistory.recorded_at.isnot(None)
+        )
+        rows = []
+        if start is not None:
+            carry = db.session.execute(
+                series.where(PriceHistory.recorded_at < start)
+                .order_by(PriceHistory.recorded_at.desc(), PriceHistory.id.desc())
+                .limit(1)
+            ).first()
+            if carry is not None:
+                rows.append(carry)
+            series = series.where(PriceHistory.recorded_at >= start)
+        if end is not None:
+            series = series.where(PriceHistory.recorded_at <= end)
+        
+        in_range = db.session.execute(db.select(db.func.count()).select_from(series.subquery())).scalar()
+        total = len(rows) + in_range
+        if in_range > HISTORY_FETCH_ROWS:
+            series = history_buckets(series, in_range, HISTORY_FETCH_ROWS // 2)
+        else:
+            series = series.order_by(PriceHistory.recorded_at, PriceHistory.id)
+        # Core seviyesinde çalıştır: 100k satırda ORM satır işleme sorgunun kendisi kadar sürüyor
+        rows.extend(db.session.connection().execute(series).all())
+        
+        if points is not None and len(rows) > points:
+            xs = [row[0].timestamp() for row in rows]
+            ys = [row[1] for row in rows]
+            rows = [rows[i] for i in downsample(xs, ys, points, method)]
+        elif len(rows) < total:
+            method = 'minmax'
+        
+        return json_response({
+            'product_id': product_id,
+            'points': [{'recorded_at': recorded_at, 'price': price} for recorded_at, price in rows],
+            'total_points': total,
+            'downsampled': len(rows) < total,
+            'method': method if len(rows) < total else None
+        })
+    
+    except Exception as e:
+        return jsonify({'message': 'Error fetching price history', 'error': str(e)}), 500
+
 # ==================== ADMIN ROUTES ====================
 
 @app.route('/api/admin/products', methods=['POST'])
@@ -369,6 +1881,17 @@ def create_product():
             ((float(data['original_price']) - float(data['current_price'])) / float(data['original_price'])) * 100
         )
         
+        # Aynı ürün zaten var mı? (fingerprint, alias, kanonik link; fingerprint'siz eski satırlarda platform+başlık)
+        product_url, fingerprint = product_identity(data['product_url'])
+        existing_id = resolve_products([{
+            'fingerprint': fingerprint,
+            'product_url': product_url,
+            'platform': data['platform'],
+            'title': data['title']
+        }])[0]
+        if existing_id:
+            return jsonify({'message': 'Product already exists', 'id': existing_id}), 409
+        
         # Create product
         product = Product(
             title=data['title'],
@@ -378,7 +1901,7 @@ def create_product():
             original_price=float(data['original_price']),
             discount_percent=discount,
             image_url=data['image_url'],
-            product_url=data['product_url'],
+            product_url=product_url,
             real_deal_status=data.get('real_deal_status', 'real')
         )
         
@@ -392,6 +1915,7 @@ def create_product():
         )
         db.session.add(history)
         db.session.commit()
+        response_cache.invalidate()
         
         return jsonify({
             'message': 'Product created successfully',
@@ -433,18 +1957,18 @@ def update_product(product_id):
         if 'current_price' in data or 'original_price' in data:
             current = float(data.get('current_price', product.current_price))
             original = float(data.get('original_price', product.original_price))
+            previous = product.current_price
             
             product.current_price = current
             product.original_price = original
             product.discount_percent = round(((original - current) / original) * 100)
             
-            # Add price history if price changed
-            if current != product.current_price:
-                history = PriceHistory(product_id=product.id, price=current)
-                db.session.add(history)
+            # Add price history only if price changed
+            record_prices([(product.id, current, previous)])
         
         product.updated_at = datetime.utcnow()
         db.session.commit()
+        response_cache.invalidate()
         
         return jsonify({
             'message': 'Product updated successfully',
@@ -469,10 +1993,13 @@ def delete_product(product_id):
         # Delete related records
         PriceHistory.query.filter_by(product_id=product_id).delete()
         Favorite.query.filter_by(product_id=product_id).delete()
+        AlertOutbox.query.filter_by(product_id=product_id).delete()
         PriceAlert.query.filter_by(product_id=product_id).delete()
+        ProductAlias.query.filter_by(product_id=product_id).delete()
         
         db.session.delete(product)
         db.session.commit()
+        response_cache.invalidate()
         
         return jsonify({
             'message': 'Product deleted successfully',
@@ -483,35 +2010,65 @@ def delete_product(product_id):
         db.session.rollback()
         return jsonify({'message': 'Error deleting product', 'error': str(e)}), 500
 
+@app.route('/api/admin/jobs', methods=['GET'])
+@admin_required
+def get_jobs(current_user):
+    """Scheduler lideri ve işlerin son çalışma süresi, gecikmesi ve sonucu"""
+    try:
+        lease = db.session.get(SchedulerLease, 'scheduler')
+        states = JobState.query.order_by(JobState.name).all()
+        
+        return jsonify({
+            'leader': {
+                'owner': lease.owner,
+                'expires_at': lease.expires_at.isoformat()
+            } if lease else None,
+            'jobs': [{
+                'name': state.name,
+                'last_run_at': state.last_run_at.isoformat() if state.last_run_at else None,
+                'last_status': state.last_status,
+                'last_duration': state.last_duration,
+                'last_lag': state.last_lag,
+                'run_count': state.run_count or 0,
+                'failure_count': state.failure_count or 0
+            } for state in states]
+        })
+    
+    except Exception as e:
+        return jsonify({'message': 'Error fetching jobs', 'error': str(e)}), 500
+
 # ==================== BOT ENTEGRASYONU ====================
 
 @app.route('/api/bot/products', methods=['POST'])
 def add_bot_product():
     """Telegram botundan gelen hazır verileri kaydeder"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         # 1. Veri Kontrolü
-        if not data or 'title' not in data or 'product_url' not in data:
-            return jsonify({'message': 'Eksik veri'}), 400
+        fields, error = bot_product_fields(data)
+        if error:
+            return jsonify({'message': error}), 400
 
-        # 2. Duplicate Kontrolü (Aynı link var mı?)
-        existing = Product.query.filter_by(product_url=data['product_url']).first()
+        # 2. Duplicate Kontrolü (aynı ürün: fingerprint, alias, kanonik link; eski satırlarda platform+başlık)
+        product_id = resolve_products([fields])[0]
+        existing = db.session.get(Product, product_id) if product_id else None
         if existing:
-            return jsonify({'message': 'Bu ürün zaten var', 'id': existing.id}), 200
+            # Fiyat gözlemini kaydet: değiştiyse ürünü ve geçmişi güncelle
+            changed = False
+            if 'current_price' in data:
+                previous = existing.current_price
+                changed = price_changed(fields['current_price'], previous)
+                if changed:
+                    apply_bot_price(existing, data, fields, datetime.utcnow())
+                record_prices([(existing.id, existing.current_price, previous)])
+                db.session.commit()
+                if changed:
+                    response_cache.invalidate()
+            return jsonify({'message': 'Bu ürün zaten var', 'id': existing.id, 'price_changed': changed}), 200
 
         # 3. Ürünü Oluştur (Bot zaten her şeyi ayrıştırıp gönderiyor)
-        new_product = Product(
-            title=data.get('title', 'Başlık Yok'),
-            platform=data.get('platform', 'Diğer'),
-            category=data.get('category', 'Genel'),
-            current_price=data.get('current_price', 0),
-            original_price=data.get('original_price', 0),
-            discount_percent=data.get('discount_percent', 0),
-            image_url=data.get('image_url', ''),
-            product_url=data.get('product_url', ''),
-            real_deal_status=data.get('real_deal_status', 'normal')
-        )
+        new_product = Product(**fields)
         
         db.session.add(new_product)
         db.session.commit()
@@ -520,6 +2077,7 @@ def add_bot_product():
         history = PriceHistory(product_id=new_product.id, price=new_product.current_price)
         db.session.add(history)
         db.session.commit()
+        response_cache.invalidate()
         
         return jsonify({'message': '✅ Bot ürünü ekledi!', 'id': new_product.id}), 201
 
@@ -528,46 +2086,342 @@ def add_bot_product():
         print(f"Bot Ekleme Hatası: {e}")
         return jsonify({'message': 'Sunucu hatası', 'error': str(e)}), 500
 
+# Bot öğesindeki metin alanları ve varsayılanları
+BOT_TEXT_FIELDS = {
+    'title': 'Başlık Yok',
+    'platform': 'Diğer',
+    'category': 'Genel',
+    'image_url': '',
+    'product_url': '',
+    'real_deal_status': 'normal'
+}
+
+def bot_product_fields(data):
+    """Bot öğesini Product alanlarına çevir; (alanlar, hata mesajı) döner
+    
+    Hatalı öğe yalnızca kendisini geçersiz kılar: metin alanları string,
+    fiyatlar sonlu sayı olmalıdır (NaN/inf float() ile geçer, burada reddedilir).
+    """
+    if not isinstance(data, dict) or 'title' not in data or 'product_url' not in data:
+        return None, 'Eksik veri'
+    fields = {name: data.get(name, default) for name, default in BOT_TEXT_FIELDS.items()}
+    if not all(isinstance(value, str) for value in fields.values()):
+        return None, 'Geçersiz metin alanı'
+    try:
+        fields['current_price'] = float(data.get('current_price', 0))
+        fields['original_price'] = float(data.get('original_price', 0))
+        fields['discount_percent'] = int(data.get('discount_percent', 0))
+    except (TypeError, ValueError, OverflowError):
+        return None, 'Geçersiz sayısal alan'
+    if not (math.isfinite(fields['current_price']) and math.isfinite(fields['original_price'])):
+        return None, 'Geçersiz sayısal alan'
+    try:
+        fields['product_url'], fields['fingerprint'] = product_identity(fields['product_url'])
+    except ValueError:
+        return None, 'Geçersiz link'
+    return fields, None
+
+def apply_bot_price(product, data, fields, now):
+    """Mevcut ürüne botun yeni fiyatını yaz; gönderilmeyen alanlar korunur
+    
+    discount_percent gönderilmezse yeni fiyat ve liste fiyatından yeniden
+    hesaplanır (eski indirim yeni fiyatla tutarsız kalmasın). real_deal_status'a
+    dokunulmaz: mevcut ürünlerde onu fiyat geçmişinden reclassify-deals belirler.
+    """
+    from scraper import calculate_discount
+    
+    product.current_price = fields['current_price']
+    if 'original_price' in data:
+        product.original_price = fields['original_price']
+    if 'discount_percent' in data:
+        product.discount_percent = fields['discount_percent']
+    else:
+        product.discount_percent = calculate_discount(product.original_price, product.current_price)
+    product.updated_at = now
+
+def identity_keys(fields):
+    """Batch içinde aynı ürünü gösteren öğeleri eşlemek için anahtarlar (resolve_products sırası)"""
+    return (('fingerprint', fields['fingerprint']), ('url', fields['product_url']))
+
+@app.route('/api/bot/products/batch', methods=['POST'])
+def add_bot_products_batch():
+    """Telegram botundan gelen ürün listesini tek transaction'da kaydeder
+    
+    Gövde: ürün listesi veya {"products": [...]}. Her öğe için created/duplicate/invalid döner.
+    """
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('products') if isinstance(data, dict) else data
+        
+        if not isinstance(items, list):
+            return jsonify({'message': 'Ürün listesi gerekli'}), 400
+        if len(items) > app.config['BOT_BATCH_MAX_ITEMS']:
+            return jsonify({'message': f"En fazla {app.config['BOT_BATCH_MAX_ITEMS']} ürün gönderilebilir"}), 413
+        
+        # 1. Veri Kontrolü
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            fields, error = bot_product_fields(item)
+            if error:
+                results[index] = {'index': index, 'status': 'invalid', 'error': error}
+            else:
+                valid.append((index, item, fields))
+        
+        # 2. Duplicate Kontrolü: fingerprint, alias, link (eski satırlarda platform+başlık) eşleşmeleri tek okumada
+        matches = resolve_products([fields for _, _, fields in valid])
+        matched_ids = {product_id for product_id in matches if product_id}
+        products = {}
+        if matched_ids:
+            products = {product.id: product for product in Product.query.filter(Product.id.in_(matched_ids))}
+        
+        # 3. Yeni ürünler ve mevcutların fiyat gözlemleri (tek ürün endpoint'i ile aynı kurallar)
+        outcomes = []
+        observations = {}  # id(ürün) -> (ürün, batch öncesi fiyat)
+        created = []
+        pending = {}  # Bu batch'te oluşturulan ürünler (aynı ürünün tekrarları için)
+        changed_any = False
+        now = datetime.utcnow()
+        
+        for (index, item, fields), product_id in zip(valid, matches):
+            product = products.get(product_id) or next(
+                (pending[key] for key in identity_keys(fields) if key in pending), None)
+            
+            if product is None:
+                product = Product(**fields)
+                created.append(product)
+                for key in identity_keys(fields):
+                    pending[key] = product
+                outcomes.append((index, 'created', product, False))
+                continue
+            
+            # Aynı ürün batch'te tekrar gelirse son fiyat geçerlidir (last-write-wins);
+            # geçmişe batch öncesi fiyattan son fiyata tek gözlem yazılır
+            changed = False
+            if 'current_price' in item:
+                if product.id is not None:
+                    observations.setdefault(id(product), (product, product.current_price))
+                changed = price_changed(fields['current_price'], product.current_price)
+                if changed:
+                    apply_bot_price(product, item, fields, now)
+                    changed_any = True
+            outcomes.append((index, 'duplicate', product, changed))
+        
+        db.session.add_all(created)
+        db.session.flush()
+        
+        # 4. Fiyat geçmişi (yeni ürünlerin ilk noktası dahil) ve tek commit
+        record_prices(
+            [(p.id, p.current_price, previous) for p, previous in observations.values()] +
+            [(p.id, p.current_price, None) for p in created],
+            now
+        )
+        db.session.commit()
+        if created or changed_any:
+            response_cache.invalidate()
+        
+        for index, status, product, changed in outcomes:
+            result = {'index': index, 'status': status, 'id': product.id}
+            if status == 'duplicate':
+                result['price_changed'] = changed
+            results[index] = result
+        
+        summary = {status: sum(1 for r in results if r['status'] == status) for status in ('created', 'duplicate', 'invalid')}
+        return jsonify({'message': f"✅ Bot {summary['created']} ürün ekledi", 'summary': summary, 'results': results}), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        print(f"Bot Toplu Ekleme Hatası: {e}")
+        return jsonify({'message': 'Sunucu hatası', 'error': str(e)}), 500
+
 # ==================== STATS ROUTE ====================
 
+StatRow = namedtuple('StatRow', ['scope', 'name', 'item_count', 'discount_sum', 'max_discount'])
+
+def stale_max_discounts(keys):
+    """max_discount'u NULL özet satırları için güncel max; scope başına tek gruplu sorgu"""
+    best = {}
+    for scope, group_col in STAT_GROUPS.items():
+        names = [name for key_scope, name in keys if key_scope == scope]
+        if not names:
+            continue
+        if group_col is None:
+            best[(scope, '')] = db.session.query(db.func.max(Product.discount_percent)).scalar()
+            continue
+        query = (
+            db.session.query(group_col, db.func.max(Product.discount_percent))
+            .filter(group_col.in_(names)).group_by(group_col)
+        )
+        best.update({(scope, name): value for name, value in query})
+    return best
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
+    """Katalog özeti; salt okunur (özet tabloyu init_db ve saatlik reconcile işi doldurur)"""
     try:
-        total_products = Product.query.count()
-        total_users = User.query.count()
+        rows = [
+            StatRow(row.scope, row.name, row.item_count, row.discount_sum, row.max_discount)
+            for row in CatalogStat.query
+        ]
+        if not any(row.scope == 'all' for row in rows):
+            # Özet tablo henüz doldurulmamış (boş katalogda da 'all' satırı vardır): yazmadan hesapla
+            rows = [StatRow(scope, name, *values) for (scope, name), values in stats_truth().items()]
         
-        if total_products > 0:
-            avg_discount = db.session.query(
-                db.func.avg(Product.discount_percent)
-            ).scalar() or 0
-            
-            best_deal = db.session.query(
-                db.func.max(Product.discount_percent)
-            ).scalar() or 0
-        else:
-            avg_discount = 0
-            best_deal = 0
+        # Maksimumu silinmiş/düşmüş scope'ların max'ı yanıt için hesaplanır; kalıcı düzeltme reconcile'da
+        stale = {(row.scope, row.name) for row in rows
+                 if row.max_discount is None and row.item_count > 0 and row.scope != 'users'}
+        if stale:
+            best = stale_max_discounts(stale)
+            rows = [row._replace(max_discount=best.get((row.scope, row.name), row.max_discount)) for row in rows]
+        
+        def summary(row):
+            return {
+                'count': row.item_count,
+                'avg_discount': round(row.discount_sum / row.item_count, 2) if row.item_count > 0 else 0,
+                'best_deal': row.max_discount or 0
+            }
+        
+        by_key = {(row.scope, row.name): row for row in rows}
+        total = by_key.get(('all', ''))
+        users = by_key.get(('users', ''))
+        overall = summary(total) if total else {'count': 0, 'avg_discount': 0, 'best_deal': 0}
         
         return jsonify({
-            'total_products': total_products,
-            'total_users': total_users,
-            'avg_discount': round(avg_discount, 2),
-            'best_deal': best_deal
+            'total_products': overall['count'],
+            'total_users': users.item_count if users else 0,
+            'avg_discount': overall['avg_discount'],
+            'best_deal': overall['best_deal'],
+            'categories': {row.name: summary(row) for row in rows if row.scope == 'category' and row.item_count > 0},
+            'platforms': {row.name: summary(row) for row in rows if row.scope == 'platform' and row.item_count > 0}
         })
     
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': 'Error fetching stats', 'error': str(e)}), 500
 
 # ==================== INITIALIZE DATABASE ====================
 
+def ensure_columns():
+    """create_all mevcut tablolara kolon eklemez; modele sonradan eklenen nullable kolonları ekle"""
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(db.text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+            print(f"✅ Kolon eklendi: {table.name}.{column.name}")
+
+class SchemaError(RuntimeError):
+    """Şema eksik ve kendiliğinden tamamlanamıyor; uygulama başlatılmamalı"""
+
+def merge_key_duplicates():
+    """Product'ın tekil anahtarlarını (link, fingerprint) paylaşan satırları birleştir
+    
+    Tekil index'ler sonradan eklenen eski veritabanlarında bu satırlar index
+    oluşturmayı engeller. Yazma yolları aynı anahtarları aynı ürün sayar
+    (resolve_products); en eski kayıt kalır, fiyat en son güncellenenden alınır.
+    Birleşen ürün sayısını döndürür.
+    """
+    from deals import recompute_deal_status
+    from dedup import connected_groups
+    
+    rows = {}
+    pairs = []
+    for column in (Product.product_url, Product.fingerprint):
+        duplicated = (
+            db.select(column).where(column.isnot(None))
+            .group_by(column).having(db.func.count() > 1)
+        )
+        first = {}
+        for row in db.session.execute(
+            db.select(Product.id, Product.fingerprint, Product.updated_at, column.label('value'))
+            .where(column.in_(duplicated)).order_by(Product.id)
+        ):
+            rows[row.id] = row
+            pairs.append((first.setdefault(row.value, row.id), row.id))
+    if not rows:
+        return 0
+    
+    ids = sorted(rows)
+    position = {product_id: i for i, product_id in enumerate(ids)}
+    merges = []
+    for members in connected_groups(len(ids), [(position[a], position[b]) for a, b in pairs if a != b]):
+        group = [rows[ids[i]] for i in members]
+        survivor = group[0]
+        merges.append({
+            'survivor': survivor.id,
+            'losers': [row.id for row in group[1:]],
+            'fingerprints': {row.fingerprint for row in group[1:] if row.fingerprint} - {survivor.fingerprint},
+            'price_from': max(group, key=lambda row: row.updated_at or datetime.min).id
+        })
+    
+    merge_duplicate_products(merges)
+    recompute_deal_status(db, Product, PriceHistory, [merge['survivor'] for merge in merges], batch_size=5000)
+    db.session.commit()
+    reconcile_stats()
+    response_cache.invalidate()
+    return sum(len(merge['losers']) for merge in merges)
+
+# Kaldırılan index'ler: mevcut veritabanlarından silinir (platform+başlık artık tekil değil)
+RETIRED_INDEXES = {'product': ('uq_product_platform_title',)}
+
+def ensure_indexes():
+    """create_all mevcut tablolara index eklemez; eksik index'leri oluştur, kaldırılanları sil
+    
+    Eksik tekil index ON CONFLICT upsert'lerini bozar: Product'taki kopyalar
+    önce birleştirilir, yine de oluşturulamayan tekil index SchemaError verir.
+    """
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for name in RETIRED_INDEXES.get(table.name, ()):
+            if name in existing:
+                with db.engine.begin() as conn:
+                    conn.execute(db.text(f'DROP INDEX "{name}"'))
+                print(f"✅ Index kaldırıldı: {name}")
+        missing = [index for index in table.indexes if index.name not in existing]
+        if table is Product.__table__ and any(index.unique for index in missing):
+            merged = merge_key_duplicates()
+            if merged:
+                print(f"✅ Tekil anahtarı çakışan {merged} ürün birleştirildi")
+        for index in missing:
+            try:
+                index.create(db.engine, checkfirst=True)
+            except Exception as e:
+                if index.unique:
+                    raise SchemaError(f"Tekil index oluşturulamadı ({index.name}): {e}") from e
+                print(f"⚠️ Index oluşturulamadı ({index.name}): {e}")
+
 def init_db():
     """Initialize database with tables and sample data"""
     with app.app_context():
         try:
             print("🔄 Creating database tables...")
             db.create_all()
+            ensure_columns()
+            ensure_indexes()
             print("✅ Tables created!")
             
+            # Eski satırlarda created_at NULL olabilir (cursor sıralama anahtarı)
+            backfilled = Product.query.filter(Product.created_at.is_(None)).update(
+                {Product.created_at: db.func.coalesce(Product.updated_at, datetime.utcnow()),
+                 Product.updated_at: Product.updated_at},
+                synchronize_session=False
+            )
+            if backfilled:
+                db.session.commit()
+                print(f"✅ created_at dolduruldu: {backfilled} ürün")
+            
+            # Özet tablo yeni eklendiyse mevcut katalogdan doldur
+            if CatalogStat.query.first() is None:
+                reconcile_stats()
+            print(f"🔎 Search backend: {setup_search_index(db, Product)}")
+            
             # Add sample data if database is empty
             if Product.query.count() == 0:
                 print("📦 Adding sample data...")
@@ -626,7 +2480,7 @@ def init_db():
             if not admin:
                 admin = User(
                     email='admin@indirimradar.com',
-                    password=generate_password_hash('Admin123!', method='pbkdf2:sha256'),
+                    password=generate_password_hash('Admin123!', method=password_hasher.method),
                     is_admin=True
                 )
                 db.session.add(admin)
@@ -635,21 +2489,33 @@ def init_db():
             else:
                 print('ℹ️ Admin user already exists')
         
+        except SchemaError:
+            db.session.rollback()
+            raise
         except Exception as e:
             print(f"⚠️ Database initialization error: {e}")
             db.session.rollback()
 
-# ==================== INITIALIZE ON STARTUP ====================
-
-try:
+@app.cli.command('init-db')
+def init_db_command():
+    """Tabloları, eksik kolon/index'leri, arama index'ini, örnek verileri ve admin kullanıcısını oluştur"""
     init_db()
     print("🔄 Database initialization completed")
-except Exception as e:
-    print(f"⚠️ Database initialization error: {e}")
+
+@app.cli.command('rebuild-search')
+def rebuild_search_command():
+    """Arama index'ini ve search_text kolonunu yeniden üret"""
+    drop_search_index(db)
+    db.session.execute(db.update(Product).values(search_text=None, updated_at=Product.updated_at))
+    db.session.commit()
+    print(f"✅ Arama index'i yeniden oluşturuldu ({setup_search_index(db, Product)})")
 
 # ==================== RUN ====================
 
 if __name__ == '__main__':
+    # Tek process'li geliştirme sunucusu: bootstrap'i burada yap
+    # (gunicorn'da gunicorn_config.on_starting master'da bir kez çalıştırır)
+    init_db()
     port = int(os.getenv('PORT', 5000))
     is_production = os.getenv('FLASK_ENV') == 'production'
     
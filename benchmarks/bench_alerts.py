@@ -0,0 +1,142 @@
+"""
+Fiyat alarmı değerlendirme benchmark'ı
+
+M aktif alarm ve bir turda N fiyat düşüşü için üç yaklaşımı karşılaştırır:
+  full scan     : tüm aktif alarmları ürünlerle join edip eşiği geçenleri bul
+  per product   : değişen ürünlerin tüm aktif alarmlarını çekip Python'da süz
+  range join    : düşüşler (tek JSON parametresi) alarmlarla join; (product_id, target_price)
+                  kısmi index'inde ürün başına tek aralık taraması (yazım yok)
+  evaluate      : app.evaluate_alerts; range join + INSERT ... SELECT ile
+                  outbox yazımı ve tetiklenen alarmların pasife alınması
+Her tur geri alınır (rollback), yani üçü aynı veri üzerinde çalışır.
+
+    python benchmarks/bench_alerts.py --products 100000 --alerts 1000000 --changes 10000
+"""
+
+import argparse
+import random
+import time
+
+from common import reset_schema, seed_products, use_database
+
+
+def seed_alerts(m, n, products, chunk=50000, seed=7):
+    db = m.db
+    rng = random.Random(seed)
+    db.session.execute(db.insert(m.User), [
+        {'id': i, 'email': f'alert{i}@example.com', 'password': 'x'} for i in range(1, 1001)
+    ])
+    prices = dict(db.session.execute(db.select(m.Product.id, m.Product.current_price)).all())
+    rows = []
+    for i in range(1, n + 1):
+        product_id = rng.randint(1, products)
+        rows.append({
+            'id': i, 'user_id': rng.randint(1, 1000), 'product_id': product_id,
+            'target_price': prices[product_id] * rng.uniform(0.5, 0.99), 'is_active': True
+        })
+        if len(rows) == chunk:
+            db.session.execute(db.insert(m.PriceAlert), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(m.PriceAlert), rows)
+    db.session.commit()
+    return prices
+
+
+def full_scan(m, drops):
+    db = m.db
+    changes = {product_id: (price, previous) for product_id, price, previous in drops}
+    rows = db.session.execute(
+        db.select(m.PriceAlert.id, m.PriceAlert.product_id, m.PriceAlert.target_price)
+        .where(m.PriceAlert.is_active == True)  # noqa: E712
+    ).all()
+    return sum(1 for row in rows if row.product_id in changes
+               and changes[row.product_id][0] <= row.target_price < changes[row.product_id][1]), len(rows)
+
+
+def per_product(m, drops):
+    db = m.db
+    changes = {product_id: (price, previous) for product_id, price, previous in drops}
+    touched = triggered = 0
+    ids = list(changes)
+    for i in range(0, len(ids), 500):
+        rows = db.session.execute(
+            db.select(m.PriceAlert.product_id, m.PriceAlert.target_price)
+            .where(m.PriceAlert.is_active == True, m.PriceAlert.product_id.in_(ids[i:i + 500]))  # noqa: E712
+        ).all()
+        touched += len(rows)
+        triggered += sum(1 for row in rows if changes[row.product_id][0] <= row.target_price < changes[row.product_id][1])
+    return triggered, touched
+
+
+def range_join(m, drops):
+    """evaluate_alerts'in eşleşme sorgusu, yazım olmadan"""
+    db = m.db
+    triggered = 0
+    for i in range(0, len(drops), m.ALERT_EVAL_CHUNK):
+        changes = m.price_drops_source(drops[i:i + m.ALERT_EVAL_CHUNK])
+        triggered += db.session.execute(
+            db.select(db.func.count())
+            .select_from(changes)
+            .join(m.PriceAlert, db.and_(
+                m.PriceAlert.product_id == changes.c.product_id,
+                m.PriceAlert.target_price >= changes.c.price,
+                db.or_(m.PriceAlert.target_price < changes.c.previous, m.PriceAlert.triggered_at.is_(None))
+            ))
+            .where(m.PriceAlert.is_active == True)  # noqa: E712
+        ).scalar()
+    return triggered, triggered
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Alarm değerlendirme benchmark')
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--alerts', type=int, default=1_000_000)
+    parser.add_argument('--changes', type=int, default=10_000)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    db = m.db
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, args.products)
+        db.session.commit()
+        prices = seed_alerts(m, args.alerts, args.products)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+        rng = random.Random(11)
+        drops = [(pid, prices[pid] * rng.uniform(0.7, 0.99), prices[pid])
+                 for pid in rng.sample(range(1, args.products + 1), args.changes)]
+
+        if db.engine.dialect.name == 'sqlite':
+            changes = m.price_drops_source(drops[:2])
+            query = (db.select(m.PriceAlert.id).select_from(changes)
+                     .join(m.PriceAlert, db.and_(m.PriceAlert.product_id == changes.c.product_id,
+                                                 m.PriceAlert.target_price >= changes.c.price,
+                                                 db.or_(m.PriceAlert.target_price < changes.c.previous,
+                                                        m.PriceAlert.triggered_at.is_(None))))
+                     .where(m.PriceAlert.is_active == True))  # noqa: E712
+            sql = str(query.compile(db.engine, compile_kwargs={'literal_binds': True}))
+            plan = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).all()
+            print('plan:', ' | '.join(row[-1] for row in plan))
+
+        print(f"{'yaklaşım':<14}{'süre ms':>10}{'tetiklenen':>12}{'okunan':>10}")
+        for name, run in (('full scan', lambda: full_scan(m, drops)),
+                          ('per product', lambda: per_product(m, drops)),
+                          ('range join', lambda: range_join(m, drops))):
+            started = time.perf_counter()
+            triggered, touched = run()
+            print(f'{name:<14}{(time.perf_counter() - started) * 1000:>10.1f}{triggered:>12}{touched:>10}')
+            db.session.rollback()
+
+        started = time.perf_counter()
+        triggered = m.evaluate_alerts(drops)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{'evaluate':<14}{elapsed:>10.1f}{triggered:>12}{triggered:>10}")
+        db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Kimlik doğrulamalı istek başına SQL sorgu sayısı ve gecikme
+
+token_required ile korunan /api/auth/me'ye soğuk (cache boş) ve sıcak
+istekler atar; SQLAlchemy engine event'leri ile istek başına sorgu sayar.
+
+    python benchmarks/bench_auth.py --requests 1000
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+
+from common import percentile, reset_schema, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Auth cache benchmark')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        reset_schema(m)
+    client = m.app.test_client()
+
+    email = f'bench{time.time_ns()}@example.com'
+    token = client.post('/api/auth/register', json={'email': email, 'password': 'bench123'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    queries = []
+    with m.app.app_context():
+        engine = m.db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries[-1] += 1
+
+    def run(label, n, cold):
+        timings = []
+        for _ in range(n):
+            if cold:
+                m.token_cache.clear()
+                m.principal_cache.clear()
+            queries.append(0)
+            started = time.perf_counter()
+            response = client.get('/api/auth/me', headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.get_json()
+        sample = queries[-n:]
+        print(f"{label:<6} sorgu/istek: {sum(sample) / n:.2f}   p50 {percentile(timings, 50):.3f} ms   p99 {percentile(timings, 99):.3f} ms")
+
+    run('soğuk', args.requests, cold=True)
+    run('sıcak', args.requests, cold=False)
+
+
+if __name__ == '__main__':
+    main()
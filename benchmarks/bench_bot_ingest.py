@@ -0,0 +1,76 @@
+"""
+Bot ekleme benchmark'ı
+
+N ürünü tek tek /api/bot/products'a ve tek istekte
+/api/bot/products/batch'e gönderir; ardından aynı listeyi tekrar
+göndererek (hepsi duplicate, yarısının fiyatı değişmiş) iki yolu
+karşılaştırır. İstekler Flask test client üzerinden gider, yani gerçek
+HTTP gidiş-dönüşleri dahil değildir; tek tek yolda bu fark daha da büyür.
+
+    python benchmarks/bench_bot_ingest.py --items 1000
+"""
+
+import argparse
+import time
+
+from common import CATEGORIES, PLATFORMS, reset_schema, use_database
+
+
+def make_items(n, prefix, price_shift=0):
+    return [{
+        'title': f'{prefix} Bot Ürünü {i}',
+        'platform': PLATFORMS[i % 3],
+        'category': CATEGORIES[i % 5],
+        'current_price': 100 + i + (price_shift if i % 2 else 0),
+        'original_price': 200 + i,
+        'discount_percent': 40,
+        'image_url': f'https://img.example.com/bot/{prefix}/{i}.jpg',
+        'product_url': f'https://example.com/bot/{prefix}/{i}',
+    } for i in range(n)]
+
+
+def run_single(client, items):
+    started = time.perf_counter()
+    for item in items:
+        response = client.post('/api/bot/products', json=item)
+        assert response.status_code in (200, 201), response.get_json()
+    return time.perf_counter() - started
+
+
+def run_batch(client, items, max_items):
+    started = time.perf_counter()
+    for i in range(0, len(items), max_items):
+        response = client.post('/api/bot/products/batch', json=items[i:i + max_items])
+        assert response.status_code == 200, response.get_json()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bot ekleme benchmark')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        reset_schema(m)
+
+    client = m.app.test_client()
+    max_items = m.app.config['BOT_BATCH_MAX_ITEMS']
+
+    print(f"{'yol':<10}{'senaryo':<22}{'süre s':>9}{'öğe/s':>10}")
+    for name, runner in (('single', lambda items: run_single(client, items)),
+                         ('batch', lambda items: run_batch(client, items, max_items))):
+        for scenario, items in (('yeni ürünler', make_items(args.items, name)),
+                                ('tekrar (%50 fiyat)', make_items(args.items, name, price_shift=5))):
+            elapsed = runner(items)
+            print(f'{name:<10}{scenario:<22}{elapsed:>9.2f}{len(items) / elapsed:>10.0f}')
+
+    with m.app.app_context():
+        drift = m.reconcile_stats(fix=False)
+        history = m.PriceHistory.query.count()
+    print(f'PriceHistory satırı: {history} (beklenen {int(args.items * 2 * 1.5)}), stats sapması: {len(drift)}')
+
+
+if __name__ == '__main__':
+    main()
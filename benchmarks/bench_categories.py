@@ -0,0 +1,135 @@
+"""
+Kategori sınıflandırıcı benchmark'ı
+
+Sentetik ürün başlıkları (marka + ürün terimi + model/renk/beden gürültüsü,
+Türkçe karakterli ve ekli yazımlar dahil) üzerinde:
+  naive: her başlık için normalize + tüm terimlerde tek tek `term in title`
+         taraması (terim sayısıyla doğrusal; eski anahtar kelime eşleştirmesinin
+         başlığa genişletilmiş hali)
+  trie:  categories.CategoryClassifier.classify_many (tek derlenmiş regex)
+İki yolun sonuçları ayrıca beklenen kategoriyle karşılaştırılır (doğruluk).
+--catalog N ile N ürünlük geçici SQLite katalogda reclassify_categories süresi
+de ölçülür.
+
+    python benchmarks/bench_categories.py --titles 1000000 --catalog 200000
+"""
+
+import argparse
+import random
+import time
+
+from common import use_database
+
+import scraper
+from categories import normalize_term
+from search import normalize_turkish
+
+BRANDS = ['Samsung', 'Apple', 'Xiaomi', 'Philips', 'Arçelik', 'Nike', 'Adidas', 'Koton', 'LC Waikiki',
+          'Karaca', 'English Home', 'Pınar', 'Ülker', 'Eti', 'Loreal', 'Nivea', 'Maybelline', 'Bosch']
+NOISE = ['Siyah', 'Beyaz', 'Lacivert', '128 GB', 'XL', '42 Numara', '2\'li Paket', '500 ml', '1 kg',
+         'Yeni Sezon', 'Orijinal', 'Distribütör Garantili', 'Kadın', 'Erkek', 'Pamuklu', 'Çelik']
+# Beklenen kategori -> başlıkta geçen ürün terimi (yazım varyantlarıyla)
+PRODUCTS = {
+    'Elektronik': ['iPhone 15', 'Akıllı Telefon', 'Bluetooth Kulaklık', 'Dizüstü Bilgisayar', '55" QLED Smart TV',
+                   'Oyun Konsolu PlayStation 5', 'Robot Süpürge', 'Akıllı Saat', 'Tablet', 'Ekran Kartı'],
+    'Moda': ['Spor Ayakkabısı', 'Sneaker', 'Kot Pantolon', 'Elbise', 'Sweatshirt', 'Deri Çanta',
+             'Kışlık Mont', 'Gömlek', 'Tişört', 'Sandalet'],
+    'Ev': ['Nevresim Takımı', 'Yorgan', 'Tencere Seti', 'Çatal Bıçak Takımı', 'Avize', 'Halı',
+           'Banyo Havlusu', 'Yemek Masası', 'Kahve Makinesi', 'Abajur'],
+    'Süpermarket': ['Sızma Zeytinyağı', 'Makarna', 'Türk Kahvesi', 'Çikolata', 'Bisküvi',
+                    'Bulaşık Deterjanı', 'Çamaşır Suyu', 'Tuvalet Kağıdı', 'Bebek Bezi', 'Kedi Maması'],
+    'Kozmetik': ['Şampuan', 'Parfüm EDP', 'Ruj', 'Maskara', 'Nemlendirici Krem', 'Güneş Kremi',
+                 'Saç Boyası', 'Deodorant', 'Fondöten', 'Oje'],
+}
+
+
+def make_titles(n, seed=42):
+    rng = random.Random(seed)
+    categories = list(PRODUCTS)
+    titles, expected = [], []
+    for _ in range(n):
+        category = rng.choice(categories)
+        parts = [rng.choice(BRANDS), rng.choice(PRODUCTS[category])] + rng.sample(NOISE, rng.randrange(1, 4))
+        if rng.random() < 0.5:
+            parts = [parts[0]] + parts[2:] + [parts[1]]
+        title = ' '.join(parts)
+        titles.append(title.upper() if rng.random() < 0.1 else title)
+        expected.append(category)
+    return titles, expected
+
+
+def naive_classifier(classifier):
+    """Aynı terim/ağırlık tablosu; başlık başına tüm terimler sırayla aranır"""
+    terms = [(' ' + term, entries) for term, entries in classifier.terms.items()]
+
+    def classify(title, hint=None):
+        text = ' ' + ' '.join(normalize_term(title).split())
+        scores = {}
+        for term, entries in terms:
+            if term in text:
+                for category, weight in entries:
+                    scores[category] = scores.get(category, 0.0) + weight
+        if not scores:
+            return hint or classifier.default
+        return max(scores.items(), key=lambda item: item[1])[0]
+
+    return lambda titles: [classify(title) for title in titles]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def catalog_bench(size, titles):
+    m = use_database()
+    from common import reset_schema, seed_products
+
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, size)
+        m.db.session.execute(
+            m.db.update(m.Product),
+            # (platform, title) tekil; ürün numarası sınıflandırmayı etkilemez
+            [{'id': i + 1, 'title': f'{titles[i % len(titles)]} {i + 1}'} for i in range(size)]
+        )
+        m.db.session.commit()
+        m.reconcile_stats()
+
+        stats, dry = timed(m.reclassify_categories, 20000, True)
+        _, wet = timed(m.reclassify_categories)
+        _, again = timed(m.reclassify_categories)
+    print(f"\nkatalog {size} ürün: dry-run {dry:.1f}s, yazma {wet:.1f}s ({stats['changed']} değişti), "
+          f"tekrar (değişiklik yok) {again:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kategori sınıflandırıcı benchmark')
+    parser.add_argument('--titles', type=int, default=1_000_000)
+    parser.add_argument('--naive-titles', type=int, default=100_000, help='naive yol yavaş; daha az başlıkla ölçülür')
+    parser.add_argument('--catalog', type=int, default=0, help='reclassify_categories için katalog boyutu (0: atla)')
+    args = parser.parse_args()
+
+    classifier = scraper.category_classifier
+    titles, expected = make_titles(args.titles)
+    print(f"{len(classifier.terms)} terim, {len(titles)} başlık")
+
+    _, normalize = timed(lambda: [normalize_turkish(title) for title in titles])
+    trie, trie_time = timed(classifier.classify_many, titles)
+    naive_count = min(args.naive_titles, len(titles))
+    naive, naive_time = timed(naive_classifier(classifier), titles[:naive_count])
+
+    print(f"{'yol':<8}{'başlık':>10}{'başlık/sn':>12}{'µs/başlık':>11}{'doğru':>8}")
+    for name, result, count, elapsed in (('trie', trie, len(titles), trie_time),
+                                         ('naive', naive, naive_count, naive_time)):
+        accuracy = sum(a == b for a, b in zip(result, expected)) / count * 100
+        print(f"{name:<8}{count:>10}{count / elapsed:>12.0f}{elapsed / count * 1e6:>11.2f}{accuracy:>7.1f}%")
+    print(f"normalize payı (trie): {normalize / trie_time * 100:.0f}%")
+
+    if args.catalog:
+        catalog_bench(args.catalog, titles)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+real_deal_status toplu yeniden hesaplama benchmark'ı
+
+N ürün (varsayılan 1M) ve ürün başına 2-8 fiyat noktası üretir; ürünlerin
+bir kısmının etiket fiyatı şişirilmiştir. Önce tam hesap (reclassify_deals
+full=True), sonra ürünlerin %1'ine yeni fiyat noktası ekleyip artımlı hesabı
+ölçer; yükleme / NumPy hesabı / yazma sürelerini ayrı raporlar.
+
+    python benchmarks/bench_deals.py --products 1000000
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from common import reset_schema, seed_products, use_database
+
+
+def seed_history(m, n, now, seed=3, chunk=200_000):
+    """Ürün başına 2-8 nokta, son 120 günde: önce etiket fiyatı civarı, son nokta current_price"""
+    db = m.db
+    rng = np.random.default_rng(seed)
+    prices, originals = map(np.array, zip(*db.session.execute(
+        db.select(m.Product.current_price, m.Product.original_price).order_by(m.Product.id)
+    ).all()))
+
+    counts = rng.integers(2, 9, size=n)
+    product_ids = np.repeat(np.arange(1, n + 1), counts)
+    offsets = rng.uniform(0, 120, size=len(product_ids))
+    offsets = offsets[np.lexsort((offsets, product_ids))]  # ürün içinde zamana göre
+    factors = rng.uniform(0.9, 1.0, size=len(product_ids))
+    history_prices = np.round(np.repeat(originals, counts) * factors, 2)
+    last = np.r_[product_ids[1:] != product_ids[:-1], True]
+    history_prices[last] = np.round(prices, 2)
+
+    rows = []
+    for pid, offset, price in zip(product_ids.tolist(), offsets.tolist(), history_prices.tolist()):
+        at = now - timedelta(days=120 - offset)
+        rows.append({'product_id': pid, 'price': price, 'recorded_at': at, 'last_seen_at': at})
+        if len(rows) == chunk:
+            db.session.execute(db.insert(m.PriceHistory), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(m.PriceHistory), rows)
+
+    # %10 ürünün etiket fiyatını şişir (fake olmalı)
+    inflated = rng.choice(np.arange(1, n + 1), size=n // 10, replace=False)
+    for i in range(0, len(inflated), 50_000):
+        db.session.execute(
+            db.update(m.Product)
+            .where(m.Product.id.in_(inflated[i:i + 50_000].tolist()))
+            .values(original_price=m.Product.current_price * 3, discount_percent=66)
+        )
+    db.session.commit()
+    return len(product_ids)
+
+
+def report(label, elapsed, stats):
+    print(f"{label:<12}{elapsed:>8.1f}s  ürün {stats['products']:>8}  değişen {stats['changed']:>8}  "
+          f"yükleme {stats['load_s']:.1f}s  hesap {stats['compute_s']:.1f}s  yazma {stats['write_s']:.1f}s  "
+          f"(real {stats['real']}, normal {stats['normal']}, fake {stats['fake']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deal scoring benchmark')
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    db = m.db
+    with m.app.app_context():
+        reset_schema(m)
+        started = time.perf_counter()
+        seed_products(m, args.products)
+        db.session.commit()
+        points = seed_history(m, args.products, m.datetime.utcnow())
+        print(f'seed: {args.products} ürün, {points} fiyat noktası ({time.perf_counter() - started:.0f}s)')
+
+        started = time.perf_counter()
+        stats = m.reclassify_deals(full=True)
+        report('tam', time.perf_counter() - started, stats)
+
+        started = time.perf_counter()
+        stats = m.reclassify_deals()
+        report('artımlı (0)', time.perf_counter() - started, stats)
+
+        # %1 ürüne yeni fiyat düşüşü
+        touched = np.random.default_rng(9).choice(np.arange(1, args.products + 1), size=args.products // 100, replace=False)
+        now = m.datetime.utcnow()
+        observations = db.session.execute(
+            db.select(m.Product.id, m.Product.current_price).where(m.Product.id.in_(touched[:30000].tolist()))
+        ).all()
+        for i in range(30000, len(touched), 30000):
+            observations += db.session.execute(
+                db.select(m.Product.id, m.Product.current_price).where(m.Product.id.in_(touched[i:i + 30000].tolist()))
+            ).all()
+        db.session.execute(db.update(m.Product), [{'id': pid, 'current_price': price * 0.8} for pid, price in observations])
+        m.record_prices([(pid, price * 0.8, price) for pid, price in observations], now)
+        db.session.commit()
+
+        started = time.perf_counter()
+        stats = m.reclassify_deals()
+        report('artımlı (%1)', time.perf_counter() - started, stats)
+
+
+if __name__ == '__main__':
+    main()
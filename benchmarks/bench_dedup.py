@@ -0,0 +1,170 @@
+"""
+Kopya ürün tespiti benchmark'ı
+
+Sentetik katalog: marka + ürün + model numarası + kapasite/renk başlıkları
+(aynı kelimelerle farklı model / kapasite içeren "benzer ama farklı" ürünler
+dahil). Ürünlerin bir kısmı kopyalanır:
+  link kopyası:   aynı platform ürün numarası, takip parametreli / farklı slug'lı link
+  başlık kopyası: aynı platformda farklı satıcı linki, kelime sırası / büyük harf /
+                  fazladan tek kelime farklı başlık, yakın fiyat
+dedup.find_duplicates süresi ve gerçek gruplara göre precision / recall
+raporlanır. --catalog N ile N ürünlük geçici SQLite katalogda dedupe_products
+(yükleme, tespit, birleştirme, fingerprint doldurma) uçtan uca ölçülür.
+
+    python benchmarks/bench_dedup.py --products 1000000 --catalog 200000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from common import use_database
+
+import dedup
+from identity import product_identity
+
+PLATFORMS = {'Trendyol': ('https://www.trendyol.com/{slug}-p-{id}', 'boutiqueId={n}&merchantId={m}'),
+             'Hepsiburada': ('https://www.hepsiburada.com/{slug}-p-HBC{id:08d}', 'magaza=satici-{m}'),
+             'N11': ('https://www.n11.com/urun/{slug}-{id}', 'utm_source=telegram&utm_campaign={n}')}
+BRANDS = ['Samsung', 'Apple', 'Xiaomi', 'Philips', 'Arçelik', 'Nike', 'Adidas', 'Koton', 'Karaca', 'Bosch',
+          'Lenovo', 'Asus', 'Sony', 'LG', 'Vestel', 'Tefal', 'Puma', 'Mavi', 'Loreal', 'Nivea']
+PRODUCTS = ['Akıllı Telefon', 'Bluetooth Kulaklık', 'Dizüstü Bilgisayar', 'Smart TV', 'Robot Süpürge',
+            'Spor Ayakkabı', 'Kot Pantolon', 'Sweatshirt', 'Nevresim Takımı', 'Tencere Seti', 'Kahve Makinesi',
+            'Şampuan', 'Parfüm', 'Nemlendirici Krem', 'Çamaşır Makinesi', 'Tablet', 'Akıllı Saat', 'Mont']
+CAPACITY = ['64 GB', '128 GB', '256 GB', '512 GB', '1 TB', '42 Numara', '43 Numara', 'XL', 'L', 'M',
+            '500 ml', '1 L', '6 Parça', '8 kg', '9 kg', '55 inç', '65 inç']
+COLORS = ['Siyah', 'Beyaz', 'Lacivert', 'Kırmızı', 'Gri', 'Yeşil', 'Mavi', 'Bej']
+EXTRA = ['Orijinal', 'Distribütör Garantili', 'Yeni', 'Fırsat', 'Türkiye Garantili', 'Resmi', 'Kampanyalı']
+
+
+def slug(title):
+    return '-'.join(title.lower().split())
+
+
+def make_catalog(n, link_copies, title_copies, seed=42):
+    """(satırlar, gerçek grup listesi); satır: title, platform, price, product_url, group"""
+    rng = random.Random(seed)
+    bases = int(n / (1 + link_copies + title_copies))
+    rows = []
+    for group in range(bases):
+        platform = rng.choice(list(PLATFORMS))
+        title = ' '.join([rng.choice(BRANDS), rng.choice(PRODUCTS), f'{rng.choice("ABCDEFGHKMSXZ")}{rng.randrange(10, 999)}',
+                          rng.choice(CAPACITY), rng.choice(COLORS)])
+        price = round(rng.uniform(50, 50000), 2)
+        rows.append({'title': title, 'platform': platform, 'price': price, 'group': group,
+                     'product_url': PLATFORMS[platform][0].format(slug=slug(title), id=group)})
+
+    for copies, kind in ((link_copies, 'link'), (title_copies, 'title')):
+        for base in rng.sample(range(bases), int(bases * copies)):
+            row = rows[base]
+            template, query = PLATFORMS[row['platform']]
+            copy = dict(row, price=round(row['price'] * rng.uniform(0.9, 1.1), 2))
+            if kind == 'link':
+                copy['title'] = row['title'] + ' ' + rng.choice(EXTRA)
+                copy['product_url'] = (template.format(slug=slug(copy['title']), id=row['group']) + '?' +
+                                       query.format(n=rng.randrange(100), m=rng.randrange(1000)))
+            else:
+                words = row['title'].split()
+                variant = rng.randrange(3)
+                if variant == 0:
+                    words = words[1:] + words[:1]
+                elif variant == 1:
+                    words = words + [rng.choice(EXTRA).split()[0]]
+                copy['title'] = ' '.join(words).upper() if variant == 2 else ' '.join(words)
+                copy['product_url'] = template.format(slug=slug(copy['title']), id=bases + len(rows))
+            rows.append(copy)
+
+    rng.shuffle(rows)
+    return rows
+
+
+def score(groups, rows):
+    """Çift bazında precision / recall (gerçek grup = aynı 'group' değeri)"""
+    predicted = set()
+    for members in groups:
+        first = members[0]
+        predicted.update((first, other) for other in members[1:])
+    truth_groups = {}
+    for i, row in enumerate(rows):
+        truth_groups.setdefault((row['group'], row['platform']), []).append(i)
+    expected = sum(len(members) - 1 for members in truth_groups.values())
+    correct = sum(1 for first, other in predicted if rows[first]['group'] == rows[other]['group'])
+    return correct / max(len(predicted), 1), correct / max(expected, 1)
+
+
+def detect(rows):
+    started = time.perf_counter()
+    fingerprints = [product_identity(row['product_url'])[1] for row in rows]
+    identity_s = time.perf_counter() - started
+    groups, stats = dedup.find_duplicates([row['title'] for row in rows], [row['platform'] for row in rows],
+                                          [row['price'] for row in rows], fingerprints)
+    stats['identity_s'] = identity_s
+    return groups, stats
+
+
+def catalog_bench(rows):
+    m = use_database()
+    from common import reset_schema
+
+    now = datetime.utcnow()
+    with m.app.app_context():
+        reset_schema(m)
+        # Eski katalog: ham linkler, fingerprint yok; (platform, title) tekil olmalı
+        seen = set()
+        batch = []
+        for i, row in enumerate(rows):
+            title = row['title'] if (row['platform'], row['title']) not in seen else f"{row['title']} #{i}"
+            seen.add((row['platform'], title))
+            batch.append({'id': i + 1, 'title': title, 'platform': row['platform'], 'category': 'Elektronik',
+                          'current_price': row['price'], 'original_price': row['price'] * 1.2,
+                          'discount_percent': 17, 'image_url': '', 'product_url': row['product_url'] + f'#{i}',
+                          'real_deal_status': 'normal', 'created_at': now, 'updated_at': now})
+            if len(batch) == 20000:
+                m.db.session.execute(m.db.insert(m.Product), batch)
+                batch = []
+        if batch:
+            m.db.session.execute(m.db.insert(m.Product), batch)
+        m.db.session.execute(m.db.insert(m.PriceHistory), [
+            {'product_id': i + 1, 'price': row['price'], 'recorded_at': now, 'last_seen_at': now}
+            for i, row in enumerate(rows)
+        ])
+        m.db.session.commit()
+
+        started = time.perf_counter()
+        stats = m.dedupe_products()
+        elapsed = time.perf_counter() - started
+        remaining = m.Product.query.count()
+        histories = m.PriceHistory.query.count()
+    print(f"\nkatalog {len(rows)} ürün: dedupe_products {elapsed:.1f}s (yükleme {stats['load_s']:.1f}s, "
+          f"tespit {stats['tokenize_s'] + stats['lsh_s'] + stats['verify_s']:.1f}s, "
+          f"birleştirme + fingerprint {stats['merge_s']:.1f}s); {stats['duplicates']} birleşti, "
+          f"{stats['backfilled']} fingerprint dolduruldu, {remaining} ürün ve {histories} fiyat noktası kaldı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kopya ürün tespiti benchmark')
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--link-copies', type=float, default=0.03, help='link kopyası oranı')
+    parser.add_argument('--title-copies', type=float, default=0.05, help='başlık kopyası oranı')
+    parser.add_argument('--catalog', type=int, default=0, help='dedupe_products için katalog boyutu (0: atla)')
+    args = parser.parse_args()
+
+    rows = make_catalog(args.products, args.link_copies, args.title_copies)
+    started = time.perf_counter()
+    groups, stats = detect(rows)
+    elapsed = time.perf_counter() - started
+    precision, recall = score(groups, rows)
+
+    print(f"{len(rows)} ürün: {elapsed:.1f}s (fingerprint {stats['identity_s']:.1f}s, kelimeler {stats['tokenize_s']:.1f}s, "
+          f"LSH {stats['lsh_s']:.1f}s, doğrulama {stats['verify_s']:.1f}s)")
+    print(f"aday çift {stats['candidates']}, benzer başlık {stats['similar_pairs']}, aynı fingerprint {stats['exact_pairs']}; "
+          f"{stats['groups']} grup, {stats['duplicates']} kopya")
+    print(f"precision {precision * 100:.2f}%, recall {recall * 100:.2f}%")
+
+    if args.catalog:
+        catalog_bench(make_catalog(args.catalog, args.link_copies, args.title_copies, seed=7))
+
+
+if __name__ == '__main__':
+    main()
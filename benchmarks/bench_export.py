@@ -0,0 +1,71 @@
+"""
+/api/products/export bellek benchmark'ı
+
+Kataloğu NDJSON (veya CSV) olarak stream eder ve her %10'da process'in
+anlık RSS'ini ve tepe RSS'ini (VmHWM) yazar. Server-side cursor ile
+bellek satır sayısından bağımsız, düz kalmalıdır.
+
+    python benchmarks/bench_export.py --products 1000000 --format ndjson
+"""
+
+import argparse
+import time
+
+from common import reset_schema, seed_products, use_database
+
+
+def memory_mb():
+    """Linux /proc'tan (anlık RSS, tepe RSS) MB cinsinden"""
+    values = {}
+    with open('/proc/self/status') as status:
+        for line in status:
+            key, _, rest = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(rest.split()[0]) / 1024
+    return values['VmRSS'], values['VmHWM']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export bellek benchmark')
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, args.products)
+        m.db.session.commit()
+        m.db.session.remove()
+
+    client = m.app.test_client()
+    rss, peak = memory_mb()
+    print(f'başlangıç: RSS {rss:.1f} MB, tepe {peak:.1f} MB')
+    print(f"{'satır':>10}{'RSS MB':>10}{'tepe MB':>10}")
+
+    started = time.perf_counter()
+    response = client.get(f'/api/products/export?format={args.format}', buffered=False)
+    assert response.status_code == 200
+
+    lines = 0
+    total_bytes = 0
+    step = max(1, args.products // 10)
+    next_report = step
+    for chunk in response.response:
+        lines += chunk.count(b'\n')
+        total_bytes += len(chunk)
+        if lines >= next_report:
+            rss, peak = memory_mb()
+            print(f'{lines:>10}{rss:>10.1f}{peak:>10.1f}')
+            next_report += step
+    response.close()
+
+    elapsed = time.perf_counter() - started
+    rss, peak = memory_mb()
+    print(f'{lines} satır, {total_bytes / 1e6:.1f} MB, {elapsed:.1f} s '
+          f'({lines / elapsed:,.0f} satır/s); son RSS {rss:.1f} MB, tepe {peak:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
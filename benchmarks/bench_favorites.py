@@ -0,0 +1,83 @@
+"""
+GET /api/favorites sorgu sayısı
+
+1, 10, 100 ve 1000 favorisi olan kullanıcılar için listeyi ister ve
+istek başına SQL sorgu sayısını sayar. Ürünler ve son fiyat noktası tek
+sorguda geldiğinden sayı favori sayısından bağımsız olmalıdır (N+1 yok);
+değilse script hata ile çıkar.
+
+    python benchmarks/bench_favorites.py --per-page 100
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+
+from common import percentile, reset_schema, seed_products, use_database
+
+SIZES = (1, 10, 100, 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Favoriler sorgu sayısı')
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    db = m.db
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, max(SIZES))
+        # Her ürünün iki fiyat noktası: son nokta doğru seçilmeli
+        db.session.execute(db.insert(m.PriceHistory), [
+            {'product_id': i, 'price': price, 'recorded_at': m.datetime(2026, 1, day), 'last_seen_at': m.datetime(2026, 1, day)}
+            for i in range(1, max(SIZES) + 1) for day, price in ((1, 200.0), (2, 100.0))
+        ])
+        db.session.commit()
+        engine = db.engine
+
+    client = m.app.test_client()
+    queries = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if queries:
+            queries[-1] += 1
+
+    print(f"{'favori':>7}{'sorgu/istek':>13}{'p50 ms':>9}{'dönen':>8}")
+    counts = set()
+    for size in SIZES:
+        email = f'fav{size}-{time.time_ns()}@example.com'
+        token = client.post('/api/auth/register', json={'email': email, 'password': 'bench123'}).get_json()['token']
+        headers = {'Authorization': f'Bearer {token}'}
+        with m.app.app_context():
+            user_id = m.User.query.filter_by(email=email).first().id
+            db.session.execute(db.insert(m.Favorite), [
+                {'user_id': user_id, 'product_id': i} for i in range(1, size + 1)
+            ])
+            db.session.commit()
+
+        client.get('/api/favorites', headers=headers)  # auth cache'i ısıt
+        timings = []
+        for _ in range(args.repeat):
+            queries.append(0)
+            started = time.perf_counter()
+            response = client.get(f'/api/favorites?per_page={args.per_page}', headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+            body = response.get_json()
+            assert response.status_code == 200, body
+        assert all(f['latest_price']['price'] == 100.0 for f in body['favorites'])
+
+        per_request = set(queries[-args.repeat:])
+        counts |= per_request
+        print(f'{size:>7}{max(per_request):>13}{percentile(timings, 50):>9.2f}{len(body["favorites"]):>8}')
+
+    assert len(counts) == 1, f'Sorgu sayısı favori sayısına bağlı: {sorted(counts)}'
+    print(f'✅ Sabit sorgu sayısı: {counts.pop()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+/api/products/<id>/history benchmark'ı
+
+N noktalı (varsayılan 100k) fiyat geçmişi olan bir ürün için ham seri,
+points=500 ile LTTB ve min/max örnek azaltma ve dar bir from/to aralığını
+ölçer. Her istekten önce response cache geçersiz kılınır.
+
+    python benchmarks/bench_history.py --points 100000 --target 500
+"""
+
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from common import SEED_BASE_DATE, percentile, reset_schema, seed_products, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fiyat geçmişi benchmark')
+    parser.add_argument('--points', type=int, default=100_000)
+    parser.add_argument('--target', type=int, default=500)
+    parser.add_argument('--products', type=int, default=50, help='diğer ürünlerin de geçmişi olsun (index seçiciliği)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    db = m.db
+    rng = random.Random(5)
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, args.products)
+        for product_id in range(1, args.products + 1):
+            price = 1000.0
+            rows = []
+            for i in range(args.points):
+                price = max(1.0, price * rng.uniform(0.97, 1.03))
+                at = SEED_BASE_DATE + timedelta(minutes=15 * i)
+                rows.append({'product_id': product_id, 'price': round(price, 2), 'recorded_at': at, 'last_seen_at': at})
+            db.session.execute(db.insert(m.PriceHistory), rows)
+        db.session.commit()
+        plan = db.session.execute(db.text(
+            'EXPLAIN QUERY PLAN SELECT recorded_at, price FROM price_history '
+            "WHERE product_id = 1 AND recorded_at >= '2026-01-01' ORDER BY recorded_at"
+        )).all() if db.engine.dialect.name == 'sqlite' else []
+        print('plan:', ' | '.join(row[-1] for row in plan))
+
+    client = m.app.test_client()
+    middle = SEED_BASE_DATE + timedelta(minutes=15 * args.points // 2)
+    cases = {
+        'ham seri': '/api/products/1/history',
+        f'points={args.target} lttb': f'/api/products/1/history?points={args.target}',
+        f'points={args.target} minmax': f'/api/products/1/history?points={args.target}&method=minmax',
+        '1 günlük aralık': f'/api/products/1/history?from={middle.isoformat()}&to={(middle + timedelta(days=1)).isoformat()}',
+    }
+
+    print(f"{'senaryo':<22}{'p50 ms':>9}{'p99 ms':>9}{'nokta':>8}{'bytes':>10}")
+    for name, url in cases.items():
+        timings = []
+        for _ in range(args.repeat):
+            m.response_cache.invalidate()
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        print(f'{name:<22}{percentile(timings, 50):>9.1f}{percentile(timings, 99):>9.1f}'
+              f'{len(body["points"]):>8}{len(response.data):>10}')
+
+
+if __name__ == '__main__':
+    main()
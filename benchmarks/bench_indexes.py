@@ -0,0 +1,149 @@
+"""
+Katalog index seti benchmark'ı
+
+Index'siz şema ile model index'lerini (ensure_indexes) karşılaştırır: her sıcak
+sorgu için EXPLAIN planı ve p50/p99 gecikme. Varsayılan hacim 500k ürün ve
+10M fiyat geçmişi satırıdır; hızlı deneme için --products/--history küçültün.
+
+    python benchmarks/bench_indexes.py --products 500000 --history 10000000 --output indexes.json
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import timedelta
+
+from common import PLATFORMS, SEED_BASE_DATE, percentile, reset_schema, seed_products, use_database
+
+
+def seed(m, n_products, n_history, n_users, n_links, chunk=20000):
+    db = m.db
+    rng = random.Random(42)
+    seed_products(m, n_products, chunk)
+
+    db.session.execute(db.insert(m.User), [
+        {'id': i, 'email': f'user{i}@example.com', 'password': 'x'} for i in range(1, n_users + 1)
+    ])
+
+    rows = []
+    for i in range(n_history):
+        rows.append({
+            'product_id': rng.randrange(1, n_products + 1),
+            'price': rng.uniform(100, 50000),
+            'recorded_at': SEED_BASE_DATE + timedelta(seconds=rng.randrange(10_000_000))
+        })
+        if len(rows) == chunk:
+            db.session.execute(db.insert(m.PriceHistory), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(m.PriceHistory), rows)
+
+    pairs = {(rng.randrange(1, n_users + 1), rng.randrange(1, n_products + 1)) for _ in range(n_links)}
+    db.session.execute(db.insert(m.Favorite), [{'user_id': u, 'product_id': p} for u, p in pairs])
+    db.session.execute(db.insert(m.PriceAlert), [
+        {'user_id': u, 'product_id': p, 'target_price': 100.0} for u, p in pairs
+    ])
+    db.session.commit()
+
+
+def hot_queries(m, n_products, n_users):
+    db, Product = m.db, m.Product
+    sort = (Product.discount_percent.desc(), Product.created_at.desc())
+
+    def some_product():
+        return random.randrange(1, n_products + 1)
+
+    return {
+        'products_page1': lambda: db.select(Product).order_by(*sort).limit(100),
+        'products_platform': lambda: db.select(Product).where(Product.platform == random.choice(PLATFORMS)).order_by(*sort).limit(100),
+        'bot_dedup_url': lambda: db.select(Product).where(Product.product_url == f'https://example.com/p/{some_product()}'),
+        'scraper_dedup_title': lambda: (lambda i: db.select(Product).where(Product.title == f'Ürün {i}', Product.platform == PLATFORMS[i % 3]))(some_product()),
+        'history_by_product': lambda: db.select(m.PriceHistory).where(m.PriceHistory.product_id == some_product()).order_by(m.PriceHistory.recorded_at),
+        'favorites_by_user': lambda: db.select(m.Favorite).where(m.Favorite.user_id == random.randrange(1, n_users + 1)),
+        'alerts_by_product': lambda: db.select(m.PriceAlert).where(m.PriceAlert.product_id == some_product()),
+    }
+
+
+def explain(m, stmt):
+    db = m.db
+    sql = str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    return [' '.join(str(col) for col in row) for row in db.session.execute(db.text(prefix + sql))]
+
+
+def measure(m, queries, iterations, max_seconds):
+    results = {}
+    for name, build in queries.items():
+        timings = []
+        deadline = time.perf_counter() + max_seconds
+        for _ in range(iterations):
+            stmt = build()
+            started = time.perf_counter()
+            m.db.session.execute(stmt).all()
+            timings.append((time.perf_counter() - started) * 1000)
+            if time.perf_counter() > deadline:
+                break
+        results[name] = {
+            'plan': explain(m, build()),
+            'samples': len(timings),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p99_ms': round(percentile(timings, 99), 3)
+        }
+        print(f"  {name:<22} p50 {results[name]['p50_ms']:>10.3f} ms   p99 {results[name]['p99_ms']:>10.3f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Katalog index seti benchmark')
+    parser.add_argument('--products', type=int, default=500_000)
+    parser.add_argument('--history', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--links', type=int, default=100_000, help='Favori ve alarm sayısı')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--max-seconds', type=float, default=10.0, help='Sorgu başına süre sınırı')
+    parser.add_argument('--database-url')
+    parser.add_argument('--output', help='Sonuçları JSON olarak yaz')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        db = m.db
+        reset_schema(m)
+        indexes = [index for table in db.metadata.sorted_tables for index in table.indexes]
+        for index in indexes:
+            index.drop(db.engine, checkfirst=True)
+
+        print(f"🌱 Seeding {args.products} ürün, {args.history} geçmiş satırı...")
+        started = time.perf_counter()
+        seed(m, args.products, args.history, args.users, args.links)
+        print(f"   {time.perf_counter() - started:.1f} sn")
+
+        queries = hot_queries(m, args.products, args.users)
+        report = {'products': args.products, 'history': args.history, 'dialect': db.engine.dialect.name}
+
+        print("\n⏱️ Index'siz:")
+        report['before'] = measure(m, queries, args.iterations, args.max_seconds)
+
+        started = time.perf_counter()
+        m.ensure_indexes()
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        print(f"\n🔧 Index'ler {time.perf_counter() - started:.1f} sn'de oluşturuldu")
+
+        print("\n⏱️ Index'li:")
+        report['after'] = measure(m, queries, args.iterations, args.max_seconds)
+
+        print("\n📋 Planlar:")
+        for name in queries:
+            print(f"  {name}")
+            print(f"    önce:  {' | '.join(report['before'][name]['plan'])}")
+            print(f"    sonra: {' | '.join(report['after'][name]['plan'])}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
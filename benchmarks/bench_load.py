@@ -0,0 +1,241 @@
+"""
+API yük ve gecikme benchmark'ı
+
+Seed'lenmiş yerel SQLite (varsayılan) veya PostgreSQL (--database-url) üzerinde
+gunicorn'u her worker class ile ayrı başlatır ve her senaryoyu sırayla
+--concurrency eşzamanlı istemciyle --seconds boyunca çalıştırır. Senaryo başına
+throughput ve p50/p95/p99 raporlanır; sonuçlar commit'ler arası karşılaştırma
+için JSON olarak yazılır (--compare ile önceki bir JSON'a göre fark).
+
+    python benchmarks/bench_load.py --products 50000 --workers 4 --worker-classes sync,gthread,gevent
+    python benchmarks/bench_load.py --compare benchmarks/results/load-abc1234-20261018T101500.json
+
+Response cache varsayılan olarak kapalıdır (CACHE_TTL=0): ölçülen uygulamanın
+kendisidir; --cache ile açılır. İstemci aynı makinede çalıştığı için düşük
+çekirdek sayısında sonuçlar istemci yükünü de içerir.
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from common import CATEGORIES, PLATFORMS, ROOT, percentile, reset_schema, seed_products, start_gunicorn, stop_gunicorn, use_database
+
+EMAIL = 'load@example.com'
+PASSWORD = 'load-password'
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Worker class -> gereken modül (yüklü değilse class atlanır)
+WORKER_MODULES = {'sync': None, 'gthread': None, 'gevent': 'gevent', 'eventlet': 'eventlet'}
+
+# ==================== SCENARIOS ====================
+
+def scenarios(products, bot_batch):
+    """ad -> (method, istek üreten fonksiyon); fonksiyon (path, json gövdesi) döner"""
+    per_page = 20
+    deep_page = max(1, products // per_page - 10)
+    counter = itertools.count()
+    ingest_run = f'{os.getpid()}-{int(time.time())}'
+
+    def bot_items(rng):
+        batch = next(counter)
+        return [{
+            'title': f'Yük Testi Ürünü {ingest_run}-{batch}-{i}',
+            'platform': rng.choice(PLATFORMS),
+            'category': rng.choice(CATEGORIES),
+            'current_price': 750.0,
+            'original_price': 1000.0,
+            'discount_percent': 25,
+            'image_url': '',
+            # Her batch'in yarısı mevcut ürünlerle çakışır (duplicate yolu)
+            'product_url': (f'https://example.com/p/{rng.randrange(1, products + 1)}' if i % 2
+                            else f'https://example.com/load/{ingest_run}/{batch}/{i}')
+        } for i in range(bot_batch)]
+
+    return {
+        'products': ('GET', lambda rng: ('/api/products?page=1', None)),
+        'products_filter': ('GET', lambda rng: (
+            f'/api/products?category={rng.choice(CATEGORIES)}&platform={rng.choice(PLATFORMS)}', None)),
+        'products_search': ('GET', lambda rng: (f'/api/products?search=ürün {rng.randrange(1, 1000)}', None)),
+        'products_deep_page': ('GET', lambda rng: (f'/api/products?page={deep_page}', None)),
+        'product_detail': ('GET', lambda rng: (f'/api/products/{rng.randrange(1, products + 1)}', None)),
+        'stats': ('GET', lambda rng: ('/api/stats', None)),
+        'login': ('POST', lambda rng: ('/api/auth/login', {'email': EMAIL, 'password': PASSWORD})),
+        'bot_ingest': ('POST', lambda rng: ('/api/bot/products/batch', {'products': bot_items(rng)})),
+    }
+
+# ==================== LOAD ====================
+
+def client(base, method, build, stop, seed, timings, errors):
+    session = requests.Session()
+    rng = random.Random(seed)
+    while not stop.is_set():
+        path, body = build(rng)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base + path, json=body, timeout=30)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        if ok:
+            timings.append(elapsed)
+        else:
+            errors.append(elapsed)
+
+
+def run_scenario(base, method, build, concurrency, seconds, warmup):
+    stop = threading.Event()
+    timings, errors = [], []
+    threads = [
+        threading.Thread(target=client, args=(base, method, build, stop, i, timings, errors))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(warmup)
+    del timings[:], errors[:]
+    started = time.perf_counter()
+    time.sleep(seconds)
+    measured = [timings[:], errors[:]]
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    ok, failed = measured
+    return {
+        'requests': len(ok),
+        'errors': len(failed),
+        'rps': round(len(ok) / elapsed, 1),
+        'p50_ms': round(percentile(ok, 50), 2),
+        'p95_ms': round(percentile(ok, 95), 2),
+        'p99_ms': round(percentile(ok, 99), 2),
+    }
+
+# ==================== SETUP ====================
+
+def prepare_database(url, products):
+    if url is None:
+        url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='indirimradar-load-'), 'load.db')
+    m = use_database(url)
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, products)
+        m.db.session.add(m.User(email=EMAIL, password=m.password_hasher.hash(PASSWORD)))
+        m.db.session.commit()
+        m.reconcile_stats()
+    return url
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nkarşılaştırma: {baseline['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    print(f"{'worker':<9}{'senaryo':<20}{'rps':>16}{'p95 ms':>20}")
+    for worker_class, results in current['results'].items():
+        for name, result in results.items():
+            before = baseline['results'].get(worker_class, {}).get(name)
+            if not before:
+                continue
+            rps_change = (result['rps'] / before['rps'] - 1) * 100 if before['rps'] else 0.0
+            p95_change = (result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0.0
+            print(f"{worker_class:<9}{name:<20}{before['rps']:>7.1f} {rps_change:>+7.1f}%"
+                  f"{before['p95_ms']:>11.1f} {p95_change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API yük ve gecikme benchmark')
+    parser.add_argument('--database-url', help='varsayılan: geçici SQLite (PostgreSQL için postgresql://...)')
+    parser.add_argument('--products', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='gthread worker başına thread')
+    parser.add_argument('--worker-classes', default='sync,gthread,gevent')
+    parser.add_argument('--scenarios', help='virgülle ayrılmış senaryo adları (varsayılan: hepsi)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--bot-batch', type=int, default=20)
+    parser.add_argument('--cache', action='store_true', help='response cache açık (CACHE_TTL=60)')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--output', help=f'JSON sonuç dosyası (varsayılan: {RESULTS_DIR}/load-<commit>-<zaman>.json)')
+    parser.add_argument('--compare', help='önceki bir sonuç JSON dosyası')
+    args = parser.parse_args()
+
+    database_url = prepare_database(args.database_url, args.products)
+    base = f'http://127.0.0.1:{args.port}'
+    selected = scenarios(args.products, args.bot_batch)
+    if args.scenarios:
+        selected = {name: selected[name] for name in args.scenarios.split(',')}
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'database': database_url.split(':', 1)[0],
+            'products': args.products,
+            'workers': args.workers,
+            'threads': args.threads,
+            'concurrency': args.concurrency,
+            'seconds': args.seconds,
+            'cache': args.cache,
+            'skipped_worker_classes': [],
+        },
+        'results': {},
+    }
+
+    print(f"{'worker':<9}{'senaryo':<20}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'hata':>7}")
+    for worker_class in args.worker_classes.split(','):
+        module = WORKER_MODULES.get(worker_class)
+        if module and importlib.util.find_spec(module) is None:
+            print(f"{worker_class:<9}atlandı ({module} yüklü değil)")
+            report['meta']['skipped_worker_classes'].append(worker_class)
+            continue
+
+        server = start_gunicorn(database_url, args.port, workers=args.workers, worker_class=worker_class,
+                                threads=args.threads if worker_class == 'gthread' else 1,
+                                env={'CACHE_TTL': '60' if args.cache else '0'})
+        results = report['results'][worker_class] = {}
+        try:
+            for name, (method, build) in selected.items():
+                result = results[name] = run_scenario(base, method, build, args.concurrency, args.seconds, args.warmup)
+                print(f"{worker_class:<9}{name:<20}{result['rps']:>9.1f}{result['p50_ms']:>9.1f}"
+                      f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['errors']:>7}")
+        finally:
+            stop_gunicorn(server)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{report['meta']['commit'] or 'local'}-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f'\nsonuçlar: {output}')
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
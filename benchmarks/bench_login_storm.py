@@ -0,0 +1,103 @@
+"""
+Login fırtınası sırasında ürün okuma gecikmesi
+
+gunicorn'u (gthread) önce sınırsız inline hashing (PASSWORD_HASH_WORKERS=0),
+sonra sunucu genelinde sınırlı hash slotlarıyla başlatır. Her modda ürün okuyucularının p50/p99'unu önce tek
+başına, sonra eşzamanlı login fırtınası altında ölçer.
+
+    python benchmarks/bench_login_storm.py --workers 2 --threads 8 --readers 8 --logins 16 --seconds 10
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from common import percentile, reset_schema, seed_products, start_gunicorn, stop_gunicorn, use_database
+
+EMAIL = 'storm@example.com'
+PASSWORD = 'storm-password'
+
+
+def prepare_database(products):
+    path = os.path.join(tempfile.mkdtemp(prefix='indirimradar-storm-'), 'storm.db')
+    m = use_database(f'sqlite:///{path}')
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, products)
+        m.db.session.add(m.User(email=EMAIL, password=m.password_hasher.hash(PASSWORD)))
+        m.db.session.commit()
+    return f'sqlite:///{path}'
+
+
+def hammer(url, stop, timings, statuses, payload=None):
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = session.post(url, json=payload) if payload else session.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        statuses.append(response.status_code)
+
+
+def sample_queue_depth(url, stop, depths):
+    session = requests.Session()
+    while not stop.is_set():
+        depths.append(session.get(url).json()['password_hashing']['queue_depth'])
+        time.sleep(0.1)
+
+
+def phase(base, readers, logins, seconds):
+    stop = threading.Event()
+    depths = [0]
+    read_timings, read_statuses = [], []
+    login_timings, login_statuses = [], []
+    threads = [
+        threading.Thread(target=hammer, args=(f'{base}/api/products/{i % 50 + 1}', stop, read_timings, read_statuses))
+        for i in range(readers)
+    ] + [
+        threading.Thread(target=hammer, args=(f'{base}/api/auth/login', stop, login_timings, login_statuses,
+                                              {'email': EMAIL, 'password': PASSWORD}))
+        for _ in range(logins)
+    ] + [threading.Thread(target=sample_queue_depth, args=(f'{base}/health', stop, depths))]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return read_timings, login_timings, login_statuses, max(depths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Login storm benchmark')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--hash-workers', type=int, default=2)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    database_url = prepare_database(1000)
+    base = f'http://127.0.0.1:{args.port}'
+
+    print(f"{'mod':<9}{'faz':<10}{'read p50':>10}{'read p99':>10}{'login/s':>9}{'503':>6}{'max kuyruk':>12}")
+    for mode, hash_workers in (('inline', 0), ('bounded', args.hash_workers)):
+        server = start_gunicorn(database_url, args.port, workers=args.workers,
+                                worker_class='gthread', threads=args.threads,
+                                env={'PASSWORD_HASH_WORKERS': str(hash_workers), 'CACHE_TTL': '0'})
+        try:
+            for name, logins in (('sakin', 0), ('fırtına', args.logins)):
+                reads, login_timings, statuses, depth = phase(base, args.readers, logins, args.seconds)
+                print(f"{mode:<9}{name:<10}{percentile(reads, 50):>10.1f}{percentile(reads, 99):>10.1f}"
+                      f"{statuses.count(200) / args.seconds:>9.1f}{statuses.count(503):>6}{depth:>12}")
+        finally:
+            stop_gunicorn(server)
+
+
+if __name__ == '__main__':
+    main()
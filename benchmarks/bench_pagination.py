@@ -0,0 +1,76 @@
+"""
+/api/products sayfalama benchmark'ı
+
+Offset (paginate + COUNT) ile cursor (keyset) modunu ilk sayfa ve derin
+sayfada (varsayılan 1000. sayfa) karşılaştırır. İstekler Flask test client
+üzerinden gider, yani JSON üretimi dahil ölçülür.
+
+    python benchmarks/bench_pagination.py --products 500000 --per-page 100 --deep-page 1000
+"""
+
+import argparse
+import time
+
+from common import percentile, reset_schema, seed_products, use_database
+
+
+def timed_get(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.get_json()
+    return response.get_json(), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/products sayfalama benchmark')
+    parser.add_argument('--products', type=int, default=500_000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--deep-page', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    needed = args.per_page * args.deep_page
+    if args.products < needed:
+        parser.error(f'--products en az {needed} olmalı')
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, args.products)
+        m.db.session.execute(m.db.text('ANALYZE'))
+        m.db.session.commit()
+
+    client = m.app.test_client()
+    base = f'/api/products?per_page={args.per_page}'
+
+    # Derin sayfanın cursor'ı: ilk sayfadan zincirleme yürü
+    cursor = ''
+    for _ in range(args.deep_page - 1):
+        body = client.get(f'{base}&cursor={cursor}').get_json()
+        cursor = body['next_cursor']
+
+    cases = {
+        'offset page 1': f'{base}&page=1',
+        f'offset page {args.deep_page}': f'{base}&page={args.deep_page}',
+        'offset page 1 (count=none)': f'{base}&page=1&count=none',
+        f'offset page {args.deep_page} (count=none)': f'{base}&page={args.deep_page}&count=none',
+        'cursor page 1': f'{base}&cursor=',
+        f'cursor page {args.deep_page}': f'{base}&cursor={cursor}',
+    }
+
+    offset_deep, _ = timed_get(client, cases[f'offset page {args.deep_page}'], 1)
+    cursor_deep, _ = timed_get(client, cases[f'cursor page {args.deep_page}'], 1)
+    assert [p['id'] for p in offset_deep['products']] == [p['id'] for p in cursor_deep['products']]
+
+    print(f"{'case':<32}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, url in cases.items():
+        _, timings = timed_get(client, url, args.repeat)
+        print(f"{name:<32}{percentile(timings, 50):>10.2f}{percentile(timings, 99):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
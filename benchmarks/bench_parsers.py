@@ -0,0 +1,154 @@
+"""
+Listing sayfası parse benchmark'ı: lxml (derlenmiş CSS seçiciler) vs BeautifulSoup
+
+benchmarks/fixtures altındaki (çevrimdışı, elle üretilmiş) Hepsiburada / N11 arama sayfalarını
+scraper.ListingParser ile ve aynı seçicileri BeautifulSoup'un varsayılan
+parser'ı (html.parser) üzerinde uygulayan referans uygulamayla parse eder.
+İki yolun ürettiği ürün listeleri birebir karşılaştırılır (fixture kontrolü),
+sayfa/sn ve sayfa başına RSS artışı (ayrı process'te, sayfa ağacı bellekteyken
+VmRSS farkı) raporlanır.
+
+    python benchmarks/bench_parsers.py --repeat 200
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from urllib.parse import urljoin
+
+from common import ROOT
+
+import scraper
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+PAGES = {
+    'Hepsiburada': ('hepsiburada_search.html', scraper.hepsiburada_parser, 35),
+    'N11': ('n11_search.html', scraper.n11_parser, 28),
+}
+
+
+def bs4_parse(parser, body, keyword, max_products):
+    """ListingParser.parse ile aynı çıktı; BeautifulSoup(html.parser) + soup.select"""
+    from bs4 import BeautifulSoup
+
+    selectors = parser.selectors
+    soup = BeautifulSoup(body, 'html.parser')
+    category = scraper.get_category_from_keyword(keyword)
+    products = []
+
+    def text(card, name):
+        element = card.select_one(selectors[name])
+        return ' '.join(element.get_text().split()) if element is not None else ''
+
+    for card in soup.select(selectors['card']):
+        if len(products) >= max_products:
+            break
+        link = card.select_one(selectors['link'])
+        title = text(card, 'title') or (link.get('title', '').strip() if link is not None else '')
+        current_price = scraper.clean_price(text(card, 'current_price'))
+        if not title or link is None or current_price <= 0:
+            continue
+        original_price = scraper.clean_price(text(card, 'original_price')) or current_price
+        image = card.select_one(selectors['image'])
+        image_url = (image.get('data-src') or image.get('src') or '') if image is not None else ''
+        discount = scraper.calculate_discount(original_price, current_price)
+        products.append({
+            'title': title,
+            'platform': parser.platform,
+            'category': category,
+            'current_price': current_price,
+            'original_price': original_price,
+            'discount_percent': discount,
+            'image_url': urljoin(parser.base_url, image_url) if image_url else '',
+            'product_url': urljoin(parser.base_url, link.get('href', '')),
+            'real_deal_status': scraper.is_real_deal(original_price, current_price, discount)
+        })
+    return scraper.category_classifier.classify_products(products, hint=category)
+
+
+ENGINES = {
+    'lxml': lambda parser, body: parser.parse(body, 'telefon', 100),
+    'bs4': lambda parser, body: bs4_parse(parser, body, 'telefon', 100),
+}
+
+
+def load(platform):
+    filename, parser, expected = PAGES[platform]
+    with open(os.path.join(FIXTURES, filename), encoding='utf-8') as f:
+        return f.read(), parser, expected
+
+
+def bs4_tree(body):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(body, 'html.parser')
+
+
+# Sayfanın bellekteki ağacı (parse sırasında tutulan asıl yapı)
+TREES = {
+    'lxml': lambda body: scraper.lxml_html.fromstring(body),
+    'bs4': bs4_tree,
+}
+
+
+def current_rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def rss_probe(engine, platform):
+    """Ayrı process'te: sayfa ağacı bellekteyken RSS artışı (KB)"""
+    body, _, _ = load(platform)
+    TREES[engine]('<html><body><p>x</p></body></html>')  # Import ve ilk kullanım maliyetleri ölçüme girmesin
+    gc.collect()
+    before = current_rss_kb()
+    tree = TREES[engine](body)
+    after = current_rss_kb()
+    print(json.dumps({'rss_kb': after - before, 'alive': tree is not None}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Listing parser benchmark')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--rss-probe', nargs=2, metavar=('ENGINE', 'PLATFORM'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.rss_probe:
+        rss_probe(*args.rss_probe)
+        return
+
+    print(f"{'platform':<13}{'engine':<7}{'KB':>6}{'ürün':>6}{'sayfa/sn':>10}{'ms/sayfa':>10}{'RSS/sayfa':>11}")
+    for platform in PAGES:
+        body, listing_parser, expected = load(platform)
+        reference = None
+        for engine, parse in ENGINES.items():
+            products = parse(listing_parser, body)
+            assert len(products) == expected, f'{platform}/{engine}: {len(products)} ürün, beklenen {expected}'
+            if reference is None:
+                reference = products
+            assert products == reference, f'{platform}: {engine} çıktısı lxml ile aynı değil'
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                parse(listing_parser, body)
+            elapsed = time.perf_counter() - started
+
+            probe = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--rss-probe', engine, platform],
+                capture_output=True, text=True, check=True, cwd=ROOT
+            )
+            rss = json.loads(probe.stdout.strip().splitlines()[-1])['rss_kb']
+
+            print(f"{platform:<13}{engine:<7}{len(body.encode()) // 1024:>6}{len(products):>6}"
+                  f"{args.repeat / elapsed:>10.1f}{elapsed / args.repeat * 1000:>10.2f}{rss / 1024:>9.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+save_to_database benchmark
+
+Eski satır satır döngü (2N+ round trip) ile set tabanlı bulk upsert'i
+insert-only ve update-only batch'lerde karşılaştırır.
+
+    python benchmarks/bench_save.py --rows 10000
+    python benchmarks/bench_save.py --rows 10000 --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import random
+from datetime import datetime
+
+from common import Timer, reset_schema, use_database
+
+
+def make_products(n, seed):
+    rng = random.Random(seed)
+    products = []
+    for i in range(n):
+        original = rng.uniform(100, 50000)
+        current = original * rng.uniform(0.4, 1.0)
+        discount = round((original - current) / original * 100)
+        products.append({
+            'title': f'Bench Ürün {i}',
+            'platform': rng.choice(['Trendyol', 'Hepsiburada', 'N11']),
+            'category': 'Elektronik',
+            'current_price': round(current, 2),
+            'original_price': round(original, 2),
+            'discount_percent': discount,
+            'image_url': f'https://img.example.com/{i}.jpg',
+            'product_url': f'https://example.com/p/{i}',
+            'real_deal_status': 'real' if discount >= 20 else 'normal'
+        })
+    return products
+
+
+def legacy_save(app_module, products):
+    """Önceki save_to_database döngüsü"""
+    app, db, Product, PriceHistory = app_module.app, app_module.db, app_module.Product, app_module.PriceHistory
+    with app.app_context():
+        for product_data in products:
+            existing = Product.query.filter_by(title=product_data['title'], platform=product_data['platform']).first()
+            if existing:
+                existing.current_price = product_data['current_price']
+                existing.original_price = product_data['original_price']
+                existing.discount_percent = product_data['discount_percent']
+                existing.real_deal_status = product_data['real_deal_status']
+                existing.updated_at = datetime.utcnow()
+                db.session.add(PriceHistory(product_id=existing.id, price=product_data['current_price']))
+            else:
+                new_product = Product(**product_data)
+                db.session.add(new_product)
+                db.session.flush()
+                db.session.add(PriceHistory(product_id=new_product.id, price=product_data['current_price']))
+        db.session.commit()
+
+
+def reset(app_module):
+    with app_module.app.app_context():
+        reset_schema(app_module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='save_to_database benchmark')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    app_module = use_database(args.database_url)
+    import scraper
+
+    inserts = make_products(args.rows, seed=1)
+    updates = make_products(args.rows, seed=2)
+    for old, new in zip(inserts, updates):
+        new['platform'] = old['platform']
+
+    results = {}
+    for name, save in (('legacy', lambda p: legacy_save(app_module, p)), ('bulk', scraper.save_to_database)):
+        reset(app_module)
+        with Timer() as insert_timer:
+            save(inserts)
+        with Timer() as update_timer:
+            save(updates)
+        results[name] = (insert_timer.elapsed, update_timer.elapsed)
+
+    print(f"\n{'path':<8}{'insert rows/s':>16}{'update rows/s':>16}")
+    for name, (insert_time, update_time) in results.items():
+        print(f"{name:<8}{args.rows / insert_time:>16,.0f}{args.rows / update_time:>16,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Scraper concurrency benchmark
+
+Eski seri akış (platformlar arası 1-2 sn, keyword'ler arası 2-4 sn global sleep)
+ile yeni eşzamanlı engine'i aynı simüle edilmiş ağ gecikmesiyle karşılaştırır.
+Gerçek siteler çağrılmaz; --scale tüm bekleme sürelerini orantılı küçültür.
+
+    python benchmarks/bench_scraper.py --category Elektronik --concurrency 6 --scale 0.1
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper
+
+
+def make_fake_scraper(platform, latency, scale):
+    def fake(keyword, max_products=10):
+        time.sleep(random.uniform(*latency) * scale)
+        return [{'title': f'{keyword} {platform} {i}', 'platform': platform} for i in range(max_products)]
+    return fake
+
+
+def legacy_serial(keywords, scrapers, max_per_keyword, scale):
+    """Önceki scrape_by_category / scrape_all_platforms döngüsü"""
+    products = []
+    for keyword in keywords:
+        for platform, fn in scrapers.items():
+            time.sleep(random.uniform(1, 2) * scale)
+            products.extend(fn(keyword, max_per_keyword))
+        time.sleep(random.uniform(2, 4) * scale)
+    return products
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scraper concurrency benchmark')
+    parser.add_argument('--category', choices=list(scraper.CATEGORIES.keys()))
+    parser.add_argument('--concurrency', type=int, default=scraper.DEFAULT_CONCURRENCY)
+    parser.add_argument('--latency', type=float, nargs=2, default=(0.3, 0.8),
+                        help='Simüle edilen istek süresi aralığı (sn)')
+    parser.add_argument('--scale', type=float, default=0.1, help='Tüm bekleme sürelerinin çarpanı')
+    args = parser.parse_args()
+
+    categories = [args.category] if args.category else list(scraper.CATEGORIES.keys())
+    keywords = [k for c in categories for k in scraper.CATEGORIES[c][:3]]
+    scrapers = {p: make_fake_scraper(p, args.latency, args.scale) for p in scraper.PLATFORM_SCRAPERS}
+
+    started = time.perf_counter()
+    serial_products = legacy_serial(keywords, scrapers, 3, args.scale)
+    serial_time = time.perf_counter() - started
+
+    limiter = scraper.HostRateLimiter(scale=args.scale)
+    started = time.perf_counter()
+    concurrent_products = scraper.scrape_keywords(keywords, 3, args.concurrency, limiter=limiter, scrapers=scrapers)
+    concurrent_time = time.perf_counter() - started
+
+    assert len(serial_products) == len(concurrent_products)
+
+    print(f"Keyword: {len(keywords)}, görev: {len(keywords) * len(scrapers)}, scale: {args.scale}")
+    print(f"Seri (eski):        {serial_time:8.2f} sn")
+    print(f"Eşzamanlı (c={args.concurrency}):  {concurrent_time:8.2f} sn")
+    print(f"Hızlanma:           {serial_time / concurrent_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
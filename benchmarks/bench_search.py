@@ -0,0 +1,99 @@
+"""
+Arama benchmark'ı: eski ILIKE filtresi vs. Türkçe normalize arama index'i
+
+Türkçe karakterli sentetik başlıklardan oluşan bir korpus üzerinde her iki
+yolu /api/products'ın sorgu şekliyle (filtre + sıralama + LIMIT) ölçer ve
+eşleşme sayılarını karşılaştırır (ILIKE 'IŞIK' ile 'ışık'ı eşleştiremez).
+
+    python benchmarks/bench_search.py --titles 500000
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import or_
+
+from common import percentile, reset_schema, use_database
+
+BRANDS = ['Samsung', 'Apple', 'Xiaomi', 'Arçelik', 'Beko', 'Vestel', 'Nike', 'Adidas', 'Koton', 'LC Waikiki', 'Philips', 'Karaca']
+NOUNS = ['Akıllı Telefon', 'Çamaşır Makinesi', 'Bulaşık Makinesi', 'Işıklı Ayna', 'Şarj Aleti', 'Gömlek', 'Spor Ayakkabı',
+         'Çay Makinesi', 'Kulaklık', 'Ütü', 'Süpürge', 'Dizüstü Bilgisayar', 'Yağmurluk', 'Deri Çanta', 'Çocuk Oyuncağı']
+ADJECTIVES = ['Siyah', 'Beyaz', 'Kırmızı', 'Gümüş', 'Büyük', 'Küçük', 'Şık', 'Özel Seri', 'İnce', 'Ilık Renk']
+QUERIES = ['çamaşır', 'ÇAMAŞIR', 'camasir', 'ışıklı ayna', 'IŞIKLI', 'şarj', 'SARJ', 'ütü', 'İNCE', 'samsung kulaklık', 'gömlek siyah']
+
+
+def seed_titles(m, n, chunk=20000):
+    rng = random.Random(7)
+    rows = []
+    for i in range(1, n + 1):
+        title = f'{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}'
+        rows.append({
+            'id': i, 'title': title, 'platform': rng.choice(['Trendyol', 'Hepsiburada', 'N11']),
+            'category': 'Elektronik', 'current_price': 100.0, 'original_price': 200.0,
+            'discount_percent': rng.randrange(80), 'image_url': '', 'product_url': f'https://example.com/p/{i}',
+            'real_deal_status': 'real'
+        })
+        if len(rows) == chunk:
+            m.db.session.execute(m.db.insert(m.Product), rows)
+            rows = []
+    if rows:
+        m.db.session.execute(m.db.insert(m.Product), rows)
+    m.db.session.commit()
+
+
+def ordered(m, query):
+    P = m.Product
+    return query.order_by(P.discount_percent.desc(), P.created_at.desc(), P.id.desc()).limit(100)
+
+
+def legacy(m, term):
+    P = m.Product
+    return ordered(m, P.query.filter(or_(P.title.ilike(f'%{term}%'), P.platform.ilike(f'%{term}%'), P.category.ilike(f'%{term}%'))))
+
+
+def indexed(m, term):
+    from search import apply_search
+    return ordered(m, apply_search(m.db, m.Product, m.Product.query, term))
+
+
+def run(m, build, repeat):
+    results = {}
+    for term in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            items = build(m, term).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[term] = (len(items), percentile(timings, 50), percentile(timings, 99))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Arama benchmark')
+    parser.add_argument('--titles', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        reset_schema(m)
+        started = time.perf_counter()
+        seed_titles(m, args.titles)
+        print(f"🌱 {args.titles} başlık {time.perf_counter() - started:.1f} sn'de eklendi (index senkronu dahil)")
+
+        from search import get_backend
+        print(f"🔎 Backend: {get_backend(m.db)}\n")
+
+        old = run(m, legacy, args.repeat)
+        new = run(m, indexed, args.repeat)
+
+    print(f"{'sorgu':<18}{'ILIKE hit':>10}{'p50 ms':>9}{'p99 ms':>9}   {'index hit':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    for term in QUERIES:
+        o, n = old[term], new[term]
+        print(f"{term:<18}{o[0]:>10}{o[1]:>9.2f}{o[2]:>9.2f}   {n[0]:>10}{n[1]:>9.2f}{n[2]:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Ürün serileştirme benchmark'ı
+
+Eski yolu (tam ORM entity + 14 anahtarlı dict + jsonify) yeni
+serileştirme katmanı (kolon seçimi + ProductSerializer + orjson) ile
+karşılaştırır: varsayılan, compact=1 ve fields=id,title,current_price.
+Sorgu + dict + JSON süresi ve yanıt boyutu ölçülür.
+
+    python benchmarks/bench_serializer.py --products 20000 --per-page 100 1000
+"""
+
+import argparse
+import time
+
+from common import percentile, reset_schema, seed_products, use_database
+
+
+def legacy_list_item(p):
+    """app.py'deki eski product_list_item'ın kopyası (karşılaştırma için)"""
+    return {
+        'id': p.id,
+        'title': p.title,
+        'platform': p.platform,
+        'category': p.category,
+        'current_price': float(p.current_price),
+        'original_price': float(p.original_price),
+        'discount_percent': p.discount_percent,
+        'image_url': p.image_url,
+        'image': p.image_url,  # Compatibility
+        'product_url': p.product_url,
+        'url': p.product_url,  # Compatibility
+        'real_deal_status': p.real_deal_status,
+        'created_at': p.created_at.isoformat() if p.created_at else None,
+        'updated_at': p.updated_at.isoformat() if p.updated_at else None
+    }
+
+
+def ordered(m, query):
+    P = m.Product
+    return query.order_by(P.discount_percent.desc(), P.created_at.desc(), P.id.desc())
+
+
+def legacy(m, per_page):
+    items = ordered(m, m.Product.query).limit(per_page).all()
+    return m.jsonify({'products': [legacy_list_item(p) for p in items]}).get_data()
+
+
+def serializer_case(fields_param, compact):
+    def run(m, per_page):
+        from serializers import LIST_FIELDS, ProductSerializer, dumps, parse_fields
+        serializer = ProductSerializer(parse_fields(fields_param, compact=compact, default=LIST_FIELDS))
+        rows = ordered(m, m.Product.query.with_entities(*serializer.columns(m.Product))).limit(per_page).all()
+        return dumps({'products': serializer.many(rows)})
+    return run
+
+
+CASES = {
+    'legacy (ORM + jsonify)': legacy,
+    'serializer': serializer_case(None, False),
+    'serializer compact=1': serializer_case(None, True),
+    'fields=id,title,current_price': serializer_case('id,title,current_price', False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ürün serileştirme benchmark')
+    parser.add_argument('--products', type=int, default=20_000)
+    parser.add_argument('--per-page', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    m = use_database(args.database_url)
+    with m.app.app_context():
+        reset_schema(m)
+        seed_products(m, args.products)
+        m.db.session.commit()
+
+    print(f"{'per_page':>8}  {'case':<32}{'p50 ms':>9}{'p99 ms':>9}{'bytes':>10}")
+    for per_page in args.per_page:
+        for name, run in CASES.items():
+            timings = []
+            with m.app.test_request_context():
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    body = run(m, per_page)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    m.db.session.expire_all()
+            print(f"{per_page:>8}  {name:<32}{percentile(timings, 50):>9.2f}"
+                  f"{percentile(timings, 99):>9.2f}{len(body):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Gunicorn cold-start benchmark'ı
+
+İki bootstrap modunu karşılaştırır:
+  per-worker: eski davranış; her worker app'i kendisi import edip init_db
+              çalıştırır (create_all, sayım, örnek veri, admin pbkdf2 hash'i)
+  once:       gunicorn_config.py; app master'da bir kez import edilir,
+              init_db on_starting'de bir kez çalışır, worker'lar fork ile açılır
+
+Her mod boş ve dolu (ikinci açılış) veritabanında ölçülür. Worker başına
+açılış süresi post_fork -> post_worker_init arası; toplam cold start komut
+verildikten tüm worker'lar hazır olana kadar geçen süredir. Boş veritabanında
+worker'lar örnek veri eklerken yarışırsa ürün sayısı 3'ten fazla çıkar.
+
+    python benchmarks/bench_startup.py --workers 17
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from common import ROOT, percentile, stop_gunicorn
+
+CONFIG = '''
+import os
+import time
+
+from gunicorn_config import *
+from gunicorn_config import on_starting as bootstrap_once
+
+bind = "127.0.0.1:{port}"
+workers = {workers}
+loglevel = "warning"
+accesslog = None
+timeout = 120
+preload_app = {preload}
+
+def on_starting(server):
+    if {preload}:
+        bootstrap_once(server)
+
+def post_fork(server, worker):
+    with open({log!r}, "a") as f:
+        f.write(f"fork {{worker.pid}} {{time.time()}}\\n")
+
+def post_worker_init(worker):
+    if not {preload}:
+        from app import init_db
+        init_db()
+    with open({log!r}, "a") as f:
+        f.write(f"ready {{worker.pid}} {{time.time()}}\\n")
+'''
+
+
+def run(mode, database_url, workers, port):
+    workdir = tempfile.mkdtemp(prefix='indirimradar-startup-')
+    log = os.path.join(workdir, 'workers.log')
+    config = os.path.join(workdir, 'bench_gunicorn.py')
+    with open(config, 'w') as f:
+        f.write(CONFIG.format(port=port, workers=workers, preload=mode == 'once', log=log))
+
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production',
+               PYTHONPATH=ROOT, INIT_DB_ON_START='true')
+    started = time.time()
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', config, 'app:app'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    first_request = None
+    deadline = started + 300
+    forks, ready = {}, {}
+    while time.time() < deadline:
+        if first_request is None:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+                first_request = time.time() - started
+            except OSError:
+                pass
+        if os.path.exists(log):
+            with open(log) as f:
+                for line in f:
+                    kind, pid, at = line.split()
+                    (forks if kind == 'fork' else ready)[pid] = float(at)
+        if first_request is not None and len(ready) >= workers:
+            break
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn başlatılamadı')
+        time.sleep(0.05)
+
+    stop_gunicorn(process)
+    boot = [ready[pid] - forks[pid] for pid in ready if pid in forks]
+    return {
+        'first_request': first_request,
+        'all_ready': max(ready.values()) - started if ready else None,
+        'boot_p50': percentile(boot, 50),
+        'boot_max': max(boot) if boot else 0.0,
+        'ready': len(ready),
+    }
+
+
+def catalog_counts(database_url):
+    import sqlite3
+
+    connection = sqlite3.connect(database_url[len('sqlite:///'):])
+    products = connection.execute('SELECT COUNT(*) FROM product').fetchone()[0]
+    admins = connection.execute('SELECT COUNT(*) FROM user WHERE is_admin = 1').fetchone()[0]
+    connection.close()
+    return products, admins
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gunicorn cold-start benchmark')
+    parser.add_argument('--workers', type=int, default=17)
+    parser.add_argument('--port', type=int, default=5097)
+    args = parser.parse_args()
+
+    print(f'{args.workers} worker')
+    print(f"{'mod':<12}{'db':<8}{'ilk istek':>11}{'hepsi hazır':>13}{'worker p50':>12}{'worker max':>12}  ürün/admin")
+    for mode in ('per-worker', 'once'):
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='indirimradar-startup-db-'), 'app.db')
+        for label in ('boş', 'dolu'):
+            result = run(mode, database_url, args.workers, args.port)
+            products, admins = catalog_counts(database_url)
+            print(f"{mode:<12}{label:<8}{result['first_request']:>10.2f}s{result['all_ready']:>12.2f}s"
+                  f"{result['boot_p50']:>11.3f}s{result['boot_max']:>11.3f}s  {products}/{admins}"
+                  + ('' if result['ready'] == args.workers else f"  ({result['ready']} worker hazır)"))
+
+
+if __name__ == '__main__':
+    main()
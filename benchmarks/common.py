@@ -0,0 +1,127 @@
+"""
+Benchmark yardımcıları
+
+app.py import edilirken DATABASE_URL okunduğu için benchmark'lar app'i
+yalnızca use_database() üzerinden import etmelidir.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PLATFORMS = ['Trendyol', 'Hepsiburada', 'N11']
+CATEGORIES = ['Elektronik', 'Moda', 'Ev', 'Süpermarket', 'Kozmetik']
+SEED_BASE_DATE = datetime(2026, 1, 1)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def use_database(url=None):
+    """DATABASE_URL'i ayarla (varsayılan: geçici SQLite) ve app modülünü döndür"""
+    if url is None:
+        url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='indirimradar-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = url
+
+    import app
+    return app
+
+
+def percentile(values, pct):
+    """Sıralı olmayan listeden yüzdelik (nearest-rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+
+
+def seed_products(m, n, chunk=20000, seed=42):
+    """id'leri 1..n olan sentetik ürünleri Core executemany ile ekle (commit etmez)"""
+    db = m.db
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, n + 1):
+        original = rng.uniform(100, 50000)
+        current = original * rng.uniform(0.4, 1.0)
+        rows.append({
+            'id': i,
+            'title': f'Ürün {i}',
+            'platform': PLATFORMS[i % 3],
+            'category': CATEGORIES[i % 5],
+            'current_price': current,
+            'original_price': original,
+            'discount_percent': round((original - current) / original * 100),
+            'image_url': f'https://img.example.com/{i}.jpg',
+            'product_url': f'https://example.com/p/{i}',
+            'real_deal_status': 'real',
+            'created_at': SEED_BASE_DATE + timedelta(seconds=rng.randrange(10_000_000)),
+            'updated_at': SEED_BASE_DATE
+        })
+        if len(rows) == chunk:
+            db.session.execute(db.insert(m.Product), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(m.Product), rows)
+
+
+def reset_schema(m):
+    """Tüm tabloları ve arama index'ini sıfırdan oluştur (seed'li örnek veriler dahil silinir)"""
+    from search import drop_search_index, setup_search_index
+
+    drop_search_index(m.db)
+    m.db.drop_all()
+    m.db.create_all()
+    setup_search_index(m.db, m.Product)
+
+
+def start_gunicorn(database_url, port, workers=4, worker_class='sync', threads=1, env=None, timeout=30):
+    """app:app'i ayrı bir gunicorn process'inde (gunicorn_config.py gibi preload ile) başlat ve /health cevap verene kadar bekle"""
+    import subprocess
+    import urllib.request
+
+    process_env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production', **(env or {}))
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app:app',
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--worker-class', worker_class,
+        '--threads', str(threads),
+        '--preload',
+        '--log-level', 'warning',
+    ]
+    process = subprocess.Popen(command, cwd=ROOT, env=process_env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('gunicorn başlatılamadı')
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError('gunicorn zaman aşımı')
+
+
+def stop_gunicorn(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except Exception:
+        process.kill()
@@ -0,0 +1,199 @@
+"""
+İndirimRadar Cache
+Process içi TTL/LRU cache ve ürün okuma endpoint'leri için katalog
+versiyonu ile geçersiz kılınan JSON yanıt cache'i (strong ETag / 304)
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+
+# ==================== BACKENDS ====================
+
+class TTLCache:
+    """Thread-safe, boyutu sınırlı LRU; her kayıt ttl saniye sonra düşer"""
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class MemoryBackend:
+    """Process içi LRU + TTL; her gunicorn worker'ı yanıtların kendi kopyasını tutar
+
+    version_store verilirse katalog versiyonu orada tutulur (ör. veritabanı satırı):
+    başka bir worker'ın, scheduler'ın veya scraper'ın invalidation'ı bu process'in
+    yanıtlarını da geçersiz kılar. Verilmezse versiyon yalnızca bu process'e aittir.
+    """
+
+    def __init__(self, max_entries=512, ttl=60, version_store=None):
+        self.entries = TTLCache(max_entries, ttl)
+        self.version_store = version_store
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries.set(key, value)
+
+    def _observe(self, version):
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                # Eski versiyonun anahtarları bir daha okunmaz; yer açmak için temizle
+                self.entries.clear()
+        return version
+
+    def get_version(self):
+        if self.version_store is None:
+            return self._version
+        return self._observe(self.version_store.get())
+
+    def bump_version(self):
+        if self.version_store is None:
+            return self._observe(self._version + 1)
+        return self._observe(self.version_store.bump())
+
+class RedisBackend:
+    """Paylaşılan cache: tüm worker ve replikalar aynı versiyonu ve yanıtları görür"""
+
+    def __init__(self, url, ttl=60, prefix='indirimradar:cache:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis için 'redis' paketi gerekli (pip install redis)")
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.hmget(self.prefix + key, 'etag', 'body')
+        if value[0] is None:
+            return None
+        return value[0].decode(), value[1]
+
+    def set(self, key, value):
+        etag, body = value
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping={'etag': etag, 'body': body})
+        pipe.expire(self.prefix + key, self.ttl)
+        pipe.execute()
+
+    def get_version(self):
+        return int(self.client.get(self.prefix + 'version') or 0)
+
+    def bump_version(self):
+        # Eski anahtarlar TTL ile kendiliğinden düşer
+        return self.client.incr(self.prefix + 'version')
+
+def create_backend(config, version_store=None):
+    """CACHE_BACKEND'e göre backend; version_store memory backend'in paylaşılan versiyonu"""
+    backend = config.get('CACHE_BACKEND', 'memory')
+    ttl = int(config.get('CACHE_TTL', 60))
+
+    if backend == 'redis':
+        return RedisBackend(config['CACHE_REDIS_URL'], ttl=ttl)
+    if backend == 'memory':
+        return MemoryBackend(max_entries=int(config.get('CACHE_MAX_ENTRIES', 512)), ttl=ttl,
+                             version_store=version_store)
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+# ==================== RESPONSE CACHE ====================
+
+class ResponseCache:
+    """GET yanıtlarını (yol + normalize query) anahtarıyla katalog versiyonu altında saklar"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def make_key(self, version):
+        # Boş değerler de anahtara girer: '?cursor=' (keyset ilk sayfa) offset modundan farklı yanıttır
+        args = sorted((k, v) for k, values in request.args.lists() for v in values)
+        raw = f'{version}|{request.path}|' + '&'.join(f'{k}={v}' for k, v in args)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def invalidate(self):
+        """Katalog değişti: tüm ürün yanıtları bir sonraki istekte yeniden üretilir"""
+        try:
+            return self.backend.bump_version()
+        except Exception as e:
+            print(f"⚠️ Cache invalidation error: {e}")
+
+    def _respond(self, etag, body):
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    def cached(self, view):
+        """200 yanıtları cache'le; If-None-Match eşleşirse gövdesiz 304 dön"""
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            try:
+                key = self.make_key(self.backend.get_version())
+                hit = self.backend.get(key)
+            except Exception as e:
+                print(f"⚠️ Cache read error: {e}")
+                return view(*args, **kwargs)
+
+            if hit is not None:
+                etag, body = hit
+                response = self._respond(etag, body)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            result = view(*args, **kwargs)
+            response = result if isinstance(result, Response) else None
+            if response is None or response.status_code != 200:
+                return result
+
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest()
+            try:
+                self.backend.set(key, (etag, body))
+            except Exception as e:
+                print(f"⚠️ Cache write error: {e}")
+
+            response = self._respond(etag, body)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return decorated
@@ -0,0 +1,151 @@
+"""
+İndirimRadar Category Classifier
+Ürün başlığından kategori: CATEGORIES anahtar kelimeleri ve ek terimler bir kez
+trie'ye derlenir, trie tek bir regex'e çevrilir (eşleştirme C regex motorunda,
+başlık başına tek geçiş). Başlıklar Türkçe normalize edilir, eşleşmeler
+kategori başına puanlanır; tek başlık, scrape sonucu veya katalog için toplu.
+"""
+
+import re
+
+from search import normalize_turkish
+
+DEFAULT_CATEGORY = 'Genel'
+
+# CATEGORIES'teki (scraper) sweep anahtar kelimeleri bu ağırlıkla eklenir
+KEYWORD_WEIGHT = 2.0
+# Sweep anahtar kelimesinin kategorisine eklenen puan: yalnızca eşitlik bozar,
+# başlıktaki tek bir eşleşmeyi geçemez
+HINT_WEIGHT = 0.5
+# Bu uzunluktaki ve daha uzun terimler Türkçe eklerle de eşleşir
+# ('ayakkabi' -> 'ayakkabisi'); kısalar ('tv', 'cay') tam kelime olmalı
+SUFFIX_MIN_LENGTH = 5
+
+# Başlıklarda sık geçen, sweep anahtar kelimesi olmayan terimler (ağırlık)
+CATEGORY_TERMS = {
+    'Elektronik': {
+        'akilli telefon': 3, 'cep telefonu': 3, 'iphone': 3, 'galaxy': 2, 'redmi': 2, 'notebook': 3,
+        'dizustu': 3, 'macbook': 3, 'ipad': 3, 'televizyon': 3, 'smart tv': 3, 'qled': 2, 'oled': 2,
+        'monitor': 2, 'klavye': 2, 'mouse': 2, 'airpods': 3, 'bluetooth': 1, 'powerbank': 2,
+        'sarj aleti': 2, 'playstation': 3, 'xbox': 3, 'ekran karti': 3, 'ssd': 2, 'robot supurge': 2,
+        'camasir makinesi': 2, 'bulasik makinesi': 2, 'buzdolabi': 2,
+    },
+    'Moda': {
+        'sneaker': 2, 'bot': 1, 'canta': 2, 'sweatshirt': 2, 'hoodie': 2, 'kazak': 2, 'etek': 2,
+        'jean': 2, 'sort': 1, 'mont': 2, 'kaban': 2, 'tisort': 2, 'tshirt': 2, 'terlik': 2,
+        'sandalet': 2, 'gozluk': 1, 'kemer': 1, 'corap': 2,
+    },
+    'Ev': {
+        'nevresim': 3, 'yorgan': 3, 'yastik': 2, 'hali': 2, 'kilim': 2, 'koltuk': 2, 'sandalye': 2,
+        'masa': 1, 'masasi': 2, 'yemek masasi': 3, 'kahve makinesi': 3, 'gardirop': 3, 'tencere': 3,
+        'tava': 2, 'catal bicak': 3, 'bardak': 2, 'tabak': 2,
+        'avize': 3, 'lamba': 2, 'abajur': 3, 'havlu': 2, 'saksi': 2,
+    },
+    'Süpermarket': {
+        'zeytinyagi': 3, 'makarna': 3, 'pirinc': 3, 'bulgur': 3, 'un': 1, 'seker': 1, 'cikolata': 2,
+        'biskuvi': 3, 'su': 1, 'maden suyu': 3, 'kola': 2, 'meyve suyu': 3, 'camasir suyu': 3,
+        'bulasik deterjani': 3, 'yumusatici': 3, 'tuvalet kagidi': 3, 'pecete': 2, 'bebek bezi': 3,
+        'kedi mamasi': 3, 'kopek mamasi': 3,
+    },
+    'Kozmetik': {
+        'ruj': 3, 'maskara': 3, 'fondoten': 3, 'kapatici': 3, 'allik': 3, 'oje': 3, 'eyeliner': 3,
+        'sampuan': 3, 'sac kremi': 3, 'sac boyasi': 3, 'nemlendirici': 3, 'serum': 2, 'gunes kremi': 3,
+        'deodorant': 3, 'edp': 2, 'edt': 2, 'tiras': 2, 'kolonya': 2,
+    },
+}
+
+def normalize_term(term):
+    """'akilli-saat' / 'Akıllı Saat' -> 'akilli saat'"""
+    return ' '.join(re.findall(r'\w+', normalize_turkish(term)))
+
+# ==================== TRIE ====================
+
+_END = ''  # Trie düğümünde "burada bir terim bitiyor" anahtarı
+
+def _trie_pattern(node):
+    """Trie düğümünü regex'e çevir; uzun dallar önce denenir (en uzun eşleşme)"""
+    branches = []
+    for char in sorted(node):
+        if char == _END:
+            continue
+        branches.append(re.escape(char) + _trie_pattern(node[char]))
+
+    end = node.get(_END)
+    if end is not None:
+        # Kısa terim tam kelime, uzun terim ekli haliyle de eşleşir
+        branches.append('' if end == 'prefix' else r'(?!\w)')
+
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+class CategoryClassifier:
+    """Başlık -> kategori; terimler bir kez derlenir, eşleşmeler kategori başına puanlanır"""
+
+    def __init__(self, categories, extra_terms=None, default=DEFAULT_CATEGORY):
+        self.default = default
+        self.terms = {}  # normalize terim -> [(kategori, ağırlık)]
+
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                self._add(normalize_term(keyword), category, KEYWORD_WEIGHT)
+        for category, terms in (extra_terms or {}).items():
+            for term, weight in terms.items():
+                self._add(normalize_term(term), category, weight)
+
+        self.categories = list(dict.fromkeys(list(categories) + list(extra_terms or {})))
+        # Sweep anahtar kelimesi (örn. 'kulaklik') -> kategori; ipucu olarak kullanılır
+        self.keyword_categories = {
+            normalize_term(keyword): category
+            for category, keywords in categories.items() for keyword in keywords
+        }
+
+        trie = {}
+        for term in self.terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[_END] = 'prefix' if len(term) >= SUFFIX_MIN_LENGTH else 'word'
+        self._pattern = re.compile(r'(?<!\w)' + _trie_pattern(trie)) if trie else None
+
+    def _add(self, term, category, weight):
+        if term:
+            self.terms.setdefault(term, []).append((category, weight))
+
+    def matches(self, normalized):
+        """Normalize edilmiş metindeki terimler (soldan, çakışmasız, en uzun)"""
+        return self._pattern.findall(normalized) if self._pattern else []
+
+    def scores(self, title, hint=None):
+        scores = {}
+        for term in self.matches(normalize_turkish(title)):
+            # Ekli eşleşmede ('ayakkabisi') findall terimin kendisini döndürür
+            for category, weight in self.terms[term]:
+                scores[category] = scores.get(category, 0.0) + weight
+        if hint and scores:
+            scores[hint] = scores.get(hint, 0.0) + HINT_WEIGHT
+        return scores
+
+    def classify(self, title, hint=None):
+        """En yüksek puanlı kategori; eşleşme yoksa hint, o da yoksa default"""
+        scores = self.scores(title, hint)
+        if not scores:
+            return hint or self.default
+        return max(scores.items(), key=lambda item: item[1])[0]
+
+    def classify_many(self, titles, hint=None):
+        classify = self.classify
+        return [classify(title, hint) for title in titles]
+
+    def category_for_keyword(self, keyword):
+        """Sweep anahtar kelimesinin kategorisi (CATEGORIES'te yoksa başlık gibi sınıflandırılır)"""
+        normalized = normalize_term(keyword)
+        category = self.keyword_categories.get(normalized)
+        return category or self.classify(keyword)
+
+    def classify_products(self, products, hint=None):
+        """Scrape sonucu ürün dict'lerinin 'category' alanını başlıktan belirle (yerinde)"""
+        categories = self.classify_many([product.get('title', '') for product in products], hint)
+        for product, category in zip(products, categories):
+            product['category'] = category
+        return products
@@ -0,0 +1,219 @@
+"""
+İndirimRadar Deal Scoring
+real_deal_status'u fiyat geçmişinden toplu yeniden hesaplar: PriceHistory
+sütun halinde (NumPy) ürün bazında gruplanır, 30/90 günlük zaman ağırlıklı
+medyan, minimum, maksimum ve volatilite tek geçişte çıkarılır
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+
+# ==================== THRESHOLDS ====================
+
+DAY = 86400.0
+WINDOWS = (30, 90)
+
+MIN_HISTORY_DAYS = 7        # 90 günde bu kadar gözlem yoksa indirim yüzdesine göre karar verilir
+INFLATED_ORIGINAL = 1.05    # Etiket fiyatı 90 günün en yüksek fiyatından bu kadar fazlaysa şişirilmiş
+NO_SAVING = 0.98            # 90 günlük medyanın altına inmeyen "indirim" sürekli kampanya, gerçek değil
+REAL_DROP = 0.90            # 30 veya 90 günlük medyanın en az %10 altı gerçek indirim
+VOLATILE = 0.25             # Fiyatı sürekli oynayan ürünlerde ayrıca dönemin en düşüğü olmalı
+CLAIMED_DISCOUNT = 20       # scraper.is_real_deal eşiği
+
+STATUSES = np.array(['normal', 'real', 'fake'])
+
+# ==================== COLUMNAR LOAD ====================
+
+def epoch_seconds(db, column):
+    """Zaman kolonunu SQL'de epoch saniyeye çevir (satır başına datetime parse etmemek için)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return (db.func.julianday(column) - 2440587.5) * DAY
+    if dialect == 'postgresql':
+        return db.extract('epoch', column)
+    return None
+
+HISTORY_DTYPE = np.dtype([('product_id', 'i8'), ('t', 'f8'), ('price', 'f8')])
+
+def load_history(db, PriceHistory, where):
+    """(product_id, t, price) yapılı dizi; ürün ve zamana göre sıralı"""
+    seconds = epoch_seconds(db, PriceHistory.recorded_at)
+    if seconds is None:
+        rows = db.session.connection().execute(
+            db.select(PriceHistory.product_id, PriceHistory.recorded_at, PriceHistory.price)
+            .where(where).order_by(PriceHistory.product_id, PriceHistory.recorded_at, PriceHistory.id)
+        )
+        epoch = datetime(1970, 1, 1)
+        return np.fromiter(((pid, (at - epoch).total_seconds(), price) for pid, at, price in rows), dtype=HISTORY_DTYPE)
+
+    rows = db.session.connection().execute(
+        db.select(PriceHistory.product_id, seconds, PriceHistory.price)
+        .where(where).order_by(PriceHistory.product_id, PriceHistory.recorded_at, PriceHistory.id)
+    )
+    return np.fromiter((tuple(row) for row in rows), dtype=HISTORY_DTYPE)
+
+def load_products(db, Product, where):
+    rows = db.session.connection().execute(
+        db.select(Product.id, Product.current_price, Product.original_price,
+                  Product.discount_percent, Product.real_deal_status)
+        .where(where).order_by(Product.id)
+    ).all()
+    if not rows:
+        return None
+    ids, current, original, discount, status = zip(*rows)
+    return {
+        'id': np.array(ids, dtype='i8'),
+        'current': np.array(current, dtype='f8'),
+        'original': np.array(original, dtype='f8'),
+        'discount': np.array(discount, dtype='f8'),
+        'status': np.array([s or '' for s in status], dtype=object),
+    }
+
+# ==================== FEATURES ====================
+
+def window_features(history, now, days):
+    """Pencere içindeki zaman ağırlıklı istatistikler; ürün başına bir satır
+
+    Geçmiş yalnızca fiyat değişimlerini tutar: her nokta bir sonraki noktaya
+    (son nokta için now'a) kadar geçerlidir ve penceredeki süresi kadar ağırlık alır.
+    """
+    pid = history['product_id']
+    t = history['t']
+    price = history['price']
+
+    end = np.empty_like(t)
+    end[:-1] = t[1:]
+    last = np.ones(len(t), dtype=bool)
+    last[:-1] = pid[1:] != pid[:-1]
+    end[last] = now
+
+    weight = np.minimum(end, now) - np.maximum(t, now - days * DAY)
+    keep = weight > 0
+    pid, price, weight = pid[keep], price[keep], weight[keep]
+    if not len(pid):
+        return {'product_id': pid}
+
+    # Grup içinde fiyata göre sırala: ağırlıklı medyan kümülatif ağırlıktan bulunur
+    order = np.lexsort((price, pid))
+    pid, price, weight = pid[order], price[order], weight[order]
+
+    starts = np.flatnonzero(np.r_[True, pid[1:] != pid[:-1]])
+    ends = np.r_[starts[1:], len(pid)]
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+
+    total = np.add.reduceat(weight, starts)
+    cumulative = np.cumsum(weight)
+    base = cumulative[starts] - weight[starts]
+    median_at = np.searchsorted(cumulative, base + total / 2, side='left')
+    median_at = np.minimum(median_at, ends - 1)
+
+    mean = np.add.reduceat(weight * price, starts) / total
+    variance = np.add.reduceat(weight * (price - mean[group]) ** 2, starts) / total
+
+    return {
+        'product_id': pid[starts],
+        'days': total / DAY,
+        'median': price[median_at],
+        'min': np.minimum.reduceat(price, starts),
+        'max': np.maximum.reduceat(price, starts),
+        'volatility': np.sqrt(variance) / mean,
+    }
+
+def align(features, ids, key, fill=np.nan):
+    """Özellik dizisini ürün id sırasına yerleştir (geçmişi olmayanlar fill)"""
+    out = np.full(len(ids), fill, dtype='f8')
+    if len(features['product_id']) and len(ids):
+        # Geçmişte yüklenmemiş bir ürün olabilir: searchsorted komşu id'nin yerini verir
+        positions = np.minimum(np.searchsorted(ids, features['product_id']), len(ids) - 1)
+        found = ids[positions] == features['product_id']
+        out[positions[found]] = features[key][found]
+    return out
+
+# ==================== CLASSIFICATION ====================
+
+def classify(products, history, now):
+    """Her ürün için 'real', 'normal' veya 'fake'"""
+    ids = products['id']
+    current = products['current']
+    original = products['original']
+    claimed = products['discount'] >= CLAIMED_DISCOUNT
+
+    recent = window_features(history, now, WINDOWS[0])
+    long = window_features(history, now, WINDOWS[1])
+    median30 = align(recent, ids, 'median')
+    median90 = align(long, ids, 'median')
+    min90 = align(long, ids, 'min')
+    max90 = align(long, ids, 'max')
+    volatility = align(long, ids, 'volatility', fill=0.0)
+    covered = align(long, ids, 'days', fill=0.0) >= MIN_HISTORY_DAYS
+
+    with np.errstate(invalid='ignore'):
+        inflated = original > max90 * INFLATED_ORIGINAL
+        no_saving = current >= median90 * NO_SAVING
+        below_typical = (current <= median90 * REAL_DROP) | (current <= median30 * REAL_DROP)
+        at_low = current <= min90 * 1.001
+
+    fake = covered & claimed & (inflated | no_saving)
+    real = covered & ~fake & below_typical & ((volatility <= VOLATILE) | at_low)
+    # Yeterli geçmiş yok: scraper.is_real_deal ile aynı kural
+    real |= ~covered & claimed
+
+    return STATUSES[np.where(fake, 2, np.where(real, 1, 0))]
+
+# ==================== BATCH JOB ====================
+
+def recompute_deal_status(db, Product, PriceHistory, product_ids=None, now=None, batch_size=50000):
+    """real_deal_status'u yeniden hesapla ve yalnızca değişenleri toplu güncelle
+
+    product_ids None ise tüm katalog id aralıkları halinde (bellek batch_size ile
+    sınırlı), aksi halde yalnızca verilen ürünler işlenir. Commit çağırana aittir.
+    """
+    now_dt = now or datetime.utcnow()
+    now = (now_dt - datetime(1970, 1, 1)).total_seconds()
+    stats = {'products': 0, 'changed': 0, 'load_s': 0.0, 'compute_s': 0.0, 'write_s': 0.0,
+             'real': 0, 'normal': 0, 'fake': 0}
+
+    if product_ids is None:
+        bounds = db.session.execute(db.select(db.func.min(Product.id), db.func.max(Product.id))).one()
+        if bounds[0] is None:
+            return stats
+        batches = [
+            (Product.id.between(low, low + batch_size - 1), PriceHistory.product_id.between(low, low + batch_size - 1))
+            for low in range(bounds[0], bounds[1] + 1, batch_size)
+        ]
+    else:
+        ids = sorted(set(product_ids))
+        batches = [
+            (Product.id.in_(ids[i:i + batch_size]), PriceHistory.product_id.in_(ids[i:i + batch_size]))
+            for i in range(0, len(ids), batch_size)
+        ]
+
+    for product_filter, history_filter in batches:
+        started = time.perf_counter()
+        products = load_products(db, Product, product_filter)
+        if products is None:
+            continue
+        history = load_history(db, PriceHistory, history_filter)
+        stats['load_s'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        status = classify(products, history, now)
+        changed = np.flatnonzero(status != products['status'])
+        stats['compute_s'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        if len(changed):
+            db.session.execute(db.update(Product), [
+                {'id': int(products['id'][i]), 'real_deal_status': str(status[i]), 'updated_at': now_dt}
+                for i in changed
+            ])
+        stats['write_s'] += time.perf_counter() - started
+
+        stats['products'] += len(status)
+        stats['changed'] += len(changed)
+        for label in STATUSES:
+            stats[label] += int(np.count_nonzero(status == label))
+
+    return stats
@@ -0,0 +1,195 @@
+"""
+İndirimRadar Duplicate Detection
+Katalogdaki aynı ürünün kopyalarını bulur: aynı fingerprint'e (identity.py)
+sahip satırlar kesin kopyadır; başlığı neredeyse aynı olanlar MinHash
+imzaları ve LSH bantlarıyla aday çiftlere indirgenir. İmzalar NumPy ile
+sütun halinde, bant bant hesaplanır (tam imza matrisi bellekte tutulmaz).
+Adaylar aynı platformda olmalı ve kelime kümesi Jaccard benzerliği, sayı
+içeren terimler (128 GB, 42 numara, model kodu) ve fiyat oranıyla doğrulanır.
+"""
+
+import re
+import time
+
+import numpy as np
+
+from search import normalize_turkish
+
+# ==================== PARAMETERS ====================
+
+NUM_PERM = 64           # MinHash permütasyon sayısı
+BANDS = 16              # LSH bant sayısı (bant başına NUM_PERM / BANDS değer)
+THRESHOLD = 0.85        # Başlık kelime kümesi Jaccard benzerliği alt sınırı
+PRICE_RATIO = 1.5       # Kopyalardan pahalı olanın fiyatı ucuzun en fazla bu katı olabilir
+SEED = 20261018
+
+# (a * x + b) mod P; a < 2^31 ve x < 2^32 olduğundan çarpım uint64'e taşmaz
+HASH_PRIME = np.uint64(4294967311)
+BAND_MULTIPLIER = np.uint64(1000003)
+
+TOKEN_RE = re.compile(r'\w+')
+DIGIT_RE = re.compile(r'\d')
+
+# ==================== TOKENS ====================
+
+def tokenize(titles):
+    """Başlıkları tekrarsız kelime id'lerine çevir
+
+    (tokens, offsets, numeric) döner: başlık i'nin kelimeleri
+    tokens[offsets[i]:offsets[i + 1]] aralığıdır; numeric[i] sayı içeren
+    kelimelerin kümesinin hash'idir (aynı değilse başlıklar farklı üründür).
+    """
+    vocab = {}
+    tokens = []
+    offsets = np.zeros(len(titles) + 1, dtype=np.int64)
+    numeric = np.zeros(len(titles), dtype=np.int64)
+
+    for i, title in enumerate(titles):
+        words = dict.fromkeys(TOKEN_RE.findall(normalize_turkish(title)))  # Görülme sırası: id'ler deterministik
+        tokens.extend(vocab.setdefault(word, len(vocab)) for word in words)
+        offsets[i + 1] = len(tokens)
+        numbers = [word for word in words if DIGIT_RE.search(word)]
+        if numbers:
+            numeric[i] = hash(frozenset(numbers))
+
+    return np.array(tokens, dtype=np.uint64), offsets, numeric
+
+# ==================== MINHASH / LSH ====================
+
+def band_keys(tokens, offsets, rows, rng):
+    """Bir bandın anahtarı: rows adet MinHash değerinin birleşimi (boş başlıklar için 0)"""
+    lengths = np.diff(offsets)
+    nonempty = lengths > 0
+    starts = offsets[:-1][nonempty]
+    keys = np.zeros(len(lengths), dtype=np.uint64)
+
+    for _ in range(rows):
+        a = np.uint64(rng.integers(1, 2 ** 31))
+        b = np.uint64(rng.integers(0, 2 ** 32))
+        hashed = (tokens * a + b) % HASH_PRIME
+        # reduceat boş aralıklarda komşu değeri döndürür; boş başlıklar ayrıca sıfırlanır
+        minimum = np.minimum.reduceat(hashed, starts) if len(starts) else np.zeros(0, dtype=np.uint64)
+        keys[nonempty] = keys[nonempty] * BAND_MULTIPLIER + minimum
+
+    keys[~nonempty] = 0
+    return keys
+
+def bucket_pairs(keys, groups, valid):
+    """Aynı (grup, anahtar) kovasındaki başlıklar -> kovanın ilk elemanıyla çiftler
+
+    Kova içi tüm çiftler yerine yıldız bağlantı: çift sayısı kova boyutuyla doğrusal,
+    bağlantılı bileşenler birleştirmede aynı sonucu verir.
+    """
+    index = np.flatnonzero(valid)
+    if not len(index):
+        return np.zeros((0, 2), dtype=np.int64)
+    order = index[np.lexsort((keys[index], groups[index]))]
+    sorted_keys = keys[order]
+    sorted_groups = groups[order]
+    same = (sorted_keys[1:] == sorted_keys[:-1]) & (sorted_groups[1:] == sorted_groups[:-1])
+    starts = np.concatenate(([True], ~same))
+    first = order[np.flatnonzero(starts)][np.cumsum(starts) - 1]
+    members = ~starts
+    return np.stack([first[members], order[members]], axis=1)
+
+def candidate_pairs(tokens, offsets, groups, num_perm=NUM_PERM, bands=BANDS, seed=SEED):
+    """LSH: en az bir bantta aynı kovaya düşen (aynı gruptaki) başlık çiftleri (i < j)"""
+    rng = np.random.default_rng(seed)
+    rows = num_perm // bands
+    valid = np.diff(offsets) > 0
+    if not valid.any():  # Boş katalog veya yalnızca boş başlıklar
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = [
+        bucket_pairs(band_keys(tokens, offsets, rows, rng), groups, valid)
+        for _ in range(bands)
+    ]
+    pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    pairs.sort(axis=1)
+    # Bantlar arası tekrarlar: çift tek int64 koda çevrilip tekilleştirilir (unique(axis=0)'dan hızlı)
+    size = np.int64(len(offsets) - 1)
+    codes = np.unique(pairs[:, 0] * size + pairs[:, 1])
+    return np.stack([codes // size, codes % size], axis=1)
+
+def jaccard(tokens, offsets, i, j):
+    left = set(tokens[offsets[i]:offsets[i + 1]].tolist())
+    right = set(tokens[offsets[j]:offsets[j + 1]].tolist())
+    return len(left & right) / len(left | right)
+
+def verify_pairs(pairs, tokens, offsets, numeric, prices, threshold=THRESHOLD, price_ratio=PRICE_RATIO):
+    """Aday çiftlerden gerçek kopyalar: sayısal terimler ve fiyat (vektörel), sonra tam Jaccard"""
+    if not len(pairs):
+        return pairs
+    left, right = pairs[:, 0], pairs[:, 1]
+    low = np.minimum(prices[left], prices[right])
+    high = np.maximum(prices[left], prices[right])
+    keep = (numeric[left] == numeric[right]) & (high <= low * price_ratio)
+    pairs = pairs[keep]
+    return np.array(
+        [pair for pair in pairs.tolist() if jaccard(tokens, offsets, pair[0], pair[1]) >= threshold],
+        dtype=np.int64
+    ).reshape(-1, 2)
+
+# ==================== GROUPS ====================
+
+def connected_groups(size, pairs):
+    """Union-find; iki veya daha fazla elemanlı bileşenler (eleman sırası artan)"""
+    parent = list(range(size))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups = {}
+    for i in {int(x) for pair in pairs for x in pair}:
+        groups.setdefault(find(i), []).append(i)
+    return [sorted(members) for members in groups.values()]
+
+def find_duplicates(titles, platforms, prices, fingerprints, threshold=THRESHOLD,
+                    price_ratio=PRICE_RATIO, num_perm=NUM_PERM, bands=BANDS):
+    """Kopya grupları (katalog sırasındaki indeksler) ve süre/sayı istatistikleri
+
+    titles, platforms, fingerprints: liste; prices: float dizisi. Aynı fingerprint
+    her zaman birleşir; başlık benzerliği yalnızca aynı platform içinde aranır.
+    """
+    stats = {'products': len(titles)}
+    started = time.perf_counter()
+
+    exact = []
+    first_seen = {}
+    for i, fingerprint in enumerate(fingerprints):
+        if fingerprint is None:
+            continue
+        first = first_seen.setdefault(fingerprint, i)
+        if first != i:
+            exact.append((first, i))
+    stats['exact_pairs'] = len(exact)
+
+    platform_codes = {}
+    groups = np.array([platform_codes.setdefault(platform, len(platform_codes)) for platform in platforms],
+                      dtype=np.int64)
+    tokens, offsets, numeric = tokenize(titles)
+    stats['tokenize_s'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    candidates = candidate_pairs(tokens, offsets, groups, num_perm, bands)
+    stats['candidates'] = len(candidates)
+    stats['lsh_s'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    similar = verify_pairs(candidates, tokens, offsets, numeric, np.asarray(prices, dtype=np.float64),
+                           threshold, price_ratio)
+    stats['similar_pairs'] = len(similar)
+    stats['verify_s'] = time.perf_counter() - started
+
+    pairs = [tuple(pair) for pair in exact] + similar.tolist()
+    duplicate_groups = connected_groups(len(titles), pairs)
+    stats['groups'] = len(duplicate_groups)
+    stats['duplicates'] = sum(len(group) - 1 for group in duplicate_groups)
+    return duplicate_groups, stats
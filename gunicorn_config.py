@@ -1,14 +1,53 @@
 # gunicorn_config.py - Gunicorn configuration for production
 
-import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Prometheus multiprocess modu: her worker metriklerini bu dizine yazar, /metrics hepsini toplar.
+# app import edilmeden (preload) önce ayarlanmalı. Dizin master pid'ine özeldir; master
+# kapanırken (on_exit) silinir, çökmüş eski master'ların dizinleri açılışta temizlenir.
+METRICS_DIR_PREFIX = 'indirimradar-metrics-'
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _remove_stale_metrics_dirs():
+    root = tempfile.gettempdir()
+    for name in os.listdir(root):
+        pid = name[len(METRICS_DIR_PREFIX):]
+        if name.startswith(METRICS_DIR_PREFIX) and pid.isdigit() and not _pid_alive(int(pid)):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    _remove_stale_metrics_dirs()
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), f'{METRICS_DIR_PREFIX}{os.getpid()}')
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'])
 
 # Server socket
-bind = "0.0.0.0:5000"
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
 backlog = 2048
 
-# Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
+# Worker processes (worker sayısı / class seçimi için: benchmarks/bench_load.py)
+# Varsayılan tek process; eşzamanlılık thread'lerden gelir. Principal cache process'e özel
+# olduğundan (bir worker'daki rol/ban değişikliği diğerlerinde TTL boyunca görünmez) birden
+# fazla worker ancak AUTH_CACHE_TTL=0 ile açılır.
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+if workers > 1 and int(os.getenv('AUTH_CACHE_TTL', 30)) > 0:
+    raise RuntimeError(
+        f'WEB_CONCURRENCY={workers}: process-local auth cache worker\'lar arasında bayatlar; '
+        'AUTH_CACHE_TTL=0 ayarlayın veya tek worker kullanın'
+    )
+# gthread: password hash (GIL'i bırakır) bekleyen thread'ler sürerken diğer istekler sunulur
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', 8))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -19,6 +58,9 @@ errorlog = "-"
 loglevel = "info"
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"'
 
+# app master'da bir kez import edilir; worker'lar fork ile hazır açılır
+preload_app = True
+
 # Process naming
 proc_name = "indirimradar"
 
@@ -33,3 +75,32 @@ tmp_upload_dir = None
 # SSL (will be handled by Railway/Cloudflare)
 keyfile = None
 certfile = None
+
+
+# Server hooks
+def on_starting(server):
+    """Bootstrap'i (tablolar, index'ler, örnek veri, admin) worker'lar açılmadan master'da bir kez yap
+
+    INIT_DB_ON_START=false ise atlanır; o durumda deploy adımında `flask init-db` çalıştırılmalı.
+    """
+    if os.getenv('INIT_DB_ON_START', 'true').lower() != 'true':
+        return
+
+    from app import app, db, init_db
+
+    init_db()
+    # Master'ın pool'undaki bağlantılar fork ile worker'lara geçmesin
+    with app.app_context():
+        db.engine.dispose()
+
+def child_exit(server, worker):
+    """Ölen worker'ın gauge değerlerini topla dışında bırak (sayaçlar korunur)"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+def on_exit(server):
+    """Master kapanırken kendi oluşturduğu metrik dizinini sil (dışarıdan verilen dizine dokunma)"""
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+    if os.path.basename(path) == f'{METRICS_DIR_PREFIX}{os.getpid()}':
+        shutil.rmtree(path, ignore_errors=True)
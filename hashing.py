@@ -0,0 +1,106 @@
+"""
+İndirimRadar Password Hashing
+pbkdf2/scrypt hesaplamalarını sunucu genelinde sınırlı sayıda slotla çalıştırır:
+admission control (dolu kuyrukta HashingBusy), kuyruk derinliği metriği ve
+iş faktörü değiştiğinde login sırasında şeffaf rehash
+"""
+
+import multiprocessing
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+class HashingBusy(Exception):
+    """Hash kuyruğu dolu; istek reddedilmeli (503)"""
+
+# werkzeug'ün scrypt varsayılanı (n=2**15, r=8, p=1); sabit olarak dışa açılmıyor
+DEFAULT_SCRYPT_PARAMS = ('32768', '8', '1')
+
+def normalize_method(method):
+    """Yöntemi werkzeug'ün hash önekine yazdığı tam biçime çevir
+
+    'pbkdf2' / 'pbkdf2:sha256' -> 'pbkdf2:sha256:<varsayılan iterasyon>',
+    'scrypt' -> 'scrypt:32768:8:1'. needs_rehash öneki bununla karşılaştırır.
+    """
+    algorithm, *params = method.split(':')
+    if algorithm == 'pbkdf2':
+        if len(params) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = params[0] if params else 'sha256'
+        iterations = int(params[1]) if len(params) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if algorithm == 'scrypt':
+        if params and len(params) != 3:
+            raise ValueError("'scrypt' takes 3 arguments.")
+        return 'scrypt:' + ':'.join(str(int(value)) for value in (params or DEFAULT_SCRYPT_PARAMS))
+    raise ValueError(f'Unsupported password hash method: {method}')
+
+class PasswordHasher:
+    """Hash/check işlemlerini sunucu genelinde en fazla `workers` eşzamanlı slotla çalıştırır
+
+    hashlib pbkdf2/scrypt GIL'i bırakır; gthread worker'larında hash bekleyen thread
+    sürerken aynı process diğer istekleri sunmaya devam eder. Slot semaforu ve sayaçlar
+    paylaşımlı bellekte tutulur: app master'da import edildiğinde (preload_app) fork ile
+    tüm worker'lara geçer, böylece sınır worker sayısından bağımsızdır. Slot bekleyenler
+    `queue_limit`'i doldurunca yeni istekler HashingBusy ile reddedilir. workers=0 ise
+    sınır yoktur, hash çağıran thread'de doğrudan hesaplanır.
+    """
+
+    def __init__(self, method='pbkdf2:sha256', workers=2, queue_limit=16, timeout=10):
+        self.method = normalize_method(method)
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._slots = multiprocessing.BoundedSemaphore(max(workers, 1))
+        # Çalışan + slot bekleyen hash sayısı (tüm worker'lar); kilidi diğer sayaçları da korur
+        self._in_flight = multiprocessing.Value('i', 0)
+        self._completed = multiprocessing.Value('i', 0, lock=False)
+        self._rejected = multiprocessing.Value('i', 0, lock=False)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        lock = self._in_flight.get_lock()
+        with lock:
+            if self._in_flight.value >= self.workers + self.queue_limit:
+                self._rejected.value += 1
+                raise HashingBusy()
+            self._in_flight.value += 1
+
+        try:
+            if not self._slots.acquire(timeout=self.timeout):
+                with lock:
+                    self._rejected.value += 1
+                raise HashingBusy()
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+                with lock:
+                    self._completed.value += 1
+        finally:
+            with lock:
+                self._in_flight.value -= 1
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def check(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Kayıtlı hash yapılandırılmış yöntem/iş faktöründen farklı mı"""
+        return password_hash.split('$', 1)[0] != self.method
+
+    def stats(self):
+        with self._in_flight.get_lock():
+            in_flight = self._in_flight.value
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'in_flight': in_flight,
+                'queue_depth': max(0, in_flight - self.workers),
+                'queue_limit': self.queue_limit,
+                'completed': self._completed.value,
+                'rejected': self._rejected.value
+            }
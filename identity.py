@@ -0,0 +1,83 @@
+"""
+İndirimRadar Product Identity
+Ürün linklerini kanonik hale getirir ve platformdaki ürün numarasından kalıcı
+bir fingerprint üretir: takip parametreleri (utm_*, gclid, boutiqueId,
+merchantId, magaza...), fragment, host/şema farkları ve başlıktan gelen slug
+değişiklikleri aynı ürünü ayrı satıra bölmez. Bilinmeyen sitelerde
+fingerprint kanonik URL'in hash'idir.
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+FINGERPRINT_LENGTH = 64
+
+# Tüm sitelerde atılan takip / kampanya parametreleri
+TRACKING_PARAMS = {
+    'gclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid', 'yclid', 'dclid', 'igshid', 'ref', 'ref_src',
+    'referrer', 'source', 'affiliate', 'aff_id', 'campaign', 'adjust_tracker', 'sc_src', 'mc_cid', 'mc_eid',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'ga_')
+
+# host son eki -> (fingerprint öneki, path'ten ürün numarası). Ürün numarası
+# bulunan linklerde query tamamen atılır (satıcı, butik, varyant seçimi ürünün
+# kimliğini değiştirmez) ve path olduğu gibi kanonik linkte kalır.
+PLATFORM_RULES = (
+    # https://www.trendyol.com/apple/iphone-15-128-gb-p-762254888?boutiqueId=61&merchantId=968
+    ('trendyol.com', 'trendyol', re.compile(r'-p-(\d+)/?$')),
+    # https://www.hepsiburada.com/apple-iphone-15-128-gb-p-HBCV00004X9ZCH?magaza=...
+    ('hepsiburada.com', 'hepsiburada', re.compile(r'-pm?-([A-Za-z0-9]+)/?$')),
+    # https://www.n11.com/urun/apple-iphone-15-128-gb-2300845?magaza=...
+    # https://urun.n11.com/cep-telefonu/apple-iphone-15-P561412345
+    ('n11.com', 'n11', re.compile(r'(?:^/urun/.*-(\d+)|-P(\d+))/?$')),
+)
+
+PATH_SAFE = "/-._~!$&'()*+,;=:@%"
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+def _platform_rule(host):
+    for suffix, key, pattern in PLATFORM_RULES:
+        if host == suffix or host.endswith('.' + suffix):
+            return suffix, key, pattern
+    return None, None, None
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def product_identity(url):
+    """Ham link -> (kanonik URL, fingerprint)
+
+    Tanınan platformlarda fingerprint 'trendyol:762254888' gibi platform ürün
+    numarasıdır; diğerlerinde 'url:<kanonik URL'in sha1'i>'. Aynı kanonik link
+    her zaman aynı fingerprint'i verir (uq_product_url ile çelişmez).
+    """
+    raw = (url or '').strip()
+    parts = urlsplit(raw if '://' in raw else 'https://' + raw.lstrip('/'))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+
+    if not host:
+        canonical = raw
+    else:
+        # %C4%B1 ve ı aynı path'tir; tek biçimde (yüzde kodlu) tutulur
+        path = quote(unquote(parts.path), safe=PATH_SAFE).rstrip('/') or '/'
+        suffix, key, pattern = _platform_rule(host)
+        match = pattern.search(path) if pattern else None
+        if match:
+            product_id = next(group for group in match.groups() if group)
+            # Mobil / çıplak host masaüstü host'una katlanır (urun.n11.com gibi alt alanlar kalır)
+            if host in (suffix, 'm.' + suffix):
+                host = 'www.' + suffix
+            canonical = urlunsplit(('https', host, path, '', ''))
+            return canonical, f'{key}:{product_id.upper()}'
+
+        port = parts.port
+        netloc = host if port is None or str(port) == DEFAULT_PORTS.get(scheme) else f'{host}:{port}'
+        query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if not _is_tracking(name))
+        canonical = urlunsplit(('https' if scheme == 'http' else scheme, netloc, path, urlencode(query), ''))
+
+    digest = hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+    return canonical, f'url:{digest}'
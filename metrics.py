@@ -0,0 +1,198 @@
+"""
+İndirimRadar Metrics
+İstek middleware'i: route başına gecikme histogramı, istek başına SQL sorgu
+sayısı ve süresi (SQLAlchemy engine event'leri), yanıt boyutu ve pool'dan
+bağlantı alma süresi. /metrics Prometheus text formatında yazar;
+PROMETHEUS_MULTIPROC_DIR ayarlıysa (gunicorn_config.py) tüm worker'ların
+değerleri toplanır. Eşiği aşan istekler SQL dökümüyle loglanır.
+"""
+
+import os
+import time
+
+from flask import g, has_request_context, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Yavaş istek logunda gösterilen en pahalı ifade sayısı ve ifade metni uzunluğu
+SLOW_LOG_STATEMENTS = 5
+STATEMENT_KEY_LENGTH = 160
+
+# ==================== METRICS ====================
+
+REQUEST_LATENCY = Histogram(
+    'indirimradar_http_request_duration_seconds', 'İstek süresi (yanıt gövdesi akışı dahil)',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    'indirimradar_http_response_size_bytes', 'Yanıt gövdesi boyutu (uzunluğu bilinen yanıtlar)',
+    ['route'], buckets=SIZE_BUCKETS)
+REQUEST_SQL_QUERIES = Histogram(
+    'indirimradar_http_request_sql_queries', 'İstek başına SQL ifadesi sayısı',
+    ['route'], buckets=SQL_COUNT_BUCKETS)
+REQUEST_SQL_TIME = Histogram(
+    'indirimradar_http_request_sql_seconds', 'İstek başına toplam SQL süresi',
+    ['route'], buckets=LATENCY_BUCKETS)
+POOL_CHECKOUT = Histogram(
+    'indirimradar_db_pool_checkout_seconds', 'Pool\'dan bağlantı alma süresi (bekleme + gerekirse yeni bağlantı)',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+SLOW_REQUESTS = Counter(
+    'indirimradar_http_slow_requests_total', 'Eşiği aşan istekler', ['route'])
+
+def route_label():
+    """Yol şablonu (/api/products/<int:product_id>); eşleşmeyen istekler tek etikette toplanır"""
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+# ==================== JOB STATE COLLECTOR ====================
+
+class JobStateCollector:
+    """Scheduler işlerinin JobState'teki son çalışma değerlerini scrape anında yayınlar"""
+
+    def __init__(self, load):
+        self.load = load  # -> [(name, last_run_at, last_status, last_duration, last_lag, run_count, failure_count)]
+
+    def collect(self):
+        duration = GaugeMetricFamily('indirimradar_job_last_duration_seconds', 'İşin son çalışma süresi', labels=['job'])
+        lag = GaugeMetricFamily('indirimradar_job_last_lag_seconds', 'Son çalışmanın planlanan zamandan gecikmesi', labels=['job'])
+        success = GaugeMetricFamily('indirimradar_job_last_success', 'Son çalışma başarılı mı (1/0)', labels=['job'])
+        last_run = GaugeMetricFamily('indirimradar_job_last_run_timestamp_seconds', 'Son çalışmanın zamanı', labels=['job'])
+        runs = GaugeMetricFamily('indirimradar_job_runs', 'Toplam çalışma', labels=['job'])
+        failures = GaugeMetricFamily('indirimradar_job_failures', 'Başarısız veya kaçırılan çalışma', labels=['job'])
+
+        for name, last_run_at, status, last_duration, last_lag, run_count, failure_count in self.load():
+            if status is None:
+                continue  # Scheduler dışı (yalnızca watermark tutan) kayıt
+            if last_duration is not None:
+                duration.add_metric([name], last_duration)
+            if last_lag is not None:
+                lag.add_metric([name], last_lag)
+            success.add_metric([name], 1 if status == 'ok' else 0)
+            if last_run_at is not None:
+                last_run.add_metric([name], last_run_at.timestamp())
+            runs.add_metric([name], run_count or 0)
+            failures.add_metric([name], failure_count or 0)
+
+        return [duration, lag, success, last_run, runs, failures]
+
+# ==================== MIDDLEWARE ====================
+
+class RequestMetrics:
+    """Flask app ve SQLAlchemy engine'ine bağlanan istek/SQL enstrümantasyonu"""
+
+    def __init__(self, slow_request_ms=500):
+        self.slow_request_ms = slow_request_ms
+        self.collectors = []
+
+    def init_app(self, app, engine):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        self.instrument_engine(engine)
+
+    def instrument_engine(self, engine):
+        from sqlalchemy import event
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        # Pool'un "checkout öncesi" event'i yok; bağlantıyı alan çağrıyı sar.
+        # Engine üzerinde olduğu için dispose() ile yeniden kurulan pool'da da geçerli.
+        raw_connection = engine.raw_connection
+
+        def timed_raw_connection(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return raw_connection(*args, **kwargs)
+            finally:
+                POOL_CHECKOUT.observe(time.perf_counter() - started)
+
+        engine.raw_connection = timed_raw_connection
+
+    # ---- SQL ----
+
+    # Başlangıç zamanı ifadenin execution context'inde tutulur: hata veren ifadede
+    # after_cursor_execute çalışmaz, bağlantı başına bir yığın sonraki süreleri kaydırırdı
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if not has_request_context() or 'metrics_started' not in g:
+            return
+
+        g.sql_count += 1
+        g.sql_time += elapsed
+        key = ' '.join(statement.split())[:STATEMENT_KEY_LENGTH]
+        entry = g.sql_statements.get(key)
+        if entry is None:
+            g.sql_statements[key] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    # ---- Request ----
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_statements = {}
+
+    def _after_request(self, response):
+        if 'metrics_started' in g:
+            g.metrics_status = response.status_code
+            # Akış yanıtlarında uzunluk bilinmez (calculate_content_length None)
+            g.metrics_size = None if response.is_streamed else response.calculate_content_length()
+        return response
+
+    def _teardown_request(self, exc):
+        # Akış yanıtlarında (stream_with_context) gövde bitince çalışır
+        if 'metrics_started' not in g:
+            return
+        elapsed = time.perf_counter() - g.metrics_started
+        route = route_label()
+        status = g.get('metrics_status', 500)
+
+        REQUEST_LATENCY.labels(request.method, route, str(status)).observe(elapsed)
+        REQUEST_SQL_QUERIES.labels(route).observe(g.sql_count)
+        REQUEST_SQL_TIME.labels(route).observe(g.sql_time)
+        if g.get('metrics_size') is not None:
+            RESPONSE_SIZE.labels(route).observe(g.metrics_size)
+
+        if elapsed * 1000 >= self.slow_request_ms:
+            SLOW_REQUESTS.labels(route).inc()
+            self.log_slow_request(route, status, elapsed)
+
+    def log_slow_request(self, route, status, elapsed):
+        top = sorted(g.sql_statements.items(), key=lambda item: item[1][1], reverse=True)[:SLOW_LOG_STATEMENTS]
+        lines = [f"🐢 Yavaş istek: {request.method} {request.full_path.rstrip('?')} -> {status} "
+                 f"{elapsed * 1000:.0f}ms (route {route}; SQL {g.sql_count} sorgu, {g.sql_time * 1000:.0f}ms; "
+                 f"SQL dışı {(elapsed - g.sql_time) * 1000:.0f}ms)"]
+        for statement, (count, total) in top:
+            lines.append(f"    {total * 1000:7.1f}ms  x{count:<4} {statement}")
+        print('\n'.join(lines))
+
+    # ---- Exposition ----
+
+    def render(self):
+        """(gövde, content type); multiprocess modunda tüm worker dosyaları toplanır"""
+        if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            body = generate_latest(registry)
+        else:
+            body = generate_latest(REGISTRY)
+
+        extra = CollectorRegistry()
+        for collector in self.collectors:
+            extra.register(collector)
+        return body + generate_latest(extra), CONTENT_TYPE_LATEST
@@ -1,47 +1,271 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from scraper import scheduled_scraping
+"""
+İndirimRadar Scheduler
+Kategori başına ayrı scraping işi (aralığa yayılmış başlangıç + jitter),
+kaçırılan çalışmaların birleştirilmesi (coalesce) ve DB lease ile tek lider:
+birden fazla process/replika başlatsa da işleri yalnızca lease sahibi çalıştırır.
+Her işin süresi, gecikmesi ve sonucu JobState'e yazılır (/api/admin/jobs).
+"""
+
 import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from scraper import CATEGORIES, save_to_database, scrape_by_category
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def start_scheduler():
+SCRAPING_INTERVAL_HOURS = float(os.getenv('SCRAPING_INTERVAL_HOURS', 6))
+SCRAPING_JITTER_SECONDS = int(os.getenv('SCRAPING_JITTER_SECONDS', 300))
+MISFIRE_GRACE_SECONDS = int(os.getenv('SCHEDULER_MISFIRE_GRACE', 900))
+LEASE_SECONDS = int(os.getenv('SCHEDULER_LEASE_SECONDS', 60))
+LEADER_LEASE = 'scheduler'
+
+# Lider olmayan process'te işin dönüş değeri (metrik yazılmaz)
+SKIPPED = 'skipped'
+
+# ==================== JOBS ====================
+
+def scrape_category_job(category):
+    """Tek kategoriyi çek ve kaydet"""
+    products = scrape_by_category(category)
+    saved = save_to_database(products) if products else 0
+    logger.info(f"✅ Scraping {category}: {len(products)} ürün bulundu, {saved} kaydedildi")
+    return saved
+
+def reconcile_stats_job():
+    """Artımlı istatistik özetini tablolarla karşılaştır, sapma varsa düzelt"""
+    from app import app, reconcile_stats
+
+    with app.app_context():
+        drift = reconcile_stats()
+
+    if drift:
+        logger.warning(f"⚠️ Stats drift düzeltildi: {drift}")
+    else:
+        logger.info("✅ Stats reconcile: sapma yok")
+
+def reclassify_deals_job():
+    """Yeni fiyat geçmişi olan ürünlerin real_deal_status'unu yeniden hesapla"""
+    from app import app, reclassify_deals
+
+    with app.app_context():
+        stats = reclassify_deals()
+
+    logger.info(f"✅ Deal reclassify: {stats['products']} ürün, {stats['changed']} değişiklik")
+
+# ==================== LEADER LEASE ====================
+
+class Leadership:
+    """DB lease'ini periyodik yeniler; son başarılı yenilemeden sonra ttl boyunca lider sayılır
+
+    Yerel geçerlilik yenileme isteği gönderilmeden önceki andan hesaplanır, yani
+    DB'deki expires_at'ten her zaman önce biter: lease başka process'e geçtiğinde
+    eski lider çoktan durmuş olur (sunucular arası saat farkı ttl'den küçük olmalı).
     """
-    Scheduler başlat - Her 6 saatte bir scraping yap
+
+    def __init__(self, name=LEADER_LEASE, ttl=LEASE_SECONDS):
+        self.name = name
+        self.ttl = ttl
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._valid_until = 0.0
+
+    def is_leader(self):
+        return time.monotonic() < self._valid_until
+
+    def renew(self):
+        from app import app, acquire_lease
+
+        started = time.monotonic()
+        was_leader = self.is_leader()
+        try:
+            with app.app_context():
+                held = acquire_lease(self.name, self.owner, self.ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Lease yenilenemedi: {e}")
+            held = False
+
+        self._valid_until = started + self.ttl if held else 0.0
+        if held and not was_leader:
+            logger.info(f"👑 Scheduler lideri: {self.owner}")
+        elif was_leader and not held:
+            logger.warning(f"⚠️ Liderlik kaybedildi: {self.owner}")
+        return held
+
+    def release(self):
+        if not self.is_leader():
+            return
+        from app import app, release_lease
+
+        self._valid_until = 0.0
+        try:
+            with app.app_context():
+                release_lease(self.name, self.owner)
+        except Exception as e:
+            logger.warning(f"⚠️ Lease bırakılamadı: {e}")
+
+def leader_only(leadership, job):
+    """İşi yalnızca lider process'te çalıştır"""
+    @wraps(job)
+    def run(*args, **kwargs):
+        if not leadership.is_leader():
+            return SKIPPED
+        return job(*args, **kwargs)
+
+    return run
+
+# ==================== JOB METRICS ====================
+
+class JobMetrics:
+    """APScheduler olaylarından iş başına süre, gecikme ve sonuç üretir
+
+    Gecikme: planlanan zaman ile işin executor'a verildiği an arası.
+    Lider olmayan process'teki atlanan çalışmalar kaydedilmez.
+    """
+
+    def __init__(self, leadership, ignore=()):
+        self.leadership = leadership
+        self.ignore = set(ignore)
+        self._submitted = {}
+        self._lock = threading.Lock()
+
+    def listener(self, event):
+        if event.job_id in self.ignore:
+            return
+
+        if event.code == EVENT_JOB_SUBMITTED:
+            scheduled = event.scheduled_run_times[-1]
+            lag = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+            with self._lock:
+                self._submitted[event.job_id] = (time.monotonic(), max(lag, 0.0))
+            return
+
+        if event.code == EVENT_JOB_MISSED:
+            if self.leadership.is_leader():
+                self.record(event.job_id, 'missed')
+            return
+
+        with self._lock:
+            started, lag = self._submitted.pop(event.job_id, (None, None))
+        if event.code == EVENT_JOB_EXECUTED and event.retval == SKIPPED:
+            return
+
+        duration = time.monotonic() - started if started is not None else None
+        status = 'error' if event.code == EVENT_JOB_ERROR else 'ok'
+        if status == 'error':
+            logger.error(f"❌ {event.job_id} hata verdi: {event.exception}")
+        self.record(event.job_id, status, duration, lag)
+
+    def record(self, job_id, status, duration=None, lag=None):
+        from app import app, record_job_run
+
+        try:
+            with app.app_context():
+                record_job_run(job_id, status, duration, lag)
+        except Exception as e:
+            logger.warning(f"⚠️ İş metriği yazılamadı ({job_id}): {e}")
+
+# ==================== SCHEDULER ====================
+
+def create_scheduler(blocking=False):
+    """
+    Scheduler kur: kategori başına scraping işleri SCRAPING_INTERVAL_HOURS
+    aralığa eşit yayılır (ilk çalışmalar dahil), her tetiklemeye jitter eklenir
     """
-    scheduler = BackgroundScheduler()
-    
-    # Her 6 saatte bir çalış
+    scheduler_class = BlockingScheduler if blocking else BackgroundScheduler
+    scheduler = scheduler_class(job_defaults={
+        'coalesce': True,  # Kaçırılan çalışmalar tek çalışmada birleşir
+        'max_instances': 1,
+        'misfire_grace_time': MISFIRE_GRACE_SECONDS
+    })
+
+    leadership = Leadership()
+    metrics = JobMetrics(leadership, ignore=('leader_lease',))
+    scheduler.add_listener(metrics.listener,
+                           EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+
+    # Lease ttl'in üçte birinde yenilenir; tüm process'lerde çalışır
+    scheduler.add_job(
+        leadership.renew,
+        'interval',
+        seconds=max(1, LEASE_SECONDS // 3),
+        id='leader_lease',
+        name='Scheduler Leader Lease',
+        next_run_time=datetime.now(),
+        misfire_grace_time=None,
+        replace_existing=True
+    )
+
+    now = datetime.now()
+    interval = timedelta(hours=SCRAPING_INTERVAL_HOURS)
+    categories = list(CATEGORIES)
+    for i, category in enumerate(categories):
+        scheduler.add_job(
+            leader_only(leadership, scrape_category_job),
+            'interval',
+            args=[category],
+            seconds=interval.total_seconds(),
+            start_date=now + timedelta(seconds=10) + interval * i / len(categories),
+            jitter=SCRAPING_JITTER_SECONDS,
+            id=f'scrape:{category}',
+            name=f'Scraping: {category}',
+            replace_existing=True
+        )
+
+    # Saatte bir istatistik reconcile
     scheduler.add_job(
-        scheduled_scraping,
+        leader_only(leadership, reconcile_stats_job),
         'interval',
-        hours=6,
-        id='scraping_job',
-        name='Product Scraping Job',
+        hours=1,
+        jitter=SCRAPING_JITTER_SECONDS,
+        id='stats_reconcile_job',
+        name='Stats Reconciliation Job',
         replace_existing=True
     )
-    
-    # İlk scraping'i hemen yap
+
+    # Saatte bir artımlı real_deal_status hesabı
     scheduler.add_job(
-        scheduled_scraping,
-        'date',
-        id='initial_scraping',
-        name='Initial Scraping',
+        leader_only(leadership, reclassify_deals_job),
+        'interval',
+        hours=1,
+        jitter=SCRAPING_JITTER_SECONDS,
+        id='reclassify_deals_job',
+        name='Deal Reclassification Job',
         replace_existing=True
     )
-    
+
+    return scheduler, leadership
+
+def start_scheduler():
+    """Arka planda başlat (ör. web process'i içinden); lider olmayan process'ler yalnızca lease'i dener"""
+    scheduler, leadership = create_scheduler()
     scheduler.start()
-    logger.info("✅ Scheduler started! Scraping will run every 6 hours.")
-    
+    logger.info(f"✅ Scheduler started! {len(CATEGORIES)} kategori {SCRAPING_INTERVAL_HOURS:g} saatlik aralığa yayıldı.")
     return scheduler
 
 if __name__ == '__main__':
-    scheduler = start_scheduler()
-    
-    # Keep the script running
+    scheduler, leadership = create_scheduler(blocking=True)
+    logger.info(f"✅ Scheduler started! {len(CATEGORIES)} kategori {SCRAPING_INTERVAL_HOURS:g} saatlik aralığa yayıldı.")
+
+    # SIGTERM'de (deploy/restart) lease'i bırak ki yeni process beklemeden lider olsun
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # BlockingScheduler ana thread'i olay beklerken uyutur (busy loop yok)
     try:
-        while True:
-            pass
+        scheduler.start()
     except (KeyboardInterrupt, SystemExit):
-        scheduler.shutdown()
+        pass
+    finally:
+        leadership.release()
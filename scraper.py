@@ -4,10 +4,20 @@ Trendyol, Hepsiburada ve N11 platformlarından ürün verilerini çeker
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from urllib.parse import quote, urljoin
+from categories import CATEGORY_TERMS, CategoryClassifier
+from identity import product_identity
+import hashlib
 import json
+import os
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # ==================== CONFIGURATION ====================
@@ -42,6 +52,9 @@ CATEGORIES = {
     ]
 }
 
+# Başlıktan kategori sınıflandırıcı (CATEGORIES + ek terimler, bir kez derlenir)
+category_classifier = CategoryClassifier(CATEGORIES, CATEGORY_TERMS)
+
 # Platform URL'leri
 PLATFORMS = {
     'Trendyol': {
@@ -58,6 +71,31 @@ PLATFORMS = {
     }
 }
 
+# Eşzamanlı scraping ayarları
+DEFAULT_CONCURRENCY = 6
+
+# Platform başına iki istek arasındaki bekleme aralığı (saniye, min-max)
+RATE_LIMITS = {
+    'Trendyol': (1.0, 2.0),
+    'Hepsiburada': (1.0, 2.0),
+    'N11': (1.0, 2.0)
+}
+DEFAULT_RATE_LIMIT = (1.0, 2.0)
+
+# HTTP session ve yanıt cache ayarları
+REQUEST_TIMEOUT = 10
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR', '.scraper_cache')  # Boş string = cache kapalı
+# Parser'ların çıktısı veya cache kaydının biçimi değişince artırılır: kayıtlar sürüm dizininde
+# tutulur, eski sürümün parse sonuçları (ve ETag'leri) okunmaz
+PARSER_VERSION = 1
+
+# Statik HTML'de ürün bulunamazsa headless Chromium ile render (yavaş; Dockerfile'da açık)
+BROWSER_FALLBACK = os.getenv('SCRAPER_BROWSER_FALLBACK', 'false').lower() == 'true'
+BROWSER_TIMEOUT = 30
+
 # ==================== HELPER FUNCTIONS ====================
 
 def get_random_headers():
@@ -99,75 +137,213 @@ def is_real_deal(original_price, current_price, discount_percent):
         return 'normal'
 
 def get_category_from_keyword(keyword):
-    """Anahtar kelimeden kategori bul"""
-    keyword_lower = keyword.lower()
+    """Sweep anahtar kelimesinin kategorisi; ürünün kendi kategorisi başlıktan belirlenir"""
+    return category_classifier.category_for_keyword(keyword)
+
+# ==================== HTTP SESSION LAYER ====================
+
+class FetchStats:
+    """Sweep başına ağ metrikleri (istek, 304, byte, yeni bağlantı)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+            self.bytes_fetched = 0
+            self._connect_base = _connection_count()
+
+    def record(self, response):
+        with self._lock:
+            self.requests += 1
+            if response.status_code == 304:
+                self.not_modified += 1
+            length = response.headers.get('Content-Length')
+            self.bytes_fetched += int(length) if length and length.isdigit() else len(response.content)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'bytes_fetched': self.bytes_fetched,
+                'connects': _connection_count() - self._connect_base
+            }
+
+class HttpCache:
+    """URL anahtarlı disk cache: ETag / Last-Modified ve parse edilmiş sonuçları saklar
+
+    (app.ResponseCache'ten ayrı: o web API yanıtlarını cache'ler, bu upstream sayfaları.)
+    Kayıtlar <directory>/v<PARSER_VERSION>/ altında; parser sürümü değişince eski kayıtlar okunmaz.
+    """
+
+    def __init__(self, directory, version=PARSER_VERSION):
+        self.directory = os.path.join(directory, f'v{version}') if directory else ''
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, url, entry):
+        if not self.directory:
+            return
+        path = self._path(url)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(platform):
+    """Platform başına keep-alive destekli, retry/backoff'lu paylaşılan session"""
+    with _sessions_lock:
+        session = _sessions.get(platform)
+        if session is None:
+            retry = Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=['GET'],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_CONCURRENCY, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(get_random_headers())
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[platform] = session
+        return session
+
+def _connection_count():
+    """Tüm session havuzlarında şimdiye kadar açılmış TCP/TLS bağlantı sayısı"""
+    total = 0
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    for session in sessions:
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total += pool.num_connections
+    return total
+
+fetch_stats = FetchStats()
+http_cache = HttpCache(HTTP_CACHE_DIR)
+
+def fetch_parsed(platform, url, parse, parse_key='default'):
+    """URL'i koşullu istekle çek ve parse et
+
+    Upstream 304 dönerse body yeniden parse edilmez, cache'teki sonuç kullanılır.
+    """
+    session = get_session(platform)
+    cached = http_cache.get(url)
+
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    fetch_stats.record(response)
+
+    if response.status_code == 304 and cached:
+        parsed = cached.get('parsed', {})
+        if parse_key not in parsed:
+            parsed[parse_key] = parse(cached['body'])
+            http_cache.set(url, cached)
+        return parsed[parse_key]
+
+    response.raise_for_status()
+    result = parse(response.text)
+
+    if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+        http_cache.set(url, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body': response.text,
+            'parsed': {parse_key: result}
+        })
+
+    return result
+
+# ==================== TRENDYOL SCRAPER ====================
+
+def parse_trendyol(body, keyword, max_products):
+    """Trendyol arama API yanıtını ürün listesine çevir"""
+    products = []
+    results = json.loads(body).get('result', {}).get('products', [])
+    category = get_category_from_keyword(keyword)
     
-    # Kategori eşleştirmesi
-    electronics_keywords = ['telefon', 'laptop', 'tv', 'bilgisayar', 'tablet', 'kulaklik', 'kamera']
-    fashion_keywords = ['ayakkabi', 'elbise', 'pantolon', 'ceket', 'gomlek', 'tişört']
-    home_keywords = ['mobilya', 'dekorasyon', 'mutfak', 'yatak', 'halı']
-    supermarket_keywords = ['gida', 'icecek', 'kahve', 'cay', 'deterjan']
-    cosmetic_keywords = ['parfum', 'makyaj', 'cilt', 'sac', 'guzellik']
+    for item in results[:max_products]:
+        try:
+            # Extract product data
+            current_price = item.get('price', {}).get('sellingPrice', 0)
+            original_price = item.get('price', {}).get('originalPrice', current_price)
+            
+            # Skip if no price
+            if current_price == 0:
+                continue
+            
+            discount = calculate_discount(original_price, current_price)
+            
+            product = {
+                'title': item.get('name', ''),
+                'platform': 'Trendyol',
+                'category': category,
+                'current_price': current_price,
+                'original_price': original_price,
+                'discount_percent': discount,
+                'image_url': f"https://cdn.dsmcdn.com{item.get('imageUrl', '')}",
+                'product_url': f"https://www.trendyol.com{item.get('url', '')}",
+                'real_deal_status': is_real_deal(original_price, current_price, discount)
+            }
+            
+            products.append(product)
+        
+        except Exception as e:
+            print(f"Error parsing Trendyol product: {e}")
+            continue
     
-    if any(k in keyword_lower for k in electronics_keywords):
-        return 'Elektronik'
-    elif any(k in keyword_lower for k in fashion_keywords):
-        return 'Moda'
-    elif any(k in keyword_lower for k in home_keywords):
-        return 'Ev'
-    elif any(k in keyword_lower for k in supermarket_keywords):
-        return 'Süpermarket'
-    elif any(k in keyword_lower for k in cosmetic_keywords):
-        return 'Kozmetik'
-    else:
-        return 'Elektronik'  # Default
+    # Kategori başlıktan; anahtar kelimenin kategorisi yalnızca ipucu
+    return category_classifier.classify_products(products, hint=category)
 
-# ==================== TRENDYOL SCRAPER ====================
+def search_url(platform, keyword):
+    """Platformun arama adresi: Trendyol public arama API'si (JSON), diğerleri arama sayfası (HTML)"""
+    if platform == 'Trendyol':
+        return (f'https://public.trendyol.com/discovery-web-searchgw-service/v2/api/infinite-scroll/'
+                f'{keyword}?pi=1&culture=tr-TR&userGenderId=1&pId=0')
+    return f"{PLATFORMS[platform]['search_url']}?q={quote(keyword)}"
 
 def scrape_trendyol(keyword, max_products=10):
     """Trendyol'dan ürün çek"""
     products = []
     
     try:
-        # API endpoint (Trendyol uses public API)
-        url = f'https://public.trendyol.com/discovery-web-searchgw-service/v2/api/infinite-scroll/{keyword}?pi=1&culture=tr-TR&userGenderId=1&pId=0'
-        
-        headers = get_random_headers()
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get('result', {}).get('products', [])
-            
-            for item in results[:max_products]:
-                try:
-                    # Extract product data
-                    current_price = item.get('price', {}).get('sellingPrice', 0)
-                    original_price = item.get('price', {}).get('originalPrice', current_price)
-                    
-                    # Skip if no price
-                    if current_price == 0:
-                        continue
-                    
-                    discount = calculate_discount(original_price, current_price)
-                    
-                    product = {
-                        'title': item.get('name', ''),
-                        'platform': 'Trendyol',
-                        'category': get_category_from_keyword(keyword),
-                        'current_price': current_price,
-                        'original_price': original_price,
-                        'discount_percent': discount,
-                        'image_url': f"https://cdn.dsmcdn.com{item.get('imageUrl', '')}",
-                        'product_url': f"https://www.trendyol.com{item.get('url', '')}",
-                        'real_deal_status': is_real_deal(original_price, current_price, discount)
-                    }
-                    
-                    products.append(product)
-                
-                except Exception as e:
-                    print(f"Error parsing Trendyol product: {e}")
-                    continue
+        products = fetch_parsed(
+            'Trendyol', search_url('Trendyol', keyword),
+            lambda body: parse_trendyol(body, keyword, max_products),
+            parse_key=str(max_products)
+        )
         
         print(f"✅ Trendyol: {len(products)} ürün çekildi")
     
@@ -176,180 +352,483 @@ def scrape_trendyol(keyword, max_products=10):
     
     return products
 
+# ==================== HTML LISTING PARSER ====================
+
+class ListingParser:
+    """Arama sonuç sayfası HTML'i -> ürün listesi (lxml, CSS seçiciler bir kez derlenir)
+
+    selectors: 'card' sayfadaki ürün kartları; diğerleri (title, link, current_price,
+    original_price, image) kartın içinde aranır.
+    """
+
+    def __init__(self, platform, selectors):
+        self.platform = platform
+        self.base_url = PLATFORMS[platform]['base_url']
+        self.selectors = selectors
+        self._card = CSSSelector(selectors['card'])
+        self._fields = {name: CSSSelector(selector) for name, selector in selectors.items() if name != 'card'}
+
+    def _first(self, card, name):
+        found = self._fields[name](card)
+        return found[0] if found else None
+
+    def _text(self, card, name):
+        element = self._first(card, name)
+        return ' '.join(element.text_content().split()) if element is not None else ''
+
+    def parse(self, body, keyword, max_products):
+        products = []
+        if not body or not body.strip():
+            return products
+        document = lxml_html.fromstring(body)
+        category = get_category_from_keyword(keyword)
+
+        for card in self._card(document):
+            if len(products) >= max_products:
+                break
+            try:
+                link = self._first(card, 'link')
+                title = self._text(card, 'title') or (link.get('title', '').strip() if link is not None else '')
+                current_price = clean_price(self._text(card, 'current_price'))
+
+                # Başlığı, linki veya fiyatı olmayan kartlar (reklam, placeholder) atlanır
+                if not title or link is None or current_price <= 0:
+                    continue
+
+                original_price = clean_price(self._text(card, 'original_price')) or current_price
+                image = self._first(card, 'image')
+                image_url = (image.get('data-src') or image.get('src') or '') if image is not None else ''
+                discount = calculate_discount(original_price, current_price)
+
+                products.append({
+                    'title': title,
+                    'platform': self.platform,
+                    'category': category,
+                    'current_price': current_price,
+                    'original_price': original_price,
+                    'discount_percent': discount,
+                    'image_url': urljoin(self.base_url, image_url) if image_url else '',
+                    'product_url': urljoin(self.base_url, link.get('href', '')),
+                    'real_deal_status': is_real_deal(original_price, current_price, discount)
+                })
+
+            except Exception as e:
+                print(f"Error parsing {self.platform} product: {e}")
+                continue
+
+        return category_classifier.classify_products(products, hint=category)
+
+class BrowserRenderer:
+    """Statik HTML'de ürün yoksa (JS ile render / bot duvarı) sayfayı headless Chromium'da aç
+
+    Tek driver process'i paylaşılır ve kilitle sırayla kullanılır; selenium
+    yalnızca ilk kullanımda import edilir.
+    """
+
+    def __init__(self, timeout=BROWSER_TIMEOUT):
+        self.timeout = timeout
+        self._driver = None
+        self._lock = threading.Lock()
+
+    def _get_driver(self):
+        if self._driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+
+            options = webdriver.ChromeOptions()
+            options.add_argument('--headless=new')
+            options.add_argument('--no-sandbox')
+            options.add_argument('--disable-dev-shm-usage')
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
+            if os.getenv('CHROME_BIN'):
+                options.binary_location = os.getenv('CHROME_BIN')
+
+            service = Service(os.getenv('CHROMEDRIVER_PATH')) if os.getenv('CHROMEDRIVER_PATH') else None
+            self._driver = webdriver.Chrome(options=options, service=service)
+            self._driver.set_page_load_timeout(self.timeout)
+        return self._driver
+
+    def render(self, url):
+        with self._lock:
+            driver = self._get_driver()
+            driver.get(url)
+            return driver.page_source
+
+    def close(self):
+        with self._lock:
+            if self._driver is not None:
+                self._driver.quit()
+                self._driver = None
+
+browser = BrowserRenderer()
+
+def scrape_listing(parser, keyword, max_products):
+    """Arama sayfasını statik HTML olarak çek ve parse et; ürün çıkmazsa tarayıcı fallback'i"""
+    url = search_url(parser.platform, keyword)
+
+    try:
+        products = fetch_parsed(
+            parser.platform, url,
+            lambda body: parser.parse(body, keyword, max_products),
+            parse_key=str(max_products)
+        )
+    except requests.HTTPError as e:
+        if not BROWSER_FALLBACK:
+            raise
+        print(f"⚠️ {parser.platform}: {e}")
+        products = []
+
+    if not products and BROWSER_FALLBACK:
+        print(f"ℹ️ {parser.platform}: statik HTML'de ürün yok, tarayıcı ile render ediliyor")
+        products = parser.parse(browser.render(url), keyword, max_products)
+
+    return products
+
 # ==================== HEPSIBURADA SCRAPER ====================
 
+# Arama sonuç listesi işaretlemesi (değişirse yalnızca burası güncellenir)
+HEPSIBURADA_SELECTORS = {
+    'card': 'li[class*="productListContent-"]',
+    'title': '[data-test-id="product-card-name"]',
+    'link': 'a[href]',
+    'current_price': '[data-test-id="price-current-price"]',
+    'original_price': '[data-test-id="price-prev-price"]',
+    'image': 'img'
+}
+
+hepsiburada_parser = ListingParser('Hepsiburada', HEPSIBURADA_SELECTORS)
+
 def scrape_hepsiburada(keyword, max_products=10):
-    """Hepsiburada'dan ürün çek (Mock data - gerçek scraping için Selenium gerekir)"""
+    """Hepsiburada arama sayfasından ürün çek"""
     products = []
     
     try:
-        # Hepsiburada için mock data
-        # Gerçek production'da Selenium veya API kullanılmalı
-        
-        print("ℹ️ Hepsiburada: Mock data kullanılıyor")
-        
-        # Sample mock products
-        mock_products = [
-            {
-                'title': f'{keyword} - Premium Model',
-                'platform': 'Hepsiburada',
-                'category': get_category_from_keyword(keyword),
-                'current_price': 3999.0,
-                'original_price': 5999.0,
-                'discount_percent': 33,
-                'image_url': 'https://images.unsplash.com/photo-1505740420928-5e560c06d30e?w=500&q=80',
-                'product_url': 'https://www.hepsiburada.com',
-                'real_deal_status': 'real'
-            }
-        ]
-        
-        products = mock_products[:max_products]
-        print(f"✅ Hepsiburada: {len(products)} ürün eklendi (mock)")
+        products = scrape_listing(hepsiburada_parser, keyword, max_products)
+        print(f"✅ Hepsiburada: {len(products)} ürün çekildi")
     
     except Exception as e:
-        print(f"❌ Hepsiburada error: {e}")
+        print(f"❌ Hepsiburada scraping error: {e}")
     
     return products
 
 # ==================== N11 SCRAPER ====================
 
+N11_SELECTORS = {
+    'card': 'li.column',
+    'title': '.productName',
+    'link': 'a.plink',
+    'current_price': '.newPrice ins',
+    'original_price': '.oldPrice del',
+    'image': 'img'
+}
+
+n11_parser = ListingParser('N11', N11_SELECTORS)
+
 def scrape_n11(keyword, max_products=10):
-    """N11'den ürün çek (Mock data)"""
+    """N11 arama sayfasından ürün çek"""
     products = []
     
     try:
-        print("ℹ️ N11: Mock data kullanılıyor")
-        
-        # Sample mock products
-        mock_products = [
-            {
-                'title': f'{keyword} - Özel Fırsat',
-                'platform': 'N11',
-                'category': get_category_from_keyword(keyword),
-                'current_price': 2499.0,
-                'original_price': 3999.0,
-                'discount_percent': 38,
-                'image_url': 'https://images.unsplash.com/photo-1523275335684-37898b6baf30?w=500&q=80',
-                'product_url': 'https://www.n11.com',
-                'real_deal_status': 'real'
-            }
-        ]
-        
-        products = mock_products[:max_products]
-        print(f"✅ N11: {len(products)} ürün eklendi (mock)")
+        products = scrape_listing(n11_parser, keyword, max_products)
+        print(f"✅ N11: {len(products)} ürün çekildi")
     
     except Exception as e:
-        print(f"❌ N11 error: {e}")
+        print(f"❌ N11 scraping error: {e}")
     
     return products
 
+# ==================== RATE LIMITING ====================
+
+class HostRateLimiter:
+    """Platform (host) başına politeness: global sleep yerine istekler arası minimum aralık"""
+
+    def __init__(self, intervals=None, scale=1.0):
+        self.intervals = intervals or RATE_LIMITS
+        self.scale = scale
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host):
+        """Host için bir sonraki boş slotu rezerve et ve o zamana kadar bekle"""
+        low, high = self.intervals.get(host, DEFAULT_RATE_LIMIT)
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + random.uniform(low, high) * self.scale
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+# Tüm çağrılar aynı limiter'ı paylaşır, böylece ardışık çağrılarda da aralık korunur
+rate_limiter = HostRateLimiter()
+
 # ==================== MAIN SCRAPER ====================
 
-def scrape_all_platforms(keyword, max_per_platform=5):
-    """Tüm platformlardan ürün çek"""
+PLATFORM_SCRAPERS = {
+    'Trendyol': scrape_trendyol,
+    'Hepsiburada': scrape_hepsiburada,
+    'N11': scrape_n11
+}
+
+def scrape_keywords(keywords, max_per_platform=5, concurrency=None, limiter=None, scrapers=None):
+    """Anahtar kelime x platform görevlerini eşzamanlı çalıştır
+
+    Sonuçlar, görevlerin tamamlanma sırasından bağımsız olarak
+    anahtar kelime ve platform sırasına göre döner.
+    """
+    concurrency = max(1, concurrency or DEFAULT_CONCURRENCY)
+    limiter = limiter or rate_limiter
+    scrapers = scrapers or PLATFORM_SCRAPERS
+
+    tasks = [(keyword, platform) for keyword in keywords for platform in scrapers]
+    results = {}
+
+    def run(keyword, platform):
+        limiter.wait(platform)
+        return scrapers[platform](keyword, max_per_platform)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(tasks) or 1)) as executor:
+        futures = {executor.submit(run, keyword, platform): (keyword, platform) for keyword, platform in tasks}
+
+        for future in as_completed(futures):
+            keyword, platform = futures[future]
+            try:
+                results[(keyword, platform)] = future.result()
+            except Exception as e:
+                print(f"❌ {platform} '{keyword}' error: {e}")
+
     all_products = []
-    
+    for task in tasks:
+        all_products.extend(results.get(task, []))
+
+    return all_products
+
+def scrape_all_platforms(keyword, max_per_platform=5, concurrency=None):
+    """Tüm platformlardan ürün çek"""
     print(f"\n🔍 Scraping başlatıldı: '{keyword}'")
     print("=" * 50)
-    
-    # Trendyol
-    time.sleep(random.uniform(1, 2))
-    trendyol_products = scrape_trendyol(keyword, max_per_platform)
-    all_products.extend(trendyol_products)
-    
-    # Hepsiburada
-    time.sleep(random.uniform(1, 2))
-    hepsiburada_products = scrape_hepsiburada(keyword, max_per_platform)
-    all_products.extend(hepsiburada_products)
-    
-    # N11
-    time.sleep(random.uniform(1, 2))
-    n11_products = scrape_n11(keyword, max_per_platform)
-    all_products.extend(n11_products)
-    
+
+    all_products = scrape_keywords([keyword], max_per_platform, concurrency)
+
     print("=" * 50)
     print(f"✅ Toplam {len(all_products)} ürün çekildi\n")
-    
+
     return all_products
 
-def scrape_by_category(category_name, max_per_keyword=3):
+def scrape_by_category(category_name, max_per_keyword=3, concurrency=None):
     """Kategori bazlı scraping"""
-    all_products = []
-    
     if category_name not in CATEGORIES:
         print(f"❌ Kategori bulunamadı: {category_name}")
         return []
-    
-    keywords = CATEGORIES[category_name]
-    
+
+    keywords = CATEGORIES[category_name][:3]  # İlk 3 keyword
+
     print(f"\n📦 Kategori: {category_name}")
     print(f"🔑 Anahtar kelimeler: {', '.join(keywords)}")
-    
-    for keyword in keywords[:3]:  # İlk 3 keyword
-        products = scrape_all_platforms(keyword, max_per_keyword)
-        all_products.extend(products)
-        time.sleep(random.uniform(2, 4))  # Rate limiting
-    
-    return all_products
+
+    return scrape_keywords(keywords, max_per_keyword, concurrency)
+
+def scrape_categories(category_names, max_per_keyword=3, concurrency=None):
+    """Birden fazla kategoriyi tek bir eşzamanlı sweep olarak çek"""
+    keywords = []
+    for category_name in category_names:
+        if category_name not in CATEGORIES:
+            print(f"❌ Kategori bulunamadı: {category_name}")
+            continue
+        keywords.extend(CATEGORIES[category_name][:3])
+
+    print(f"\n📦 Kategoriler: {', '.join(category_names)}")
+    print(f"🔑 Anahtar kelimeler: {', '.join(keywords)}")
+
+    return scrape_keywords(keywords, max_per_keyword, concurrency)
 
 # ==================== DATABASE INTEGRATION ====================
 
-def save_to_database(products):
-    """Ürünleri database'e kaydet"""
+SAVE_BATCH_SIZE = 500
+
+PRODUCT_FIELDS = (
+    'title', 'platform', 'category', 'current_price', 'original_price',
+    'discount_percent', 'image_url', 'product_url', 'real_deal_status'
+)
+
+# Mevcut ürünlerde güncellenen alanlar; real_deal_status yalnızca yeni ürünlerde yazılır,
+# sonrasında fiyat geçmişine bakan reclassify-deals işi belirler
+UPDATE_FIELDS = ('current_price', 'original_price', 'discount_percent')
+
+def _prepare_rows(products):
+    """Eksik alanlı ürünleri at, linki kanonik hale getir ve fingerprint ekle;
+    batch içindeki fingerprint tekrarlarında sonuncuyu tut (aynı başlıklı farklı ilanlar ayrı kalır)"""
+    rows = {}
+    for product_data in products:
+        missing = [field for field in PRODUCT_FIELDS if field not in product_data]
+        if missing:
+            print(f"Error saving product: missing {', '.join(missing)}")
+            continue
+        row = {field: product_data[field] for field in PRODUCT_FIELDS}
+        row['product_url'], row['fingerprint'] = product_identity(row['product_url'])
+        rows[row['fingerprint']] = row
+    return list(rows.values())
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _fetch_existing(db, Product, rows):
+    """Batch için mevcut ürünler: id -> (current_price, category, discount_percent)
+
+    Eşleşme app.resolve_products ile (fingerprint, alias, kanonik link; platform +
+    başlık yalnızca fingerprint'i NULL eski satırlar için). Eşleşen satırlara
+    mevcut ürünün `id`'si eklenir; aynı ürüne düşen tekrarlarda (ör. birleştirilmiş
+    kopyaların alias'ları) sonuncu kalır. (existing, tekrarsız rows) döner.
+    """
+    from app import resolve_products
+
+    product_ids = resolve_products(rows)
+    existing = {}
+
+    matched = {product_id for product_id in product_ids if product_id}
+    if matched:
+        for product_id, price, category, discount in db.session.execute(
+            db.select(Product.id, Product.current_price, Product.category, Product.discount_percent)
+            .where(Product.id.in_(matched))
+        ):
+            existing[product_id] = (price, category, discount)
+
+    unique = {}
+    for row, product_id in zip(rows, product_ids):
+        if product_id:
+            row['id'] = product_id
+        unique[product_id or row['fingerprint']] = row
+
+    return existing, list(unique.values())
+
+def _stats_changes(rows, existing):
+    """CatalogStat için (old, new) farkları; güncellemelerde kategori değişmez"""
+    changes = []
+    for row in rows:
+        match = existing.get(row.get('id'))
+        new = (row['category'], row['platform'], row['discount_percent'])
+        if match is None:
+            changes.append((None, new))
+        else:
+            changes.append(((match[1], row['platform'], match[2]), (match[1], row['platform'], row['discount_percent'])))
+    return changes
+
+def _update_existing(db, Product, rows, existing, now):
+    """Eşleşen ürünlerin fiyat alanlarını id ile toplu güncelle
+
+    (product_id, price, previous_price) gözlemlerini ve eklenecek yeni satırları döndürür.
+    """
+    from sqlalchemy import update
+
+    updates = []
+    inserts = []
+    observations = []
+    for row in rows:
+        if 'id' not in row:
+            inserts.append(dict(row, created_at=now, updated_at=now))
+            continue
+        updates.append(dict({field: row[field] for field in UPDATE_FIELDS}, id=row['id'], updated_at=now))
+        observations.append((row['id'], row['current_price'], existing[row['id']][0]))
+
+    if updates:
+        db.session.execute(update(Product), updates)
+
+    return observations, inserts
+
+def _upsert_generic(db, Product, rows, now):
+    """SQLite ve diğerleri: tek sorguda mevcutları bul, toplu insert/update
+
+    (product_id, price, previous_price) gözlemlerini ve istatistik farklarını döndürür.
+    """
+    from sqlalchemy import insert
+
+    existing, rows = _fetch_existing(db, Product, rows)
+    observations, inserts = _update_existing(db, Product, rows, existing, now)
+
+    if inserts:
+        created = db.session.execute(
+            insert(Product).returning(Product.id, Product.current_price),
+            inserts
+        )
+        observations.extend((product_id, price, None) for product_id, price in created)
+
+    return observations, _stats_changes(rows, existing)
+
+def _upsert_postgresql(db, Product, rows, now):
+    """PostgreSQL: mevcutlar id ile güncellenir, yeniler uq_product_fingerprint üzerinden
+    INSERT ... ON CONFLICT (eşzamanlı başka bir yazımın eklediği ürün güncellenir)"""
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    existing, rows = _fetch_existing(db, Product, rows)
+    observations, inserts = _update_existing(db, Product, rows, existing, now)
+
+    if inserts:
+        table = Product.__table__
+        stmt = pg_insert(table).values(inserts)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.fingerprint],
+            set_=dict({field: stmt.excluded[field] for field in UPDATE_FIELDS}, updated_at=now)
+        ).returning(table.c.id, table.c.current_price)
+        observations.extend((product_id, price, None) for product_id, price in db.session.execute(stmt))
+
+    return observations, _stats_changes(rows, existing)
+
+def save_to_database(products, batch_size=SAVE_BATCH_SIZE):
+    """Ürünleri database'e kaydet (batch başına set tabanlı upsert)"""
     try:
         import sys
         sys.path.append('.')
-        from app import app, db, Product, PriceHistory
+        from app import app, db, Product, apply_stats_changes, record_prices, response_cache
         
         with app.app_context():
+            rows = _prepare_rows(products)
+            upsert = _upsert_postgresql if db.engine.dialect.name == 'postgresql' else _upsert_generic
             saved_count = 0
             
-            for product_data in products:
+            for batch in _chunks(rows, batch_size):
                 try:
-                    # Check if product exists
-                    existing = Product.query.filter_by(
-                        title=product_data['title'],
-                        platform=product_data['platform']
-                    ).first()
-                    
-                    if existing:
-                        # Update existing product
-                        existing.current_price = product_data['current_price']
-                        existing.original_price = product_data['original_price']
-                        existing.discount_percent = product_data['discount_percent']
-                        existing.real_deal_status = product_data['real_deal_status']
-                        existing.updated_at = datetime.utcnow()
-                        
-                        # Add price history
-                        history = PriceHistory(
-                            product_id=existing.id,
-                            price=product_data['current_price']
-                        )
-                        db.session.add(history)
-                    else:
-                        # Create new product
-                        new_product = Product(**product_data)
-                        db.session.add(new_product)
-                        db.session.flush()
-                        
-                        # Add price history
-                        history = PriceHistory(
-                            product_id=new_product.id,
-                            price=product_data['current_price']
-                        )
-                        db.session.add(history)
-                    
-                    saved_count += 1
-                
+                    now = datetime.utcnow()
+                    observations, stats_changes = upsert(db, Product, batch, now)
+                    # Fiyat geçmişine sadece gerçek fiyat değişimleri yazılır
+                    record_prices(observations, now)
+                    apply_stats_changes(stats_changes)
+                    db.session.commit()
+                    saved_count += len(batch)
                 except Exception as e:
-                    print(f"Error saving product: {e}")
-                    continue
+                    db.session.rollback()
+                    print(f"Error saving batch: {e}")
+            
+            if saved_count:
+                response_cache.invalidate()
             
-            db.session.commit()
             print(f"✅ {saved_count} ürün database'e kaydedildi")
+            return saved_count
             
     except Exception as e:
         print(f"❌ Database save error: {e}")
+        return 0
+
+def capture_pages(keyword, directory):
+    """Platformların ham arama yanıtlarını parser testleri için kaydet (tests/fixtures/pages)
+
+    Dosya adı <platform>_<keyword>.<json|html>; cache ve parse atlanır, yanıt olduğu gibi yazılır.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for platform in PLATFORMS:
+        response = get_session(platform).get(search_url(platform, keyword), timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        extension = 'json' if platform == 'Trendyol' else 'html'
+        path = os.path.join(directory, f"{platform.lower()}_{quote(keyword, safe='')}.{extension}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        paths.append(path)
+        print(f"💾 {platform}: {len(response.content)} byte -> {path}")
+    return paths
 
 # ==================== COMMAND LINE INTERFACE ====================
 
@@ -360,26 +839,41 @@ if __name__ == '__main__':
     parser.add_argument('--keyword', type=str, help='Aranacak kelime')
     parser.add_argument('--category', type=str, choices=list(CATEGORIES.keys()), help='Kategori')
     parser.add_argument('--save', action='store_true', help='Database\'e kaydet')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Aynı anda çalışacak istek sayısı (1 = seri)')
+    parser.add_argument('--capture', type=str, metavar='DIR',
+                        help='Ham arama yanıtlarını DIR altına kaydet (parser testleri için) ve çık')
     
     args = parser.parse_args()
     
+    if args.capture:
+        capture_pages(args.keyword or 'telefon', args.capture)
+        raise SystemExit(0)
+    
     products = []
+    fetch_stats.reset()
+    started = time.perf_counter()
     
     if args.keyword:
-        products = scrape_all_platforms(args.keyword)
+        products = scrape_all_platforms(args.keyword, concurrency=args.concurrency)
     elif args.category:
-        products = scrape_by_category(args.category)
+        products = scrape_by_category(args.category, concurrency=args.concurrency)
     else:
         # Default: Tüm kategorilerden sample
         print("\n🚀 Tüm kategorilerden sample ürünler çekiliyor...")
-        for category in list(CATEGORIES.keys())[:2]:  # İlk 2 kategori
-            category_products = scrape_by_category(category, max_per_keyword=2)
-            products.extend(category_products)
+        products = scrape_categories(list(CATEGORIES.keys())[:2], max_per_keyword=2,  # İlk 2 kategori
+                                     concurrency=args.concurrency)
+    
+    elapsed = time.perf_counter() - started
     
     # Results
     if products:
         print(f"\n📊 SONUÇLAR:")
         print(f"Toplam ürün: {len(products)}")
+        print(f"Süre: {elapsed:.2f} sn (concurrency={args.concurrency})")
+        stats = fetch_stats.snapshot()
+        print(f"Ağ: {stats['requests']} istek, {stats['not_modified']} x 304, "
+              f"{stats['bytes_fetched']} byte, {stats['connects']} yeni bağlantı")
         print(f"Ortalama indirim: {sum(p['discount_percent'] for p in products) / len(products):.1f}%")
         
         # Save to database
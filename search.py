@@ -0,0 +1,200 @@
+"""
+İndirimRadar Ürün Arama
+Türkçe normalizasyon ve veritabanına göre arama index'i:
+SQLite'ta FTS5 (trigram), PostgreSQL'de pg_trgm (GIN), diğerlerinde LIKE.
+Eşleşme kuralı hepsinde aynıdır: her kelime search_text'te alt dize olarak
+geçmelidir ('phone' -> 'iPhone').
+"""
+
+import re
+import unicodedata
+
+from sqlalchemy import and_, column, func, table, text
+
+# ==================== TURKISH NORMALIZATION ====================
+
+# Önce Türkçe büyük harf kuralları (İ→i, I→ı), sonra diacritic katlama
+TURKISH_LOWER = str.maketrans({'İ': 'i', 'I': 'ı'})
+TURKISH_FOLD = str.maketrans({
+    'ı': 'i', 'ş': 's', 'ğ': 'g', 'ü': 'u', 'ö': 'o', 'ç': 'c',
+    'â': 'a', 'î': 'i', 'û': 'u'
+})
+
+TOKEN_RE = re.compile(r'\w+')
+
+def normalize_turkish(value):
+    """Türkçe küçük harf + diacritic katlama: 'IŞIK' ve 'ışık' -> 'isik'"""
+    if not value:
+        return ''
+    folded = value.translate(TURKISH_LOWER).lower().translate(TURKISH_FOLD)
+    if folded.isascii():
+        return folded  # Türkçe harfler katlandıktan sonra çoğu başlık ASCII; NFKD gereksiz
+    decomposed = unicodedata.normalize('NFKD', folded)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def search_tokens(value):
+    return TOKEN_RE.findall(normalize_turkish(value))
+
+def search_document(title, platform=None, category=None):
+    """Product.search_text içeriği: başlık, platform ve kategori"""
+    return ' '.join(search_tokens(' '.join(filter(None, (title, platform, category)))))
+
+def search_text_default(context):
+    """Product.search_text kolon default'u; ORM, bulk ve Core insert'lerde çalışır"""
+    params = context.get_current_parameters()
+    return search_document(params.get('title'), params.get('platform'), params.get('category'))
+
+# ==================== INDEX SETUP ====================
+
+FTS_TABLE = 'product_search'
+FTS_TOKENIZER = 'trigram'
+TRIGRAM = 3  # Trigram index'i daha kısa kelimeleri MATCH ile bulamaz; onlar LIKE ile süzülür
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        search_text, content='product', content_rowid='id',
+        tokenize='{FTS_TOKENIZER}'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_text ON product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+]
+
+POSTGRESQL_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_trgm ON product USING gin (search_text gin_trgm_ops)",
+]
+
+# SQLAlchemy ifadeleri için FTS5 tablosu (metadata'ya eklenmez, create_all görmez)
+fts = table(FTS_TABLE, column('rowid'), column('rank'), column(FTS_TABLE))
+
+_backend = None
+
+def get_backend(db):
+    """'fts5', 'trgm' veya 'like'; ilk çağrıda veritabanından tespit edilir"""
+    global _backend
+    if _backend is None:
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            exists = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first()
+            _backend = 'fts5' if exists else 'like'
+        elif dialect == 'postgresql':
+            exists = db.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+            _backend = 'trgm' if exists else 'like'
+        else:
+            _backend = 'like'
+    return _backend
+
+def backfill_search_text(db, Product, batch_size=5000):
+    """search_text'i boş olan (kolon eklenmeden önceki) satırları doldur"""
+    total = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Product.id, Product.title, Product.platform, Product.category, Product.updated_at)
+            .where(Product.search_text.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        # updated_at aynen yazılır, aksi halde onupdate tüm kataloğu "güncellenmiş" gösterir
+        db.session.execute(db.update(Product), [
+            {'id': row.id, 'updated_at': row.updated_at,
+             'search_text': search_document(row.title, row.platform, row.category)}
+            for row in rows
+        ])
+        total += len(rows)
+    db.session.commit()
+    return total
+
+def rebuild_search_index(db):
+    """FTS5 index'ini product tablosundan yeniden üret (PostgreSQL index'i kendini günceller)"""
+    if db.engine.dialect.name == 'sqlite' and get_backend(db) == 'fts5':
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+
+def setup_search_index(db, Product):
+    """Eksik search_text'leri doldur, arama index'ini oluştur ve gerekirse yeniden üret
+
+    Backfill index'ten önce yapılır: FTS5 trigger'ları henüz indexlenmemiş
+    satırlar için 'delete' komutu çalıştırırsa index bozulur.
+    """
+    global _backend
+    dialect = db.engine.dialect.name
+    backfilled = backfill_search_text(db, Product)
+    created = False
+
+    try:
+        if dialect == 'sqlite':
+            ddl = db.session.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+            ).scalar()
+            db.session.commit()
+            if ddl is not None and FTS_TOKENIZER not in ddl:
+                # Eski kelime (ön ek) tokenizer'lı index: trigram ile yeniden kurulur
+                drop_search_index(db)
+            created = get_backend(db) != 'fts5'
+            with db.engine.begin() as conn:
+                for ddl in SQLITE_DDL:
+                    conn.execute(text(ddl))
+        elif dialect == 'postgresql':
+            with db.engine.begin() as conn:
+                for ddl in POSTGRESQL_DDL:
+                    conn.execute(text(ddl))
+    except Exception as e:
+        print(f"⚠️ Arama index'i oluşturulamadı, LIKE kullanılacak: {e}")
+
+    _backend = None
+    if created or backfilled:
+        rebuild_search_index(db)
+
+    return get_backend(db)
+
+def drop_search_index(db):
+    """SQLite FTS5 tablosunu ve trigger'larını kaldır (drop_all sanal tabloyu görmez)"""
+    global _backend
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.begin() as conn:
+            for suffix in ('ai', 'ad', 'au'):
+                conn.execute(text(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}'))
+            conn.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+    _backend = None
+
+# ==================== QUERY ====================
+
+def apply_search(db, Product, query, term, ranked=True):
+    """Sorguya arama filtresi ekle; ranked ise en alakalı sonuçlar önce gelir
+
+    Her kelime search_text'te alt dize olarak eşleşmelidir; FTS5 trigram,
+    pg_trgm ve LIKE aynı sonucu verir.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return query
+
+    backend = get_backend(db)
+
+    if backend == 'fts5':
+        indexed = [token for token in tokens if len(token) >= TRIGRAM]
+        short = [token for token in tokens if len(token) < TRIGRAM]
+        if short:
+            query = query.filter(and_(*[Product.search_text.contains(token, autoescape=True) for token in short]))
+        if not indexed:
+            return query
+        match = ' '.join(f'"{token}"' for token in indexed)
+        query = query.join(fts, fts.c.rowid == Product.id).filter(fts.c[FTS_TABLE].match(match))
+        return query.order_by(fts.c.rank) if ranked else query
+
+    query = query.filter(and_(*[Product.search_text.contains(token, autoescape=True) for token in tokens]))
+    if ranked and backend == 'trgm':
+        query = query.order_by(func.word_similarity(' '.join(tokens), Product.search_text).desc())
+    return query
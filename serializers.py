@@ -0,0 +1,123 @@
+"""
+İndirimRadar Serializers
+Ürün yanıtları için ortak serileştirme katmanı: yalnızca gereken kolonları
+seçer (ORM entity'si üretmez), ?fields= ile seyrek alan listesi, compact
+modda uyumluluk kopyalarını atlar ve JSON'u orjson ile üretir.
+Export için satır gruplarını NDJSON/CSV parçalarına çevirir.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # orjson yoksa stdlib json (daha yavaş, aynı çıktı)
+    orjson = None
+
+# ==================== PRODUCT FIELDS ====================
+
+# Yanıt alanı -> Product kolonu; sıralama yanıttaki anahtar sırasıdır
+PRODUCT_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'platform': 'platform',
+    'category': 'category',
+    'current_price': 'current_price',
+    'original_price': 'original_price',
+    'discount_percent': 'discount_percent',
+    'image_url': 'image_url',
+    'image': 'image_url',  # Compatibility
+    'product_url': 'product_url',
+    'url': 'product_url',  # Compatibility
+    'real_deal_status': 'real_deal_status',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+COMPATIBILITY_FIELDS = ('image', 'url')
+
+# Liste görünümü tüm alanları, detay görünümü kopyalar hariç tümünü döner
+LIST_FIELDS = tuple(PRODUCT_FIELDS)
+DETAIL_FIELDS = tuple(f for f in PRODUCT_FIELDS if f not in COMPATIBILITY_FIELDS)
+
+def parse_fields(fields_param, compact=False, default=LIST_FIELDS):
+    """'id,title,current_price' -> ('id', 'title', 'current_price'); bilinmeyen alan ValueError"""
+    if fields_param:
+        fields = tuple(dict.fromkeys(f.strip() for f in fields_param.split(',') if f.strip()))
+        unknown = [f for f in fields if f not in PRODUCT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    else:
+        fields = default
+    if compact:
+        fields = tuple(f for f in fields if f not in COMPATIBILITY_FIELDS)
+    return fields
+
+class ProductSerializer:
+    """Yalnızca seçilen alanların kolonlarını sorgular ve satırları (Row) dict'e çevirir
+
+    extra: yanıtta olmayan ama sorguda gereken kolonlar (örn. cursor anahtarı)
+    """
+
+    def __init__(self, fields, extra=()):
+        self.fields = fields
+        self.column_names = list(dict.fromkeys([PRODUCT_FIELDS[f] for f in fields] + list(extra)))
+        positions = {name: i for i, name in enumerate(self.column_names)}
+        self._pairs = [(f, positions[PRODUCT_FIELDS[f]]) for f in fields]
+
+    def columns(self, Product):
+        return [getattr(Product, name) for name in self.column_names]
+
+    def one(self, row):
+        return {field: row[i] for field, i in self._pairs}
+
+    def many(self, rows):
+        pairs = self._pairs
+        return [{field: row[i] for field, i in pairs} for row in rows]
+
+    def values(self, row):
+        """fields sırasıyla değer listesi (CSV satırı)"""
+        return [row[i] for _, i in self._pairs]
+
+# ==================== JSON ====================
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def dumps(payload):
+    """bytes döner; datetime'lar isoformat ile aynı biçimde yazılır"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+# ==================== EXPORT FORMATS ====================
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def ndjson_chunk(serializer, rows):
+    """Satır grubu -> her satırı bir JSON nesnesi olan bytes parçası"""
+    return b''.join(dumps(item) + b'\n' for item in serializer.many(rows))
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+def csv_chunk(serializer, rows, header=False):
+    """Satır grubu -> CSV bytes parçası; header=True ise önce alan adları"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(serializer.fields)
+    writer.writerows([_csv_value(value) for value in serializer.values(row)] for row in rows)
+    return buffer.getvalue().encode('utf-8')
@@ -0,0 +1,67 @@
+"""
+Test ortamı: app.py import edilirken DATABASE_URL okunduğu için geçici
+SQLite veritabanı app import edilmeden önce ayarlanır. Her test boş şemayla
+başlar.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('SECRET_KEY', 'indirimradar-test-secret-key-0123456789')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='indirimradar-test-'), 'test.db')
+
+import app as app_module  # noqa: E402
+from search import drop_search_index, setup_search_index  # noqa: E402
+
+
+@pytest.fixture
+def m():
+    """Boş şemalı app modülü (tablolar ve arama index'i sıfırdan)"""
+    with app_module.app.app_context():
+        drop_search_index(app_module.db)
+        app_module.db.drop_all()
+        app_module.db.create_all()
+        setup_search_index(app_module.db, app_module.Product)
+        app_module.reconcile_stats()
+        app_module.response_cache.backend.entries.clear()
+        app_module.response_cache.invalidate()
+    app_module.token_cache.clear()
+    app_module.principal_cache.clear()
+    yield app_module
+    with app_module.app.app_context():
+        app_module.db.session.remove()
+
+
+@pytest.fixture
+def client(m):
+    return m.app.test_client()
+
+
+@pytest.fixture
+def add_product(m):
+    """Varsayılan alanlarla ürün ekleyip id'sini döndüren yardımcı"""
+    def add(index=1, **fields):
+        data = {
+            'title': f'Test Ürün {index}',
+            'platform': 'Trendyol',
+            'category': 'Elektronik',
+            'current_price': 100.0,
+            'original_price': 200.0,
+            'discount_percent': 50,
+            'image_url': '',
+            'product_url': f'https://example.com/p/{index}',
+            'real_deal_status': 'real',
+        }
+        data.update(fields)
+        with m.app.app_context():
+            product = m.Product(**data)
+            m.db.session.add(product)
+            m.db.session.commit()
+            return product.id
+    return add
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def headers(client):
+    token = client.post('/api/auth/register', json={'email': 'alert@example.com', 'password': 'secret123'}).get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def outbox(m):
+    with m.app.app_context():
+        return [(row.alert_id, row.price) for row in m.AlertOutbox.query.order_by(m.AlertOutbox.id)]
+
+
+def test_alert_fires_when_created_at_or_above_current_price(client, m, add_product, headers):
+    product_id = add_product(1, current_price=100.0)
+    alert = client.post('/api/alerts', json={'product_id': product_id, 'target_price': 120}, headers=headers).get_json()['alert']
+    assert alert['is_active'] is False
+    assert alert['triggered_at'] is not None
+    assert outbox(m) == [(alert['id'], 100.0)]
+
+
+def test_alert_below_price_fires_on_crossing(client, m, add_product, headers):
+    product_id = add_product(1, current_price=100.0)
+    alert = client.post('/api/alerts', json={'product_id': product_id, 'target_price': 80}, headers=headers).get_json()['alert']
+    assert alert['is_active'] is True and outbox(m) == []
+
+    with m.app.app_context():
+        m.record_prices([(product_id, 90.0, 100.0)])
+        m.db.session.commit()
+        assert outbox(m) == []
+        m.record_prices([(product_id, 75.0, 90.0)])
+        m.db.session.commit()
+    assert outbox(m) == [(alert['id'], 75.0)]
+
+
+def test_never_fired_alert_fires_on_first_evaluation(client, m, add_product, headers):
+    """Eski kayıt: hedefin altındaki fiyatla kurulmuş, hiç tetiklenmemiş alarm"""
+    product_id = add_product(1, current_price=100.0)
+    with m.app.app_context():
+        user_id = m.User.query.filter_by(email='alert@example.com').one().id
+        alert = m.PriceAlert(user_id=user_id, product_id=product_id, target_price=150.0)
+        m.db.session.add(alert)
+        m.db.session.commit()
+        alert_id = alert.id
+
+        m.record_prices([(product_id, 95.0, 100.0)])
+        m.db.session.commit()
+    assert outbox(m) == [(alert_id, 95.0)]
+
+
+def test_raised_target_fires_if_price_already_below(client, m, add_product, headers):
+    product_id = add_product(1, current_price=100.0)
+    alert = client.post('/api/alerts', json={'product_id': product_id, 'target_price': 80}, headers=headers).get_json()['alert']
+    updated = client.put(f"/api/alerts/{alert['id']}", json={'target_price': 110}, headers=headers).get_json()['alert']
+    assert updated['is_active'] is False
+    assert outbox(m) == [(alert['id'], 100.0)]
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import jwt
+from sqlalchemy import event
+
+
+def make_user(m, email='user@example.com', is_admin=False):
+    with m.app.app_context():
+        user = m.User(email=email, password='x', is_admin=is_admin)
+        m.db.session.add(user)
+        m.db.session.commit()
+        return user.id
+
+
+def make_token(m, user_id, expires_in=timedelta(days=1)):
+    return jwt.encode({'user_id': user_id, 'exp': datetime.utcnow() + expires_in},
+                      m.app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def call(m, decorator, token):
+    """Dekoratörle sarılmış boş view'u çağır; (yanıt, SQL sorgu sayısı)"""
+    queries = []
+    view = decorator(lambda user: ('ok', user))
+    with m.app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        engine = m.db.engine
+        listener = lambda *args: queries.append(args[2])
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            result = view()
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+    return result, len(queries)
+
+
+def status(result):
+    return result[1] if isinstance(result, tuple) and isinstance(result[1], int) else 200
+
+
+def test_warm_path_runs_no_queries(m):
+    user_id = make_user(m)
+    token = make_token(m, user_id)
+
+    (_, user), cold = call(m, m.token_required, token)
+    assert user.id == user_id and cold == 1
+    (_, user), warm = call(m, m.token_required, token)
+    assert user.email == 'user@example.com' and warm == 0
+
+
+def test_role_change_is_seen_immediately(m):
+    user_id = make_user(m, is_admin=True)
+    token = make_token(m, user_id)
+    assert status(call(m, m.admin_required, token)[0]) == 200
+
+    with m.app.app_context():
+        m.db.session.get(m.User, user_id).is_admin = False
+        m.db.session.commit()
+    assert status(call(m, m.admin_required, token)[0]) == 403
+    assert status(call(m, m.token_required, token)[0]) == 200
+
+
+def test_deleted_user_is_rejected(m):
+    user_id = make_user(m)
+    token = make_token(m, user_id)
+    call(m, m.token_required, token)
+
+    with m.app.app_context():
+        m.db.session.delete(m.db.session.get(m.User, user_id))
+        m.db.session.commit()
+    result, _ = call(m, m.token_required, token)
+    assert status(result) == 401 and result[0].get_json()['message'] == 'User not found'
+
+
+def test_cached_token_still_expires(m, monkeypatch):
+    user_id = make_user(m)
+    token = make_token(m, user_id, expires_in=timedelta(seconds=30))
+    assert status(call(m, m.token_required, token)[0]) == 200
+
+    later = m.time.time() + 60
+    monkeypatch.setattr(m.time, 'time', lambda: later)
+    result, _ = call(m, m.token_required, token)
+    assert status(result) == 401 and result[0].get_json()['message'] == 'Token expired'
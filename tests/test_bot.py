@@ -0,0 +1,67 @@
+def item(index, **fields):
+    data = {
+        'title': f'Bot Ürün {index}',
+        'platform': 'Trendyol',
+        'current_price': 100.0,
+        'original_price': 200.0,
+        'discount_percent': 50,
+        'product_url': f'https://www.trendyol.com/marka/urun-{index}-p-{1000 + index}',
+    }
+    data.update(fields)
+    return data
+
+
+def test_batch_rejects_malformed_items_individually(client):
+    items = [
+        item(1),
+        item(2, product_url=12345),
+        item(3, title=['liste', 'başlık']),
+        item(4, current_price='nan'),
+        item(5, original_price=float('inf')),
+        item(6, discount_percent='1e999'),
+    ]
+    response = client.post('/api/bot/products/batch', json=items)
+    body = response.get_json()
+    assert response.status_code == 200, body
+    assert [r['status'] for r in body['results']] == ['created'] + ['invalid'] * 5
+    assert body['summary'] == {'created': 1, 'duplicate': 0, 'invalid': 5}
+
+
+def test_batch_duplicate_in_same_batch_applies_last_price(client, m):
+    response = client.post('/api/bot/products/batch', json=[item(1), item(1, current_price=80.0)])
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['created', 'duplicate']
+    assert results[1]['price_changed'] is True
+    assert results[0]['id'] == results[1]['id']
+
+    response = client.post('/api/bot/products/batch', json=[item(1, current_price=70.0), item(1, current_price=60.0)])
+    results = response.get_json()['results']
+    assert [r['price_changed'] for r in results] == [True, True]
+
+    with m.app.app_context():
+        product = m.db.session.get(m.Product, results[0]['id'])
+        assert product.current_price == 60.0
+        prices = [h.price for h in m.PriceHistory.query.filter_by(product_id=product.id).order_by(m.PriceHistory.id)]
+    assert prices == [80.0, 60.0]
+
+
+def test_single_endpoint_rejects_malformed_item(client):
+    assert client.post('/api/bot/products', json=item(1, product_url=['x'])).status_code == 400
+    assert client.post('/api/bot/products', json=item(1, current_price='inf')).status_code == 400
+    assert client.post('/api/bot/products', json=item(1)).status_code == 201
+
+
+def test_identity_match_recomputes_discount(client, m):
+    created = client.post('/api/bot/products', json=item(1, current_price=180.0, discount_percent=10,
+                                                         real_deal_status='normal')).get_json()
+    # Aynı ürün, takip parametreli link ve yeni fiyat; indirim gönderilmiyor
+    update = item(1, product_url=item(1)['product_url'] + '?boutiqueId=61&merchantId=968', current_price=100.0)
+    del update['discount_percent']
+    body = client.post('/api/bot/products', json=update).get_json()
+    assert body['id'] == created['id'] and body['price_changed'] is True
+
+    with m.app.app_context():
+        product = m.db.session.get(m.Product, created['id'])
+        assert product.discount_percent == 50
+        # Etiket reclassify-deals'e ait; bot güncellemesi değiştirmez
+        assert product.real_deal_status == 'normal'
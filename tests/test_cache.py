@@ -0,0 +1,39 @@
+def test_cursor_and_offset_modes_are_cached_separately(client, add_product):
+    for i in range(3):
+        add_product(i)
+
+    offset = client.get('/api/products').get_json()
+    cursor = client.get('/api/products?cursor=').get_json()
+    assert 'pages' in offset and 'next_cursor' not in offset
+    assert 'next_cursor' in cursor and 'pages' not in cursor
+
+    # İkinci istekler cache'ten döner; modlar birbirinin yanıtını almaz
+    assert client.get('/api/products?cursor=').get_json() == cursor
+    assert client.get('/api/products').get_json() == offset
+
+
+def test_invalidation_is_shared_between_processes(client, m, add_product):
+    """Başka bir worker'ın (ayrı MemoryBackend) invalidation'ı bu worker'ın yanıtlarını da düşürür"""
+    from cache import MemoryBackend, ResponseCache
+
+    add_product(1)
+    assert client.get('/api/products').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/products').headers['X-Cache'] == 'HIT'
+
+    other_worker = ResponseCache(MemoryBackend(version_store=m.CatalogVersionStore()))
+    with m.app.app_context():
+        other_worker.invalidate()
+    assert client.get('/api/products').headers['X-Cache'] == 'MISS'
+
+
+def test_scraper_save_invalidates_web_cache(client, m):
+    import scraper
+
+    assert client.get('/api/products').get_json()['total'] == 0
+    scraper.save_to_database([{
+        'title': 'Scraper Ürün', 'platform': 'Trendyol', 'category': 'Elektronik',
+        'current_price': 100.0, 'original_price': 150.0, 'discount_percent': 33,
+        'image_url': '', 'product_url': 'https://www.trendyol.com/marka/urun-p-1',
+        'real_deal_status': 'real',
+    }])
+    assert client.get('/api/products').get_json()['total'] == 1
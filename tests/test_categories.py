@@ -0,0 +1,68 @@
+import pytest
+
+from categories import DEFAULT_CATEGORY, CategoryClassifier, normalize_term
+from scraper import category_classifier
+
+
+@pytest.mark.parametrize('title, category', [
+    ('APPLE iPhone 15 128 GB Siyah', 'Elektronik'),
+    ('Samsung 55" QLED Akıllı Televizyon', 'Elektronik'),
+    ('Kadın Deri ÇANTA Taba', 'Moda'),
+    ('Pamuklu Çift Kişilik Nevresim Takımı', 'Ev'),
+    ('Sızma Zeytinyağı 1 L Teneke', 'Süpermarket'),
+    ('Mat Likit RUJ 05', 'Kozmetik'),
+    ('Erkek Koşu Ayakkabısı', 'Moda'),  # Ekli hal: 'ayakkabi' -> 'ayakkabisi'
+])
+def test_classify_normalized_turkish_titles(title, category):
+    assert category_classifier.classify(title) == category
+
+
+def test_short_terms_match_whole_words_only():
+    classifier = CategoryClassifier({}, {'A': {'tv': 1}, 'B': {'kulaklik': 1}})
+    assert classifier.classify('Smart TV 50"') == 'A'
+    assert classifier.classify('TVbox kumanda') == DEFAULT_CATEGORY
+    assert classifier.classify('Kablosuz Kulaklıklar') == 'B'
+
+
+def test_longest_match_and_scores():
+    classifier = CategoryClassifier({}, {'A': {'makine': 1}, 'B': {'kahve makinesi': 3}})
+    assert classifier.matches(normalize_term('Kahve Makinesi')) == ['kahve makinesi']
+    assert classifier.classify('Kahve Makinesi Filtre') == 'B'
+
+
+def test_default_and_hint_fallback():
+    assert category_classifier.classify('Xqzw 123') == DEFAULT_CATEGORY
+    assert category_classifier.classify('Xqzw 123', hint='Ev') == 'Ev'
+    # Hint yalnızca eşitlik bozar, tek bir eşleşmeyi geçemez
+    classifier = CategoryClassifier({}, {'A': {'kalem': 1}, 'B': {'defter': 1}})
+    assert classifier.classify('kalem defter', hint='B') == 'B'
+    assert classifier.classify('kalem', hint='B') == 'A'
+
+
+def test_classify_many_and_products_match_single():
+    titles = ['iPhone 15 Pro', 'Kadın Mont', 'Xqzw', 'Bebek Bezi 5 Numara']
+    expected = [category_classifier.classify(title, hint='Ev') for title in titles]
+    assert category_classifier.classify_many(titles, hint='Ev') == expected
+
+    products = [{'title': title} for title in titles] + [{}]
+    category_classifier.classify_products(products)
+    assert [p['category'] for p in products] == ['Elektronik', 'Moda', DEFAULT_CATEGORY, 'Süpermarket', DEFAULT_CATEGORY]
+
+
+def test_category_for_keyword():
+    assert category_classifier.category_for_keyword('akilli-saat') == 'Elektronik'
+    assert category_classifier.category_for_keyword('nevresim') == 'Ev'
+
+
+def test_reclassify_categories(m, add_product):
+    moved = add_product(1, title='Kadın Deri Çanta', category='Elektronik')
+    unmatched = add_product(2, title='Xqzw 123', category='Ev')
+    with m.app.app_context():
+        assert m.reclassify_categories(dry_run=True)['changed'] == 1
+        assert m.db.session.get(m.Product, moved).category == 'Elektronik'
+
+        stats = m.reclassify_categories(batch_size=1)
+        assert stats['products'] == 2 and stats['moves'] == {('Elektronik', 'Moda'): 1}
+        m.db.session.expire_all()
+        assert m.db.session.get(m.Product, moved).category == 'Moda'
+        assert m.db.session.get(m.Product, unmatched).category == 'Ev'
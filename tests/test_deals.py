@@ -0,0 +1,31 @@
+import numpy as np
+
+from deals import align
+
+
+def test_align_ignores_history_of_unloaded_products():
+    features = {'product_id': np.array([2, 3, 5, 9]), 'median': np.array([20.0, 30.0, 50.0, 90.0])}
+    out = align(features, np.array([1, 3, 5]), 'median')
+    assert np.isnan(out[0])
+    assert out[1:].tolist() == [30.0, 50.0]
+
+
+def test_align_without_products_or_history():
+    assert align({'product_id': np.array([1]), 'median': np.array([1.0])}, np.array([], dtype=np.int64), 'median').size == 0
+    empty = {'product_id': np.array([], dtype=np.int64), 'days': np.array([])}
+    assert align(empty, np.array([1, 2]), 'days', fill=0.0).tolist() == [0.0, 0.0]
+
+
+def test_incremental_reclassify_sees_late_committed_history(m, add_product):
+    first, late = add_product(1), add_product(2)
+    with m.app.app_context():
+        m.db.session.add_all([m.PriceHistory(id=1, product_id=first, price=100.0),
+                              m.PriceHistory(id=3, product_id=first, price=90.0)])
+        m.db.session.commit()
+        assert m.reclassify_deals()['products'] == 2  # ilk çalışma tam hesap
+
+        # id'si watermark'tan küçük, önceki çalışmadan sonra commit edilen satır
+        m.db.session.add(m.PriceHistory(id=2, product_id=late, price=100.0))
+        m.db.session.commit()
+        assert m.db.session.get(m.JobState, 'reclassify_deals').watermark == 3
+        assert m.reclassify_deals()['products'] == 2
@@ -0,0 +1,25 @@
+import dedup
+
+
+def test_find_duplicates_empty_catalog():
+    groups, stats = dedup.find_duplicates([], [], [], [])
+    assert groups == []
+    assert stats['candidates'] == 0
+
+
+def test_find_duplicates_only_empty_titles():
+    groups, stats = dedup.find_duplicates(['', '  ', '!!'], ['Trendyol'] * 3, [10.0, 10.0, 10.0], [None] * 3)
+    assert groups == []
+    assert stats['candidates'] == 0
+
+
+def test_find_duplicates_groups_similar_titles():
+    titles = ['Samsung Galaxy S24 256 GB Siyah', 'SAMSUNG GALAXY S24 256 GB SIYAH', 'Samsung Galaxy S24 128 GB Siyah']
+    groups, _ = dedup.find_duplicates(titles, ['Trendyol'] * 3, [30000.0, 31000.0, 28000.0], [None] * 3)
+    assert groups == [[0, 1]]
+
+
+def test_dedupe_products_on_empty_catalog(m):
+    with m.app.app_context():
+        stats = m.dedupe_products()
+    assert stats['duplicates'] == 0
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+
+
+def set_updated(m, product_id, updated_at):
+    with m.app.app_context():
+        m.db.session.execute(m.db.update(m.Product).where(m.Product.id == product_id).values(updated_at=updated_at))
+        m.db.session.commit()
+
+
+def export_ids(client, **params):
+    response = client.get('/api/products/export', query_string=dict(params, fields='id,updated_at'))
+    assert response.status_code == 200, response.data
+    return [json.loads(line)['id'] for line in response.data.decode().splitlines()]
+
+
+def test_updated_since_orders_by_updated_at_and_resumes(client, m, add_product):
+    ids = [add_product(i) for i in range(1, 5)]
+    times = [datetime(2024, 1, 3), datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 2)]
+    for product_id, updated_at in zip(ids, times):
+        set_updated(m, product_id, updated_at)
+
+    assert export_ids(client) == ids
+    assert export_ids(client, updated_since='2024-01-01T00:00:00') == [ids[2], ids[3], ids[0]]
+    # Aynı updated_at'li satırlar arasında kesilen export after_id ile sürer
+    assert export_ids(client, updated_since='2024-01-02T00:00:00', after_id=ids[2]) == [ids[3], ids[0]]
+    assert export_ids(client, updated_since='2024-01-03T00:00:00') == []
+
+
+def test_updated_since_uses_index(m):
+    with m.app.app_context():
+        names = {index['name'] for index in m.db.inspect(m.db.engine).get_indexes('product')}
+        plan = m.db.session.execute(m.db.text(
+            "EXPLAIN QUERY PLAN SELECT id FROM product WHERE updated_at > '2024-01-01' ORDER BY updated_at, id"
+        )).all()
+    assert 'ix_product_updated' in names
+    assert any('ix_product_updated' in row[-1] for row in plan)
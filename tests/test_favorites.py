@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def count_queries(m):
+    """Çalışan SQL ifadelerinin listesi (test sırasında temizlenip sayılır)"""
+    with m.app.app_context():
+        engine = m.db.engine
+    queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    yield queries
+    event.remove(engine, 'before_cursor_execute', count)
+
+
+def test_favorites_query_count_is_constant(client, m, add_product, count_queries):
+    ids = [add_product(i) for i in range(1, 51)]
+    with m.app.app_context():
+        # Her ürünün iki fiyat noktası: yanıtta son nokta olmalı
+        m.db.session.execute(m.db.insert(m.PriceHistory), [
+            {'product_id': product_id, 'price': price, 'recorded_at': day, 'last_seen_at': day}
+            for product_id in ids
+            for day, price in ((datetime(2026, 1, 1), 200.0), (datetime(2026, 1, 2), 100.0))
+        ])
+        m.db.session.commit()
+
+    counts = {}
+    for size in (1, 10, 50):
+        token = client.post('/api/auth/register', json={'email': f'fav{size}@example.com', 'password': 'secret123'}).get_json()['token']
+        headers = {'Authorization': f'Bearer {token}'}
+        with m.app.app_context():
+            user_id = m.User.query.filter_by(email=f'fav{size}@example.com').one().id
+            m.db.session.execute(m.db.insert(m.Favorite), [{'user_id': user_id, 'product_id': i} for i in ids[:size]])
+            m.db.session.commit()
+        client.get('/api/favorites', headers=headers)  # auth cache'i ısıt
+
+        count_queries.clear()
+        body = client.get('/api/favorites?per_page=100', headers=headers).get_json()
+        counts[size] = len(count_queries)
+
+        assert len(body['favorites']) == size
+        assert all(f['latest_price']['price'] == 100.0 for f in body['favorites'])
+
+    assert len(set(counts.values())) == 1, counts
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from hashing import HashingBusy, PasswordHasher, normalize_method
+
+# Düşük iş faktörlü yöntemler testleri hızlı tutar; kısaltılmış yazımlar werkzeug varsayılanlarıyla
+METHODS = ['pbkdf2:sha256:1000', 'pbkdf2:sha512:1000', 'scrypt:1024:8:1']
+
+
+@pytest.mark.parametrize('method', METHODS + ['pbkdf2', 'pbkdf2:sha256', 'scrypt'])
+def test_normalize_matches_werkzeug_prefix(method):
+    stored = generate_password_hash('secret', method=method)
+    assert stored.split('$', 1)[0] == normalize_method(method)
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_no_rehash_for_own_method(method):
+    hasher = PasswordHasher(method, workers=0)
+    stored = hasher.hash('secret')
+    assert hasher.check(stored, 'secret')
+    assert not hasher.needs_rehash(stored)
+
+
+@pytest.mark.parametrize('old, new', [
+    ('pbkdf2:sha256:1000', 'pbkdf2:sha256:2000'),
+    ('pbkdf2:sha256:1000', 'scrypt:1024:8:1'),
+    ('scrypt:1024:8:1', 'scrypt:2048:8:1'),
+    ('scrypt:1024:8:1', 'pbkdf2:sha256:1000'),
+])
+def test_rehash_when_method_changes(old, new):
+    stored = generate_password_hash('secret', method=old)
+    assert PasswordHasher(new, workers=0).needs_rehash(stored)
+
+
+def test_unsupported_method():
+    with pytest.raises(ValueError):
+        normalize_method('md5')
+    with pytest.raises(ValueError):
+        normalize_method('scrypt:16384')
+
+
+def _hold_slots(hasher, count):
+    """Slotları dolduran ve serbest bırakılana kadar bekleyen hash'ler başlat"""
+    release = threading.Event()
+    started = threading.Barrier(count + 1)
+
+    def blocking(*args):
+        started.wait()
+        release.wait(5)
+        return True
+
+    threads = [threading.Thread(target=hasher._run, args=(blocking,)) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    return release, threads
+
+
+def _wait_for(predicate):
+    deadline = time.time() + 5
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_waiters_show_as_queue_depth():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=2, queue_limit=4)
+    release, running = _hold_slots(hasher, 2)
+    waiters = [threading.Thread(target=hasher.hash, args=('secret',)) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+
+    _wait_for(lambda: hasher.stats()['queue_depth'] == 3)
+    assert hasher.stats()['in_flight'] == 5
+
+    release.set()
+    for thread in running + waiters:
+        thread.join()
+    stats = hasher.stats()
+    assert (stats['in_flight'], stats['queue_depth'], stats['completed']) == (0, 0, 5)
+
+
+def test_rejects_when_queue_full():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, queue_limit=1)
+    release, running = _hold_slots(hasher, 1)
+    waiter = threading.Thread(target=hasher.hash, args=('secret',))
+    waiter.start()
+    _wait_for(lambda: hasher.stats()['queue_depth'] == 1)
+
+    with pytest.raises(HashingBusy):
+        hasher.hash('secret')
+    assert hasher.stats()['rejected'] == 1
+
+    release.set()
+    for thread in running + [waiter]:
+        thread.join()
+    assert hasher.check(hasher.hash('secret'), 'secret')
+
+
+def test_slot_wait_timeout_rejects():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, queue_limit=4, timeout=0.1)
+    release, running = _hold_slots(hasher, 1)
+    with pytest.raises(HashingBusy):
+        hasher.hash('secret')
+    release.set()
+    for thread in running:
+        thread.join()
+    assert hasher.stats()['in_flight'] == 0
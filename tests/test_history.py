@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+BASE = datetime(2024, 1, 1)
+
+
+def add_history(m, product_id, prices, seen_after=timedelta(hours=1)):
+    with m.app.app_context():
+        for day, price in enumerate(prices):
+            recorded = BASE + timedelta(days=day)
+            m.db.session.add(m.PriceHistory(product_id=product_id, price=price, recorded_at=recorded,
+                                            last_seen_at=recorded + seen_after))
+        m.db.session.commit()
+
+
+def history(m, product_id):
+    with m.app.app_context():
+        return [(h.price, h.recorded_at, h.last_seen_at) for h in
+                m.PriceHistory.query.filter_by(product_id=product_id).order_by(m.PriceHistory.recorded_at)]
+
+
+def test_compaction_keeps_run_boundaries(m, add_product):
+    first, second = add_product(1), add_product(2)
+    add_history(m, first, [100.0, 100.0, 90.0, 90.0, 90.0, 100.0])
+    # Önceki ürünün son fiyatıyla aynı: ürün sınırı yeni dizi başlatır. last_seen_at
+    # recorded_at'ten eski (eski veri); tekrar yutmayan satır yeniden yazılmamalı
+    add_history(m, second, [100.0, 80.0], seen_after=-timedelta(hours=1))
+
+    with m.app.app_context():
+        assert m.compact_price_history(batch_size=2) == (5, 3)
+
+    day = lambda n, hours=0: BASE + timedelta(days=n, hours=hours)
+    assert history(m, first) == [
+        (100.0, day(0), day(1, 1)),
+        (90.0, day(2), day(4, 1)),
+        (100.0, day(5), day(5, 1)),
+    ]
+    # Tekrar yutmayan satırlara dokunulmaz
+    assert history(m, second) == [(100.0, day(0), day(-1, 23)), (80.0, day(1), day(0, 23))]
+
+
+def test_compaction_is_idempotent(m, add_product):
+    product_id = add_product(1)
+    add_history(m, product_id, [50.0, 50.0, 50.0])
+    with m.app.app_context():
+        assert m.compact_price_history() == (1, 2)
+        assert m.compact_price_history() == (1, 0)
+    assert len(history(m, product_id)) == 1
+
+
+def get_history(client, product_id, **params):
+    response = client.get(f'/api/products/{product_id}/history', query_string=params)
+    assert response.status_code == 200, response.data
+    return response.get_json()
+
+
+def test_history_skips_null_recorded_at(client, m, add_product):
+    product_id = add_product(1)
+    add_history(m, product_id, [100.0, 90.0, 80.0, 70.0])
+    with m.app.app_context():
+        m.db.session.execute(m.db.insert(m.PriceHistory).values(product_id=product_id, price=1.0, recorded_at=None))
+        m.db.session.commit()
+
+    body = get_history(client, product_id, points=3)
+    assert body['total_points'] == 4
+    prices = [p['price'] for p in body['points']]
+    assert len(prices) == 3 and prices[0] == 100.0 and prices[-1] == 70.0
+    assert 1.0 not in prices
+
+
+def test_history_bounds_are_compared_in_utc(client, m, add_product):
+    product_id = add_product(1)
+    add_history(m, product_id, [100.0, 90.0, 80.0, 70.0])
+
+    naive = get_history(client, product_id, **{'from': '2024-01-02T00:00:00', 'to': '2024-01-03T00:00:00'})
+    aware = get_history(client, product_id, **{'from': '2024-01-02T03:00:00+03:00', 'to': '2024-01-03T00:00:00Z'})
+    assert aware['points'] == naive['points']
+    # from'dan önceki son nokta aralığın başındaki fiyat olarak gelir
+    assert [p['price'] for p in naive['points']] == [100.0, 90.0, 80.0]
+
+
+def test_long_history_is_bucketed_in_sql(client, m, add_product, monkeypatch):
+    monkeypatch.setattr(m, 'HISTORY_FETCH_ROWS', 10)
+    product_id = add_product(1)
+    prices = [100.0 + (day % 7) for day in range(40)]
+    prices[17], prices[31] = 10.0, 500.0
+    add_history(m, product_id, prices)
+
+    body = get_history(client, product_id)
+    returned = [p['price'] for p in body['points']]
+    assert body['total_points'] == 40 and body['downsampled'] and body['method'] == 'minmax'
+    assert len(returned) <= 10
+    assert min(returned) == 10.0 and max(returned) == 500.0
+
+    body = get_history(client, product_id, points=4, method='minmax')
+    assert len(body['points']) <= 4
+    assert {10.0, 500.0} <= {p['price'] for p in body['points']}
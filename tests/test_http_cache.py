@@ -0,0 +1,61 @@
+import scraper
+
+URL = 'https://www.n11.com/arama?q=telefon'
+
+
+class Response:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+
+class Session:
+    """Sıradaki yanıtları döndüren ve gönderilen koşullu başlıkları kaydeden session"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_cache_is_keyed_by_parser_version(tmp_path):
+    scraper.HttpCache(str(tmp_path), version=1).set(URL, {'etag': '"a"', 'parsed': {'10': ['eski']}})
+    assert scraper.HttpCache(str(tmp_path), version=1).get(URL)['etag'] == '"a"'
+    assert scraper.HttpCache(str(tmp_path), version=2).get(URL) is None
+    assert scraper.HttpCache('').get(URL) is None
+
+
+def test_not_modified_reuses_parse_result(tmp_path, monkeypatch):
+    session = Session(Response(200, 'gövde', {'ETag': '"a"'}), Response(304))
+    monkeypatch.setattr(scraper, 'http_cache', scraper.HttpCache(str(tmp_path)))
+    monkeypatch.setattr(scraper, 'get_session', lambda platform: session)
+    parses = []
+
+    def parse(body):
+        parses.append(body)
+        return [body.upper()]
+
+    assert scraper.fetch_parsed('N11', URL, parse) == ['GÖVDE']
+    assert scraper.fetch_parsed('N11', URL, parse) == ['GÖVDE']
+    assert parses == ['gövde']
+    assert session.sent[1] == {'If-None-Match': '"a"'}
+
+
+def test_parser_version_bump_refetches(tmp_path, monkeypatch):
+    session = Session(Response(200, 'v1', {'ETag': '"a"'}), Response(200, 'v2', {'ETag': '"a"'}))
+    monkeypatch.setattr(scraper, 'get_session', lambda platform: session)
+
+    monkeypatch.setattr(scraper, 'http_cache', scraper.HttpCache(str(tmp_path), version=1))
+    assert scraper.fetch_parsed('N11', URL, lambda body: [body]) == ['v1']
+    monkeypatch.setattr(scraper, 'http_cache', scraper.HttpCache(str(tmp_path), version=2))
+    assert scraper.fetch_parsed('N11', URL, lambda body: [body]) == ['v2']
+    # Yeni sürüm eski ETag'i göndermez; 304 ile eski parse sonucu dönmez
+    assert session.sent[1] == {}
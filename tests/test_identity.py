@@ -0,0 +1,66 @@
+import scraper
+
+
+def scraped(index, **fields):
+    data = {
+        'title': 'Aynı Başlıklı Kulaklık',
+        'platform': 'Trendyol',
+        'category': 'Elektronik',
+        'current_price': 100.0,
+        'original_price': 200.0,
+        'discount_percent': 50,
+        'image_url': '',
+        'product_url': f'https://www.trendyol.com/marka/kulaklik-p-{1000 + index}',
+        'real_deal_status': 'real',
+    }
+    data.update(fields)
+    return data
+
+
+def prices_by_url(m):
+    with m.app.app_context():
+        return {p.product_url: p.current_price for p in m.Product.query}
+
+
+def clear_fingerprint(m, product_id):
+    with m.app.app_context():
+        m.db.session.execute(m.db.update(m.Product).where(m.Product.id == product_id).values(fingerprint=None))
+        m.db.session.commit()
+
+
+def test_scraper_keeps_same_title_listings_apart(m):
+    assert scraper.save_to_database([scraped(1), scraped(2, current_price=150.0)]) == 2
+    scraper.save_to_database([scraped(2, current_price=120.0)])
+
+    first, second = scraped(1)['product_url'], scraped(2)['product_url']
+    assert prices_by_url(m) == {first: 100.0, second: 120.0}
+
+
+def test_title_fallback_only_for_rows_without_fingerprint(m, add_product):
+    add_product(1, title='Eski Ürün')
+    legacy = add_product(2, title='Eski Ürün', platform='Hepsiburada')
+    clear_fingerprint(m, legacy)
+
+    with m.app.app_context():
+        rows = [
+            {'fingerprint': 'url:yeni-1', 'product_url': 'https://example.com/yeni-1',
+             'platform': 'Trendyol', 'title': 'Eski Ürün'},
+            {'fingerprint': 'url:yeni-2', 'product_url': 'https://example.com/yeni-2',
+             'platform': 'Hepsiburada', 'title': 'Eski Ürün'},
+        ]
+        assert m.resolve_products(rows) == [None, legacy]
+
+
+def test_bot_batch_keeps_same_title_listings_apart(client, m):
+    items = [
+        {'title': 'Aynı Başlık', 'platform': 'Trendyol', 'current_price': 100.0, 'original_price': 200.0,
+         'product_url': f'https://www.trendyol.com/marka/urun-p-{index}'}
+        for index in (1, 2)
+    ]
+    results = client.post('/api/bot/products/batch', json=items).get_json()['results']
+    assert [r['status'] for r in results] == ['created', 'created']
+
+    update = dict(items[1], current_price=80.0)
+    body = client.post('/api/bot/products', json=update).get_json()
+    assert body['id'] == results[1]['id'] and body['price_changed'] is True
+    assert sorted(prices_by_url(m).values()) == [80.0, 100.0]
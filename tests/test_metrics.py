@@ -0,0 +1,38 @@
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+
+
+def login(client, email, password):
+    return client.post('/api/auth/login', json={'email': email, 'password': password}).get_json()['token']
+
+
+def test_metrics_requires_auth(client, m, monkeypatch):
+    monkeypatch.setitem(m.app.config, 'METRICS_TOKEN', '')
+    assert client.get('/metrics').status_code == 401
+
+    client.post('/api/auth/register', json={'email': 'user@example.com', 'password': 'secret123'})
+    user_token = login(client, 'user@example.com', 'secret123')
+    assert client.get('/metrics', headers={'Authorization': f'Bearer {user_token}'}).status_code == 403
+
+    with m.app.app_context():
+        m.db.session.add(m.User(email='admin@example.com', password=m.password_hasher.hash('secret123'), is_admin=True))
+        m.db.session.commit()
+    admin_token = login(client, 'admin@example.com', 'secret123')
+    assert client.get('/metrics', headers={'Authorization': f'Bearer {admin_token}'}).status_code == 200
+
+    monkeypatch.setitem(m.app.config, 'METRICS_TOKEN', 'scrape-token')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'}).status_code == 200
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+
+def test_failed_statement_does_not_skew_sql_timing(m):
+    with m.app.test_request_context('/api/products'):
+        m.request_metrics._before_request()
+        with pytest.raises(OperationalError):
+            m.db.session.execute(m.db.text('SELECT * FROM missing_table'))
+        m.db.session.rollback()
+
+        m.db.session.execute(m.db.text('SELECT 1'))
+        assert g.sql_count == 1
+        assert g.sql_time < 1
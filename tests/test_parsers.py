@@ -0,0 +1,51 @@
+"""
+Parser'ları platformlardan kaydedilmiş gerçek arama yanıtlarına karşı çalıştırır.
+
+Sayfalar `python scraper.py --capture tests/fixtures/pages --keyword telefon` ile
+kaydedilir (<platform>_<keyword>.json|html). Kaydedilmiş sayfası olmayan platform
+atlanır; elle yazılmış HTML burada kullanılmaz (benchmarks/fixtures yalnızca hız ölçümü içindir).
+"""
+
+import glob
+import os
+from urllib.parse import unquote
+
+import pytest
+
+import scraper
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+PARSERS = {
+    'Trendyol': lambda body, keyword: scraper.parse_trendyol(body, keyword, 1000),
+    'Hepsiburada': lambda body, keyword: scraper.hepsiburada_parser.parse(body, keyword, 1000),
+    'N11': lambda body, keyword: scraper.n11_parser.parse(body, keyword, 1000),
+}
+
+
+def captured_pages():
+    for platform in PARSERS:
+        paths = sorted(glob.glob(os.path.join(PAGES, f'{platform.lower()}_*')))
+        if not paths:
+            yield pytest.param(platform, None, marks=pytest.mark.skip(reason=f'{platform} için kaydedilmiş sayfa yok'))
+        for path in paths:
+            yield pytest.param(platform, path, id=os.path.basename(path))
+
+
+@pytest.mark.parametrize('platform, path', list(captured_pages()))
+def test_parser_on_captured_page(platform, path):
+    keyword = unquote(os.path.splitext(os.path.basename(path))[0].split('_', 1)[1])
+    with open(path, encoding='utf-8') as f:
+        products = PARSERS[platform](f.read(), keyword)
+
+    assert products, f'{os.path.basename(path)}: ürün çıkmadı (işaretleme değişmiş olabilir)'
+    base_url = scraper.PLATFORMS[platform]['base_url']
+    for product in products:
+        assert product['title'].strip()
+        assert product['platform'] == platform
+        assert product['current_price'] > 0
+        assert product['original_price'] >= product['current_price']
+        assert 0 <= product['discount_percent'] < 100
+        assert product['product_url'].startswith(base_url)
+        assert product['real_deal_status'] in ('real', 'normal', 'fake')
+    # Aynı kart iki kez okunmamalı
+    assert len({product['product_url'] for product in products}) == len(products)
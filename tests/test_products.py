@@ -0,0 +1,31 @@
+def test_cursor_per_page_is_clamped(client, add_product):
+    for i in range(3):
+        add_product(i)
+
+    for per_page, expected in (('0', 1), ('-5', 1), ('1000', 3)):
+        body = client.get(f'/api/products?cursor=&per_page={per_page}').get_json()
+        assert body['per_page'] == min(max(int(per_page), 1), 100)
+        assert len(body['products']) == expected
+
+    assert client.get('/api/products?per_page=abc').status_code == 400
+
+
+def test_cursor_pages_skip_null_created_at(client, add_product, m):
+    ids = [add_product(i) for i in range(3)]
+    with m.app.app_context():
+        m.db.session.execute(m.db.update(m.Product).where(m.Product.id == ids[0]).values(created_at=None))
+        m.db.session.commit()
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'/api/products?cursor={cursor}&per_page=1')
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        seen += [p['id'] for p in body['products']]
+        cursor = body['next_cursor']
+    assert sorted(seen) == ids[1:]
+
+    m.init_db()
+    with m.app.app_context():
+        assert m.Product.query.filter(m.Product.created_at.is_(None)).count() == 0
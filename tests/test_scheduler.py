@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+
+import scheduler
+
+
+def job_state(m, name):
+    with m.app.app_context():
+        state = m.db.session.get(m.JobState, name)
+        return state and (state.last_status, state.run_count)
+
+
+def test_single_leader(m):
+    first, second = scheduler.Leadership(ttl=60), scheduler.Leadership(ttl=60)
+    assert first.renew() and first.is_leader()
+    assert not second.renew() and not second.is_leader()
+    # Sahip yenileyebilir, diğerinin lease'i alması için bırakılması gerekir
+    assert first.renew()
+    first.release()
+    assert not first.is_leader()
+    assert second.renew() and second.is_leader()
+
+
+def test_expired_lease_is_taken_over(m):
+    with m.app.app_context():
+        assert m.acquire_lease('scheduler', 'old-owner', -1)
+    leadership = scheduler.Leadership(ttl=60)
+    assert leadership.renew()
+    with m.app.app_context():
+        assert m.db.session.get(m.SchedulerLease, 'scheduler').owner == leadership.owner
+
+
+def test_leader_only_skips_followers(m):
+    leadership = scheduler.Leadership(ttl=60)
+    job = scheduler.leader_only(leadership, lambda: 'ran')
+    assert job() == scheduler.SKIPPED
+    leadership.renew()
+    assert job() == 'ran'
+
+
+@pytest.fixture
+def created():
+    sched, leadership = scheduler.create_scheduler()
+    sched.start(paused=True)
+    yield sched, leadership
+    sched.shutdown(wait=False)
+
+
+def test_category_jobs_spread_with_jitter(created):
+    sched, _ = created
+    jobs = [sched.get_job(f'scrape:{category}') for category in scheduler.CATEGORIES]
+    interval = timedelta(hours=scheduler.SCRAPING_INTERVAL_HOURS)
+    starts = [job.trigger.start_date for job in jobs]
+    gaps = {round((b - a).total_seconds()) for a, b in zip(starts, starts[1:])}
+    assert gaps == {round(interval.total_seconds() / len(jobs))}
+    assert all(job.trigger.interval == interval for job in jobs)
+    assert all(job.trigger.jitter == scheduler.SCRAPING_JITTER_SECONDS for job in jobs)
+
+
+def test_missed_runs_coalesce(created):
+    sched, _ = created
+    for job in sched.get_jobs():
+        if job.id == 'leader_lease':
+            continue
+        assert job.coalesce and job.max_instances == 1
+        assert job.misfire_grace_time == scheduler.MISFIRE_GRACE_SECONDS
+
+
+def test_job_metrics_record_only_leader_runs(m):
+    leadership = scheduler.Leadership(ttl=60)
+    metrics = scheduler.JobMetrics(leadership)
+    scheduled = datetime.now() - timedelta(seconds=5)
+
+    def event(code, job_id, retval=None):
+        return SimpleNamespace(code=code, job_id=job_id, retval=retval, exception=None,
+                               scheduled_run_times=[scheduled])
+
+    metrics.listener(event(EVENT_JOB_MISSED, 'a'))
+    metrics.listener(event(EVENT_JOB_SUBMITTED, 'b'))
+    metrics.listener(event(EVENT_JOB_EXECUTED, 'b', scheduler.SKIPPED))
+    assert job_state(m, 'a') is None and job_state(m, 'b') is None
+
+    leadership.renew()
+    metrics.listener(event(EVENT_JOB_MISSED, 'a'))
+    metrics.listener(event(EVENT_JOB_SUBMITTED, 'b'))
+    metrics.listener(event(EVENT_JOB_EXECUTED, 'b', 3))
+    assert job_state(m, 'a') == ('missed', 1)
+    assert job_state(m, 'b') == ('ok', 1)
+    with m.app.app_context():
+        assert m.db.session.get(m.JobState, 'b').last_lag >= 5
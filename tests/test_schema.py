@@ -0,0 +1,45 @@
+import pytest
+
+
+def drop_index(m, name):
+    with m.app.app_context():
+        m.db.session.execute(m.db.text(f'DROP INDEX {name}'))
+        m.db.session.commit()
+
+
+def test_ensure_indexes_merges_duplicate_products(m, add_product):
+    # Eski veritabanı: tekil index'ler yokken eklenmiş kopya satırlar, eski platform+başlık index'i
+    for name in ('uq_product_url', 'uq_product_fingerprint'):
+        drop_index(m, name)
+    with m.app.app_context():
+        m.db.session.execute(m.db.text('CREATE INDEX uq_product_platform_title ON product (platform, title)'))
+        m.db.session.commit()
+    first = add_product(1, title='Aynı Ürün', current_price=120.0)
+    same_title = add_product(2, title='Aynı Ürün')
+    same_url = add_product(3, product_url='https://example.com/p/1', current_price=90.0)
+    with m.app.app_context():
+        m.db.session.add(m.PriceHistory(product_id=same_url, price=90.0))
+        m.db.session.commit()
+
+        m.ensure_indexes()
+
+        # Aynı link birleşir; aynı başlıklı farklı ilan ayrı kalır
+        assert sorted(p.id for p in m.Product.query) == [first, same_title]
+        assert [h.product_id for h in m.PriceHistory.query] == [first]
+        names = {index['name'] for index in m.db.inspect(m.db.engine).get_indexes('product')}
+    assert {'ix_product_platform_title', 'uq_product_url', 'uq_product_fingerprint'} <= names
+    assert 'uq_product_platform_title' not in names
+
+
+def test_ensure_indexes_refuses_missing_unique_index(m, add_product):
+    drop_index(m, 'uq_favorite_user_product')
+    product_id = add_product(1)
+    with m.app.app_context():
+        user = m.User(email='dup@example.com', password='x')
+        m.db.session.add(user)
+        m.db.session.flush()
+        m.db.session.add_all([m.Favorite(user_id=user.id, product_id=product_id) for _ in range(2)])
+        m.db.session.commit()
+
+        with pytest.raises(m.SchemaError, match='uq_favorite_user_product'):
+            m.ensure_indexes()
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import scraper
+
+NO_WAIT = {'A': (0, 0), 'B': (0, 0), 'C': (0, 0)}
+
+
+def fake_scrapers(delay=0.0, failing=()):
+    def make(platform):
+        def scrape(keyword, max_products):
+            time.sleep(delay)
+            if platform in failing:
+                raise RuntimeError('upstream down')
+            return [f'{keyword}/{platform}']
+        return scrape
+    return {platform: make(platform) for platform in ('A', 'B', 'C')}
+
+
+def test_results_follow_task_order_and_survive_failures():
+    products = scraper.scrape_keywords(['k1', 'k2'], concurrency=6, limiter=scraper.HostRateLimiter(NO_WAIT),
+                                       scrapers=fake_scrapers(failing=('B',)))
+    assert products == ['k1/A', 'k1/C', 'k2/A', 'k2/C']
+
+
+def test_platforms_and_keywords_run_concurrently():
+    started = time.perf_counter()
+    products = scraper.scrape_keywords(['k1', 'k2'], concurrency=6, limiter=scraper.HostRateLimiter(NO_WAIT),
+                                       scrapers=fake_scrapers(delay=0.2))
+    elapsed = time.perf_counter() - started
+    assert len(products) == 6
+    # Seri çalışsa 6 x 0.2 s sürerdi
+    assert elapsed < 0.6
+
+
+def test_rate_limit_is_per_host():
+    limiter = scraper.HostRateLimiter({'A': (0.1, 0.1), 'B': (0.1, 0.1)})
+    times = {'A': [], 'B': []}
+    lock = threading.Lock()
+
+    def hit(host):
+        limiter.wait(host)
+        with lock:
+            times[host].append(time.monotonic())
+
+    threads = [threading.Thread(target=hit, args=(host,)) for host in ('A', 'A', 'A', 'B')]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    a = sorted(times['A'])
+    assert all(later - earlier >= 0.09 for earlier, later in zip(a, a[1:]))
+    # Diğer host'un isteği A'nın kuyruğunu beklemez
+    assert times['B'][0] - started < 0.05
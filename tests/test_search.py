@@ -0,0 +1,55 @@
+import pytest
+
+import search
+
+TITLES = [
+    'Apple iPhone 15 128 GB Siyah',
+    'Xiaomi Redmi Note 13 Akıllı Telefon',
+    'Sony WH-1000XM5 Bluetooth Kulaklık (Headphone)',
+    'IŞIK Masa Lambası LED',
+    'Philips Airfryer XXL Fritöz',
+    'Samsung Galaxy Tab S9 Tablet 5G',
+]
+
+TERMS = ['phone', 'iphone', 'PHONE 15', 'isik', 'ışık lamba', 'fon', 'ak', 'tab', '5g', 'xm5', 'sony phone', 'yok']
+
+
+def search_ids(m, term, backend):
+    search._backend = backend
+    try:
+        with m.app.app_context():
+            query = search.apply_search(m.db, m.Product, m.Product.query, term)
+            return sorted(product.id for product in query)
+    finally:
+        search._backend = None
+
+
+@pytest.fixture
+def catalog(m, add_product):
+    return [add_product(i, title=title) for i, title in enumerate(TITLES)]
+
+
+def test_fts_index_uses_trigram_tokenizer(m, catalog):
+    with m.app.app_context():
+        assert search.get_backend(m.db) == 'fts5'
+
+
+@pytest.mark.parametrize('term', TERMS)
+def test_fts_and_like_return_the_same_products(m, catalog, term):
+    assert search_ids(m, term, 'fts5') == search_ids(m, term, 'like')
+
+
+def test_substring_match(m, catalog):
+    assert search_ids(m, 'phone', 'fts5') == [catalog[0], catalog[2]]
+
+
+def test_old_tokenizer_index_is_rebuilt(m, catalog):
+    with m.app.app_context():
+        search.drop_search_index(m.db)
+        with m.db.engine.begin() as conn:
+            conn.execute(m.db.text(
+                f"CREATE VIRTUAL TABLE {search.FTS_TABLE} USING fts5(search_text, content='product', "
+                "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            ))
+        assert search.setup_search_index(m.db, m.Product) == 'fts5'
+    assert search_ids(m, 'phone', 'fts5') == [catalog[0], catalog[2]]
@@ -0,0 +1,56 @@
+import pytest
+
+from serializers import COMPATIBILITY_FIELDS, DETAIL_FIELDS, LIST_FIELDS, parse_fields
+
+
+def test_parse_fields_dedups_and_keeps_order():
+    assert parse_fields(' title, id ,title,,') == ('title', 'id')
+    assert parse_fields(None) == LIST_FIELDS
+    assert parse_fields('', compact=True) == tuple(f for f in LIST_FIELDS if f not in COMPATIBILITY_FIELDS)
+    assert parse_fields('id,url', compact=True) == ('id',)
+
+
+def test_parse_fields_rejects_unknown():
+    with pytest.raises(ValueError, match='password, secret'):
+        parse_fields('id,password,secret')
+
+
+def test_list_sparse_fieldset(client, add_product):
+    add_product(1, current_price=80.0)
+    response = client.get('/api/products', query_string={'fields': 'id,current_price', 'count': 'none'})
+    assert response.status_code == 200
+    (product,) = response.get_json()['products']
+    assert list(product) == ['id', 'current_price']
+    assert product['current_price'] == 80.0
+
+
+def test_list_compact_drops_compatibility_copies(client, add_product):
+    add_product(1)
+    full = client.get('/api/products').get_json()['products'][0]
+    compact = client.get('/api/products', query_string={'compact': '1'}).get_json()['products'][0]
+    assert full['url'] == full['product_url'] and full['image'] == full['image_url']
+    assert set(full) - set(compact) == set(COMPATIBILITY_FIELDS)
+
+
+def test_cursor_mode_does_not_leak_cursor_columns(client, add_product):
+    add_product(1)
+    add_product(2)
+    response = client.get('/api/products', query_string={'fields': 'id', 'cursor': '', 'per_page': 1})
+    body = response.get_json()
+    assert [list(p) for p in body['products']] == [['id']]
+    assert body['next_cursor']
+
+
+def test_detail_defaults_to_detail_fields(client, add_product):
+    product_id = add_product(1)
+    product = client.get(f'/api/products/{product_id}').get_json()
+    assert set(DETAIL_FIELDS) <= set(product)
+    assert not set(COMPATIBILITY_FIELDS) & set(product)
+
+
+@pytest.mark.parametrize('path', ['/api/products', '/api/products/export'])
+def test_unknown_field_is_400(client, add_product, path):
+    add_product(1)
+    response = client.get(path, query_string={'fields': 'id,nope'})
+    assert response.status_code == 400
+    assert 'nope' in response.get_json()['message']
@@ -0,0 +1,42 @@
+def stat_rows(m):
+    with m.app.app_context():
+        return {(row.scope, row.name): (row.item_count, row.max_discount) for row in m.CatalogStat.query}
+
+
+def test_unseeded_stats_are_computed_without_writing(client, m, add_product):
+    add_product(1, discount_percent=40)
+    with m.app.app_context():
+        m.CatalogStat.query.delete()
+        m.db.session.commit()
+
+    for _ in range(2):
+        body = client.get('/api/stats').get_json()
+        assert body['total_products'] == 1 and body['best_deal'] == 40
+        assert body['categories'] == {'Elektronik': {'count': 1, 'avg_discount': 40, 'best_deal': 40}}
+    assert stat_rows(m) == {}
+
+
+def test_stale_max_is_computed_without_writing(client, m, add_product):
+    add_product(1, discount_percent=40)
+    best = add_product(2, discount_percent=70, platform='N11')
+    with m.app.app_context():
+        # En iyi fırsat silinince max'ı düşebilecek satırlar NULL olur
+        m.db.session.delete(m.db.session.get(m.Product, best))
+        m.db.session.commit()
+    before = stat_rows(m)
+    assert before[('all', '')] == (1, None)
+
+    body = client.get('/api/stats').get_json()
+    assert body['best_deal'] == 40
+    assert body['categories']['Elektronik']['best_deal'] == 40
+    assert stat_rows(m) == before
+
+
+def test_stats_counts_products(client, add_product):
+    add_product(1, discount_percent=40)
+    add_product(2, discount_percent=20, platform='N11')
+    body = client.get('/api/stats').get_json()
+    assert body['total_products'] == 2
+    assert body['avg_discount'] == 30
+    assert body['best_deal'] == 40
+    assert set(body['platforms']) == {'Trendyol', 'N11'}
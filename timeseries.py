@@ -0,0 +1,77 @@
+"""
+İndirimRadar Time Series
+Fiyat geçmişi grafikleri için sunucu tarafında örnek azaltma:
+LTTB (Largest-Triangle-Three-Buckets) ve min/max bucket
+"""
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+def lttb(xs, ys, threshold):
+    """Görsel şekli koruyarak threshold noktaya indir; seçilen indeksleri döndürür
+
+    İlk ve son nokta her zaman kalır; aradaki her bucket'tan, bir önceki seçilen
+    nokta ve sonraki bucket'ın ortalamasıyla en büyük üçgeni kuran nokta seçilir.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        # Sonraki bucket'ın ortalaması (son bucket için son nokta)
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        count = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / count
+        avg_y = sum(ys[avg_start:avg_end]) / count
+
+        ax = xs[a]
+        ay = ys[a]
+        dx = ax - avg_x
+        dy = avg_y - ay
+
+        best = -1.0
+        best_index = start = int(i * every) + 1
+        for j in range(start, int((i + 1) * every) + 1):
+            area = abs(dx * (ys[j] - ay) - (ax - xs[j]) * dy)
+            if area > best:
+                best = area
+                best_index = j
+
+        selected.append(best_index)
+        a = best_index
+
+    selected.append(n - 1)
+    return selected
+
+def minmax(ys, threshold):
+    """threshold/2 bucket'a böl, her bucket'tan min ve max'ı zaman sırasıyla al"""
+    n = len(ys)
+    if threshold >= n or threshold < 2:
+        return list(range(n))
+
+    buckets = threshold // 2
+    size = n / buckets
+    selected = []
+
+    for b in range(buckets):
+        start = int(b * size)
+        end = int((b + 1) * size) if b < buckets - 1 else n
+        low = high = start
+        for j in range(start + 1, end):
+            if ys[j] < ys[low]:
+                low = j
+            elif ys[j] > ys[high]:
+                high = j
+        selected.extend(sorted({low, high}))
+
+    return selected
+
+def downsample(xs, ys, points, method='lttb'):
+    """xs (sayısal zaman) ve ys için seçilen indeksler"""
+    if method == 'minmax':
+        return minmax(ys, points)
+    return lttb(xs, ys, points)